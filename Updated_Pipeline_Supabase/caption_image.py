@@ -910,7 +910,6 @@ def _generate_vision_response(
     cache_key = _compute_cache_key(prompt, image_base64, temperature, max_tokens)
     cached = _get_cached_response(cache_key)
     if cached:
-        print("Using vision response from cache")
         _LAST_PROVIDER_USED = 'cache'
         logger.info(
             "[VLM] cache hit; no provider executed cache_key=%s output_chars=%s preview=%r",
@@ -939,7 +938,6 @@ def _generate_vision_response(
             output = ''
 
         if output:
-            print(f"Using vision provider: {provider}")
             _LAST_PROVIDER_USED = provider
             _set_cached_response(cache_key, output)
             logger.info("[VLM] provider=%s succeeded output_chars=%s", provider, len(output))
@@ -964,7 +962,6 @@ def _normalize_caption_text(caption: str) -> str:
         return ''
 
     text = str(caption).strip()
-    lines = [ln.strip() for ln in text.replace('\r', '\n').split('\n') if ln.strip()]
     filtered = []
     skip_prefixes = (
         'confidence score',
@@ -974,9 +971,12 @@ def _normalize_caption_text(caption: str) -> str:
         'final answer',
         'reasoning',
     )
-    for ln in lines:
-        low = ln.lower().strip(' *-')
-        if any(low.startswith(prefix) for prefix in skip_prefixes):
+    # One pass over the lines: strip each once, drop blanks and meta sections.
+    for ln in text.replace('\r', '\n').split('\n'):
+        ln = ln.strip()
+        if not ln:
+            continue
+        if ln.lower().strip(' *-').startswith(skip_prefixes):
             continue
         filtered.append(ln.strip(' *'))
 
@@ -1396,10 +1396,10 @@ def caption_image_llava(image_path, prompt=None):
     """
     # Verify image exists
     if not Path(image_path).exists():
-        print(f"Error: Image file not found at {image_path}")
+        logger.error("Image file not found at %s", image_path)
         return None
 
-    print(f"Image loaded: {Path(image_path).name}")
+    logger.debug("Image loaded: %s", Path(image_path).name)
 
     strict_local_profile = (
         str(os.getenv('STRICT_PROVIDER_MODE_SPLIT', 'true')).strip().lower() in ('1', 'true', 'yes', 'on')
@@ -1488,12 +1488,12 @@ Requirements:
         else:
             image_base64 = encode_image_to_base64(image_path)
     except Exception as e:
-        print(f"Error encoding image: {e}")
+        logger.error("Error encoding image: %s", e)
         return None
 
     # Generate caption using provider routing
     try:
-        print("Generating caption...")
+        logger.debug("Generating caption...")
         if strict_local_profile and 'ollama' in VISION_PROVIDER_ORDER and not str(prompt or '').strip():
             structured_caption = _generate_vision_response(
                 prompt=structured_prompt,
@@ -1506,7 +1506,7 @@ Requirements:
                 parsed_structured_caption = _try_parse_local_caption_json(structured_caption)
                 rendered_structured_caption = _render_local_caption_from_json(parsed_structured_caption or {})
                 if rendered_structured_caption:
-                    print("Caption generation complete!")
+                    logger.debug("Caption generation complete")
                     return rendered_structured_caption
             elif structured_caption:
                 return structured_caption
@@ -1564,14 +1564,14 @@ Requirements:
                     # If no period found, add one
                     caption = caption + '.'
 
-            print("Caption generation complete!")
+            logger.debug("Caption generation complete")
             return caption
         else:
-            print("Error: Empty response from model")
+            logger.error("Empty caption response from model")
             return None
 
     except Exception as e:
-        print(f"Error during caption generation: {e}")
+        logger.error("Error during caption generation: %s", e)
         return None
 
 
@@ -1615,7 +1615,7 @@ def validate_work_environment(image_path):
             - environment_type: str - type of environment detected
             - reason: str - explanation
     """
-    print(f"Validating work environment...")
+    logger.debug("Validating work environment...")
 
     def _with_provider_diagnostics(result: dict) -> dict:
         diagnostics = get_runtime_provider_diagnostics()
@@ -1635,7 +1635,7 @@ def validate_work_environment(image_path):
 
     # Verify image exists
     if not Path(image_path).exists():
-        print(f"Error: Image not found at {image_path}")
+        logger.error("Image not found at %s", image_path)
         return _with_provider_diagnostics({
             'is_valid': False,
             'confidence': 'low',
@@ -1658,7 +1658,7 @@ Answer as one category letter followed by a dash and 2 to 5 words, for example:
     try:
         image_base64 = _encode_environment_validation_image(image_path)
     except Exception as e:
-        print(f"Error encoding image: {e}")
+        logger.error("Error encoding image: %s", e)
         return _with_provider_diagnostics({
             'is_valid': False,
             'confidence': 'low',
@@ -1687,7 +1687,7 @@ Answer as one category letter followed by a dash and 2 to 5 words, for example:
                 'reason': 'No response from configured providers'
             })
 
-        print(f"Environment check result: {answer.upper()}")
+        logger.info("Environment check result: %s", answer.upper())
 
         # Parse the response - ONLY category A proceeds to report generation.
         category = _parse_environment_validation_category(answer)
@@ -1733,7 +1733,7 @@ Answer as one category letter followed by a dash and 2 to 5 words, for example:
             })
 
     except Exception as e:
-        print(f"Environment validation error: {e} - blocking report generation")
+        logger.error("Environment validation error: %s - blocking report generation", e)
         return _with_provider_diagnostics({
             'is_valid': False,
             'confidence': 'low',
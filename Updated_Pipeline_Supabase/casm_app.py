@@ -27,6 +27,7 @@ import re
 import shutil
 import subprocess
 import html
+import gzip
 import hashlib
 import hmac
 import secrets
@@ -34,14 +35,18 @@ from urllib.parse import urlparse, quote
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from threading import Event, Lock, Semaphore, Thread
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 import json
+import queue
 import time
 import uuid
 from collections import deque
+from functools import lru_cache
 
 # Import timezone utility (configurable via .env)
 from timezone_utils import get_local_time, to_local_time, get_timezone_info
+from json_provider import install_orjson_provider, load_json_file
 
 from flask import Flask, render_template, send_from_directory, jsonify, abort, Response, request, redirect
 from werkzeug.exceptions import HTTPException
@@ -61,8 +66,9 @@ LOCAL_ENV_PATH = APP_DIR / '.env'
 LOCAL_ENV_EXAMPLE_PATH = APP_DIR / '.env.example'
 
 # Import project modules
-from infer_image import predict_image, resolve_model_path, warmup_model, is_model_ready
+from infer_image import predict_image, predict_images, resolve_model_path, warmup_model, is_model_ready, draw_detections
 from pipeline.backend.core.live_source_adapter import LiveSourceAdapter
+from pipeline.backend.core.image_processor import write_jpegs
 
 # Global progress tracking for report generation
 report_progress = {
@@ -542,7 +548,7 @@ def _set_cached_rendered_report_html(report_id: str, report_html_key: str, conte
 try:
     from pipeline.backend.core.violation_detector import ViolationDetector
     from pipeline.backend.integration.caption_generator import CaptionGenerator
-    from pipeline.backend.core.report_generator import ReportGenerator
+    from pipeline.backend.core.report_generator import ReportGenerator, embedding_cache_stats
     from pipeline.backend.core.supabase_report_generator import create_supabase_report_generator
     from pipeline.backend.core.supabase_db import create_db_manager_from_env
     from pipeline.backend.core.supabase_storage import create_storage_manager_from_env
@@ -578,6 +584,7 @@ app = Flask(__name__,
             template_folder='frontend',
             static_folder='frontend',
             static_url_path='/static')
+install_orjson_provider(app)
 
 SERVE_FRONTEND = os.getenv('SERVE_FRONTEND', 'true').lower() == 'true'
 FRONTEND_APP_URL = os.getenv(
@@ -606,6 +613,7 @@ STARTUP_DB_MANAGER_INIT_TIMEOUT_SECONDS = int(os.getenv('STARTUP_DB_MANAGER_INIT
 STARTUP_STORAGE_MANAGER_INIT_TIMEOUT_SECONDS = int(os.getenv('STARTUP_STORAGE_MANAGER_INIT_TIMEOUT_SECONDS', '20'))
 STARTUP_REPORT_GENERATOR_INIT_TIMEOUT_SECONDS = int(os.getenv('STARTUP_REPORT_GENERATOR_INIT_TIMEOUT_SECONDS', '30'))
 STARTUP_AUTO_PREPARE_LOCAL_MODE = os.getenv('STARTUP_AUTO_PREPARE_LOCAL_MODE', 'false').lower() == 'true'
+STARTUP_OLLAMA_PRELOAD = os.getenv('STARTUP_OLLAMA_PRELOAD', 'true').lower() == 'true'
 STARTUP_AUTO_PULL_LOCAL_MODEL = os.getenv('STARTUP_AUTO_PULL_LOCAL_MODEL', 'true').lower() == 'true'
 STARTUP_LOCAL_MODE_PREP_WAIT_SECONDS = int(os.getenv('STARTUP_LOCAL_MODE_PREP_WAIT_SECONDS', '6'))
 STARTUP_LOCAL_MODE_PULL_TIMEOUT_SECONDS = int(os.getenv('STARTUP_LOCAL_MODE_PULL_TIMEOUT_SECONDS', '240'))
@@ -930,6 +938,9 @@ VIOLATIONS_DIR.mkdir(parents=True, exist_ok=True)
 # Thread-safe camera access
 live_source_adapter = LiveSourceAdapter()
 camera_lock = live_source_adapter.lock
+# Set while no live source is running so stream pacing waits wake up immediately on stop.
+live_stream_stop_event = Event()
+live_stream_stop_event.set()
 
 
 def _is_active_live_source_locked() -> bool:
@@ -940,6 +951,7 @@ def _is_active_live_source_locked() -> bool:
 def _stop_live_source_locked() -> None:
     """Stop whichever live source is active (lock must be held)."""
     live_source_adapter.stop_locked()
+    live_stream_stop_event.set()
 
 
 def _get_realsense_probe_source():
@@ -959,7 +971,10 @@ def _get_default_live_source() -> str:
 
 def _start_live_source_locked(requested_source: str, camera_index: Optional[int] = None) -> Dict[str, Any]:
     """Start requested source with graceful fallback behavior (lock must be held)."""
-    return live_source_adapter.start_locked(requested_source, camera_index=camera_index)
+    result = live_source_adapter.start_locked(requested_source, camera_index=camera_index)
+    if result.get('success'):
+        live_stream_stop_event.clear()
+    return result
 
 
 def _read_active_frame_locked():
@@ -1287,27 +1302,35 @@ def _build_severity_context_text(
     return re.sub(r'[^a-z0-9]+', ' ', normalized).strip()
 
 
+@lru_cache(maxsize=1024)
+def _context_term_patterns(normalized_term: str) -> Tuple[str, Any, Any, Any]:
+    """(literal anchor, mention, negated-before, negated-after) patterns for one context term."""
+    term_pattern = re.escape(normalized_term).replace(r'\ ', r'\s+')
+    return (
+        normalized_term.split()[0],
+        re.compile(rf'\b{term_pattern}\b'),
+        re.compile(
+            rf'\b(no|not|without|absence\s+of|free\s+of|lack\s+of|lacking|not\s+visible|no\s+visible)\b'
+            rf'(?:\s+\w+){{0,6}}\s+{term_pattern}\b'
+        ),
+        re.compile(rf'\b{term_pattern}\b(?:\s+\w+){{0,4}}\s+\b(absent|not\s+visible|not\s+present)\b'),
+    )
+
+
 def _context_has_any(context_text: str, terms: Any) -> bool:
     normalized_context = f" {str(context_text or '').lower()} "
     for term in terms or []:
         normalized_term = str(term or '').strip().lower().replace('_', ' ').replace('-', ' ')
         if not normalized_term:
             continue
-        term_pattern = re.escape(normalized_term).replace(r'\ ', r'\s+')
-        for match in re.finditer(rf'\b{term_pattern}\b', normalized_context):
+        anchor, term_re, negated_before_re, negated_after_re = _context_term_patterns(normalized_term)
+        if anchor not in normalized_context:
+            continue
+        for match in term_re.finditer(normalized_context):
             window_start = max(0, match.start() - 80)
             window_end = min(len(normalized_context), match.end() + 36)
             window = normalized_context[window_start:window_end]
-            negated_before = re.search(
-                rf'\b(no|not|without|absence\s+of|free\s+of|lack\s+of|lacking|not\s+visible|no\s+visible)\b'
-                rf'(?:\s+\w+){{0,6}}\s+{term_pattern}\b',
-                window,
-            )
-            negated_after = re.search(
-                rf'\b{term_pattern}\b(?:\s+\w+){{0,4}}\s+\b(absent|not\s+visible|not\s+present)\b',
-                window,
-            )
-            if not negated_before and not negated_after:
+            if not negated_before_re.search(window) and not negated_after_re.search(window):
                 return True
     return False
 
@@ -2572,6 +2595,16 @@ def _is_offline_local_fallback_available(local_diag: Optional[Dict[str, Any]]) -
     return bool(diagnostics.get('ollama_installed') and diagnostics.get('ollama_running'))
 
 
+def _preload_report_ollama_models():
+    """Load the report generator's Ollama models in the background during startup."""
+    try:
+        loaded = report_generator.preload_ollama_models()
+        if loaded:
+            logger.info(f"Ollama models preloaded for reports: {loaded}")
+    except Exception as preload_err:
+        logger.debug(f"Ollama model preload skipped: {preload_err}")
+
+
 def _run_startup_sequence():
     """Background startup sequence so frontend can show setup progress."""
     try:
@@ -2653,6 +2686,8 @@ def _run_startup_sequence():
             _set_startup_step('pipeline_components', 'error', 'Component initialization returned failure')
             raise RuntimeError('Pipeline components failed to initialize')
         _set_startup_step('pipeline_components', 'ok', 'Core components initialized')
+        if STARTUP_OLLAMA_PRELOAD and report_generator is not None:
+            Thread(target=_preload_report_ollama_models, daemon=True, name='ollama-preload').start()
 
         _set_startup_progress(60, 'Checking local mode readiness (Ollama)')
         try:
@@ -3476,8 +3511,7 @@ def _run_local_pending_recovery_sweep(reason: str = 'watchdog') -> Dict[str, Any
         metadata_path = violation_dir / 'metadata.json'
         try:
             if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as metadata_file:
-                    parsed_metadata = json.load(metadata_file) or {}
+                parsed_metadata = load_json_file(metadata_path) or {}
                 if isinstance(parsed_metadata, dict):
                     local_metadata = parsed_metadata
         except Exception as metadata_error:
@@ -4460,6 +4494,9 @@ def enqueue_violation(
         frame: The video frame with the violation
         detections: List of YOLO detections
 
+    Both images are written to disk before this returns and no reference to
+    either array is kept, so callers may reuse their buffers afterwards.
+
     Returns:
         report_id if successfully queued, None otherwise
     """
@@ -4547,22 +4584,21 @@ def enqueue_violation(
         logger.info(f"  Created violation directory: {violation_dir}")
 
         # === IMMEDIATE: Save images (fast operation) ===
-        # Save original frame
+        # Both frames are encoded concurrently and are on disk before this
+        # returns, so the caller's (pooled) buffers may be reused straight away.
         original_path = violation_dir / 'original.jpg'
-        cv2.imwrite(str(original_path), frame)
-        logger.info(f" Saved original image: {original_path}")
-
         annotated_path = violation_dir / 'annotated.jpg'
-        annotated_saved = False
+        jpeg_jobs = [(frame, original_path)]
         if isinstance(annotated_frame, np.ndarray) and annotated_frame.size > 0:
-            try:
-                annotated_saved = bool(cv2.imwrite(str(annotated_path), annotated_frame))
-                if annotated_saved:
-                    logger.info(f" Saved annotated image at capture time: {annotated_path}")
-            except Exception as annotated_write_error:
-                logger.warning(
-                    f"Could not persist annotated capture frame for {report_id}: {annotated_write_error}"
-                )
+            jpeg_jobs.append((annotated_frame, annotated_path))
+        saved_flags = write_jpegs(jpeg_jobs)
+        logger.info(f" Saved original image: {original_path}")
+
+        annotated_saved = len(saved_flags) > 1 and saved_flags[1]
+        if annotated_saved:
+            logger.info(f" Saved annotated image at capture time: {annotated_path}")
+        elif len(saved_flags) > 1:
+            logger.warning(f"Could not persist annotated capture frame for {report_id}")
 
         missing_ppe_metadata: List[str] = []
         ppe_tags_metadata: List[str] = []
@@ -4632,8 +4668,7 @@ def enqueue_violation(
             try:
                 metadata_update = {}
                 if metadata_path.exists():
-                    with open(metadata_path, 'r', encoding='utf-8') as f:
-                        loaded_metadata = json.load(f) or {}
+                    loaded_metadata = load_json_file(metadata_path) or {}
                     if isinstance(loaded_metadata, dict):
                         metadata_update.update(loaded_metadata)
                 metadata_update.update({
@@ -5220,7 +5255,9 @@ def _handoff_partial_local_report_to_cloud(
 
         if hasattr(db_manager, 'log_event'):
             try:
-                db_manager.log_event(
+                # Non-blocking: flood_logs rows are batched by the DB manager's writer.
+                log_event = getattr(db_manager, 'enqueue_log_event', None) or db_manager.log_event
+                log_event(
                     event_type='local_partial_handoff',
                     message=f'Uploaded partial local report artifacts for cloud continuation ({reason})',
                     report_id=report_id,
@@ -6817,6 +6854,50 @@ def _request_prefers_html(req) -> bool:
     return any(signal in user_agent for signal in browser_signals)
 
 
+# index.html is the SPA shell for / and every unknown non-API path. Its bytes,
+# gzip body and ETag are kept in memory and only rebuilt when the file's mtime
+# or size changes, so a request costs one stat instead of open+read+sniff.
+_frontend_index_cache: Dict[str, Any] = {'stamp': None, 'raw': b'', 'gzip': b'', 'etag': ''}
+_frontend_index_cache_lock = threading.Lock()
+
+
+def _frontend_index_response() -> Response:
+    """Serve frontend/index.html from memory with ETag revalidation and gzip."""
+    index_path = os.path.join(app.root_path, 'frontend', 'index.html')
+    try:
+        stat = os.stat(index_path)
+    except OSError:
+        abort(404)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _frontend_index_cache_lock:
+        if _frontend_index_cache['stamp'] != stamp:
+            with open(index_path, 'rb') as handle:
+                raw = handle.read()
+            _frontend_index_cache.update(
+                stamp=stamp,
+                raw=raw,
+                gzip=gzip.compress(raw, compresslevel=6),
+                etag=hashlib.sha1(raw).hexdigest(),
+            )
+        cached = dict(_frontend_index_cache)
+
+    # The gzip body is a different representation, so it gets its own ETag.
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = f"{cached['etag']}-gzip" if use_gzip else cached['etag']
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(cached['gzip'] if use_gzip else cached['raw'], mimetype='text/html')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Always revalidate the shell so a deploy is picked up; a match costs a 304.
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 def _build_api_only_redirect_page(frontend_url: str) -> str:
     safe_url = html.escape(frontend_url, quote=True)
     return f"""<!doctype html>
@@ -6853,7 +6934,7 @@ def index():
             'frontend_url': FRONTEND_APP_URL or None,
             'message': 'Frontend is deployed separately. Use this host for API requests only.'
         })
-    return send_from_directory('frontend', 'index.html')
+    return _frontend_index_response()
 
 
 @app.route('/api/system/startup-status', methods=['GET'])
@@ -7070,19 +7151,23 @@ def api_violations():
         if not VIOLATIONS_DIR.exists():
             return local_violations
 
-        for violation_dir in sorted(VIOLATIONS_DIR.iterdir(), reverse=True):
-            if not violation_dir.is_dir():
+        for violation_dir in _list_local_violation_dirs():
+            report_id = violation_dir.name
+            row_signature = _local_violation_row_signature(violation_dir)
+            if row_signature is None:
+                continue
+            cached_row = _get_cached_local_violation_row(violation_dir, source_reason, row_signature)
+            if cached_row is not None:
+                local_violations.append(cached_row)
                 continue
 
-            report_id = violation_dir.name
             try:
                 timestamp = _parse_report_id_timestamp(report_id)
 
                 metadata_file = violation_dir / 'metadata.json'
                 metadata = {}
                 if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
+                    metadata = load_json_file(metadata_file)
 
                 has_report = (violation_dir / 'report.html').exists()
                 has_original = (violation_dir / 'original.jpg').exists()
@@ -7149,7 +7234,7 @@ def api_violations():
                 else:
                     status = 'pending'
 
-                local_violations.append({
+                row = {
                     'report_id': report_id,
                     'timestamp': timestamp.isoformat(),
                     'has_original': has_original,
@@ -7170,7 +7255,9 @@ def api_violations():
                     'origin': metadata.get('origin'),
                     'sync_source': metadata.get('sync_source') or metadata.get('source'),
                     **_build_source_payload(metadata_source_scope or 'local', metadata_source_reason)
-                })
+                }
+                _set_cached_local_violation_row(violation_dir, source_reason, row_signature, row)
+                local_violations.append(row)
             except ValueError:
                 logger.warning(f"Skipping invalid report directory: {report_id}")
                 continue
@@ -8123,8 +8210,7 @@ def api_get_violation(report_id):
         metadata_file = violation_dir / 'metadata.json'
         metadata = {}
         if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
+            metadata = load_json_file(metadata_file)
 
         timestamp = _parse_report_id_timestamp(report_id)
 
@@ -9159,8 +9245,7 @@ def _scan_local_report_state_rows_uncached(
         try:
             metadata_path = violation_dir / 'metadata.json'
             if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as _mf:
-                    _meta = json.load(_mf) or {}
+                _meta = load_json_file(metadata_path) or {}
                 if isinstance(_meta, dict):
                     if isinstance(_meta.get('violation_count'), (int, float)):
                         metadata_violation_count = int(_meta.get('violation_count') or 0)
@@ -10507,8 +10592,7 @@ def _local_mode_load_provision_state() -> Dict[str, Any]:
     if not LOCAL_MODE_PROVISION_STATE_FILE.exists():
         return {}
     try:
-        with open(LOCAL_MODE_PROVISION_STATE_FILE, 'r') as f:
-            payload = json.load(f)
+        payload = load_json_file(LOCAL_MODE_PROVISION_STATE_FILE)
         return payload if isinstance(payload, dict) else {}
     except Exception:
         return {}
@@ -12545,14 +12629,105 @@ def api_prepare_local_mode():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lru_cache(maxsize=4096)
+def _parse_report_id_naive(text: str) -> Optional[datetime]:
+    """Parse a YYYYMMDD_HHMMSS report_id to a naive datetime, or None if malformed."""
+    try:
+        # Fixed-width ids are sliced directly; strptime is several times slower
+        # and runs once per row on every listing.
+        if len(text) == 15 and text[8] == '_' and text[:8].isdigit() and text[9:].isdigit():
+            return datetime(
+                int(text[0:4]), int(text[4:6]), int(text[6:8]),
+                int(text[9:11]), int(text[11:13]), int(text[13:15]),
+            )
+        return datetime.strptime(text, '%Y%m%d_%H%M%S')
+    except ValueError:
+        return None
+
+
 def _parse_report_id_timestamp(report_id: str) -> datetime:
     """Parse report_id as configured local timezone timestamp with a safe fallback."""
     tz_info = get_timezone_info()
-    try:
-        parsed = datetime.strptime(str(report_id), '%Y%m%d_%H%M%S')
-        return parsed.replace(tzinfo=tz_info)
-    except Exception:
+    parsed = _parse_report_id_naive(str(report_id))
+    if parsed is None:
         return datetime.now(tz_info)
+    return parsed.replace(tzinfo=tz_info)
+
+
+# Local violation listing cache. The sorted directory listing is rebuilt only
+# when VIOLATIONS_DIR's st_mtime_ns changes (a report folder was added or
+# removed); each row is rebuilt only when its folder (artifact created or
+# deleted) or metadata.json changes.
+_local_violation_listing_cache: Dict[str, Any] = {'root': None, 'mtime_ns': None, 'dirs': []}
+# Entries are (signature, row, timestamp_is_fallback); rows whose report_id does
+# not parse get their "now" timestamp recomputed on every read, as before caching.
+_local_violation_rows_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], Dict[str, Any], bool]] = {}
+_local_violation_cache_lock = Lock()
+
+
+def _list_local_violation_dirs() -> List[Path]:
+    """Return report folders under VIOLATIONS_DIR, newest first, cached by directory mtime."""
+    root = VIOLATIONS_DIR
+    try:
+        mtime_ns = root.stat().st_mtime_ns
+    except OSError:
+        return []
+
+    with _local_violation_cache_lock:
+        if (
+            _local_violation_listing_cache['root'] == str(root)
+            and _local_violation_listing_cache['mtime_ns'] == mtime_ns
+        ):
+            return list(_local_violation_listing_cache['dirs'])
+
+    dirs = sorted((entry for entry in root.iterdir() if entry.is_dir()), reverse=True)
+    live_paths = {str(entry) for entry in dirs}
+    with _local_violation_cache_lock:
+        _local_violation_listing_cache['root'] = str(root)
+        _local_violation_listing_cache['mtime_ns'] = mtime_ns
+        _local_violation_listing_cache['dirs'] = dirs
+        for key in [key for key in _local_violation_rows_cache if key[0] not in live_paths]:
+            _local_violation_rows_cache.pop(key, None)
+    return list(dirs)
+
+
+def _local_violation_row_signature(violation_dir: Path) -> Optional[Tuple[int, int]]:
+    """Return the (folder, metadata.json) mtime pair that invalidates a cached row."""
+    try:
+        dir_mtime_ns = violation_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+    try:
+        metadata_mtime_ns = (violation_dir / 'metadata.json').stat().st_mtime_ns
+    except OSError:
+        metadata_mtime_ns = 0
+    return dir_mtime_ns, metadata_mtime_ns
+
+
+def _get_cached_local_violation_row(
+    violation_dir: Path,
+    source_reason: str,
+    signature: Tuple[int, int],
+) -> Optional[Dict[str, Any]]:
+    with _local_violation_cache_lock:
+        entry = _local_violation_rows_cache.get((str(violation_dir), source_reason))
+    if entry is None or entry[0] != signature:
+        return None
+    row = dict(entry[1])
+    if entry[2]:
+        row['timestamp'] = _parse_report_id_timestamp(violation_dir.name).isoformat()
+    return row
+
+
+def _set_cached_local_violation_row(
+    violation_dir: Path,
+    source_reason: str,
+    signature: Tuple[int, int],
+    row: Dict[str, Any],
+) -> None:
+    timestamp_is_fallback = _parse_report_id_naive(violation_dir.name) is None
+    with _local_violation_cache_lock:
+        _local_violation_rows_cache[(str(violation_dir), source_reason)] = (signature, dict(row), timestamp_is_fallback)
 
 
 def _read_local_violation_metadata(violation_dir: Path) -> Dict[str, Any]:
@@ -12562,8 +12737,7 @@ def _read_local_violation_metadata(violation_dir: Path) -> Dict[str, Any]:
         return {}
 
     try:
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json_file(metadata_path)
         return data if isinstance(data, dict) else {}
     except Exception:
         return {}
@@ -13446,8 +13620,7 @@ def _sync_local_cache_candidates(
         if not metadata_path.exists():
             return {}
         try:
-            with open(metadata_path, 'r', encoding='utf-8') as meta_file:
-                parsed = json.load(meta_file) or {}
+            parsed = load_json_file(metadata_path) or {}
             return parsed if isinstance(parsed, dict) else {}
         except Exception:
             return {}
@@ -13941,7 +14114,8 @@ def _sync_local_cache_candidates(
 
             if hasattr(db_manager, 'log_event'):
                 try:
-                    db_manager.log_event(
+                    log_event = getattr(db_manager, 'enqueue_log_event', None) or db_manager.log_event
+                    log_event(
                         event_type='local_cache_sync_queued',
                         message=f'Queued local cache report for Supabase reconciliation ({reason})',
                         report_id=report_id,
@@ -14652,7 +14826,8 @@ def api_generate_report_now(report_id):
                     )
                 if db_manager is not None and hasattr(db_manager, 'log_event'):
                     try:
-                        db_manager.log_event(
+                        log_event = getattr(db_manager, 'enqueue_log_event', None) or db_manager.log_event
+                        log_event(
                             event_type='generate_now_placeholder_recovery',
                             message='Forced reprocess used placeholder image recovery due to missing original',
                             report_id=report_id,
@@ -15603,8 +15778,7 @@ def _load_local_traceability_sidecar(report_id: str) -> Dict[str, Any]:
                 sidecar_path = VIOLATIONS_DIR / report_id / 'metadata.json'
                 if not sidecar_path.exists():
                         return {}
-                with open(sidecar_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                data = load_json_file(sidecar_path)
                 if not isinstance(data, dict):
                         return {}
                 if not str(data.get('caption') or '').strip():
@@ -16488,7 +16662,16 @@ def get_image(report_id, filename):
     image_path = violation_dir / filename
 
     def _serve_local_image(path: Path):
-        response = send_from_directory(str(path.parent), path.name)
+        # Strong validator from mtime_ns/size: a re-annotated capture gets a new
+        # ETag, while unchanged images answer If-None-Match with a bodiless 304.
+        stat = path.stat()
+        response = send_from_directory(
+            str(path.parent),
+            path.name,
+            mimetype='image/jpeg',
+            etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            conditional=True,
+        )
         # Permit browser reuse of stable /image URLs to lower repeat storage traffic.
         response.headers['Cache-Control'] = 'public, max-age=86400, stale-while-revalidate=600, stale-if-error=604800'
         return response
@@ -16553,6 +16736,211 @@ def get_image(report_id, filename):
 # API ENDPOINTS - LIVE STREAMING
 # =========================================================================
 
+# Live stream micro-batching: frames are grouped into one YOLO forward pass when
+# LIVE_INFERENCE_BATCH > 1 (flushed early once LIVE_INFERENCE_BATCH_WINDOW_MS elapses).
+try:
+    LIVE_INFERENCE_BATCH = int(os.getenv('LIVE_INFERENCE_BATCH', '1'))
+except (TypeError, ValueError):
+    LIVE_INFERENCE_BATCH = 1
+LIVE_INFERENCE_BATCH = max(1, min(LIVE_INFERENCE_BATCH, 16))
+LIVE_INFERENCE_BATCH_WINDOW_SECONDS = max(0.0, _env_float('LIVE_INFERENCE_BATCH_WINDOW_MS', 15.0) / 1000.0)
+
+# Optional Linux thread placement for the live capture loop and its JPEG encoder
+# (-1 = leave to the scheduler). LIVE_CAPTURE_NICE < 0 needs CAP_SYS_NICE.
+LIVE_CAPTURE_CPU = int(_env_float('LIVE_CAPTURE_CPU', -1))
+LIVE_ENCODER_CPU = int(_env_float('LIVE_ENCODER_CPU', -1))
+LIVE_CAPTURE_NICE = int(_env_float('LIVE_CAPTURE_NICE', 0))
+# Dummy inferences at the stream's frame shape before the first real frame (0 = off).
+LIVE_WARMUP_ITERATIONS = max(0, int(_env_float('LIVE_WARMUP_ITERATIONS', 3)))
+# Static-scene gate: a frame whose 64-bit dHash differs from the last inferred frame
+# in fewer than LIVE_STATIC_SKIP_HAMMING bits reuses its detections (0 = always infer).
+# Inference is forced after LIVE_STATIC_SKIP_MAX_FRAMES consecutive reuses.
+LIVE_STATIC_SKIP_HAMMING = max(0, int(_env_float('LIVE_STATIC_SKIP_HAMMING', 4)))
+LIVE_STATIC_SKIP_MAX_FRAMES = max(1, int(_env_float('LIVE_STATIC_SKIP_MAX_FRAMES', 30)))
+
+
+def _frame_dhash(frame: np.ndarray) -> int:
+    """Return the 64-bit difference hash of a frame (9x8 grey thumbnail, adjacent compare)."""
+    # INTER_AREA straight from 1080p costs ~8 ms; a cheap bilinear pass to
+    # 144x128 first keeps the block averaging (noise tolerance) at ~0.1 ms.
+    small = cv2.resize(frame, (144, 128), interpolation=cv2.INTER_LINEAR)
+    thumb = cv2.resize(small, (9, 8), interpolation=cv2.INTER_AREA)
+    if thumb.ndim == 3:
+        thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+    bits = np.packbits(thumb[:, 1:] > thumb[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def _tune_live_thread(cpu: int, nice: int = 0):
+    """Pin the calling thread to `cpu` and shift its nice value (Linux only).
+
+    Returns a callable that restores the previous affinity/priority, since the
+    stream generator runs on a server thread that may be reused afterwards.
+    """
+    restore_steps = []
+    if cpu >= 0 and hasattr(os, 'sched_setaffinity'):
+        try:
+            previous_cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, {cpu})
+            restore_steps.append(lambda: os.sched_setaffinity(0, previous_cpus))
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Could not pin live thread to CPU {cpu}: {exc}")
+    if nice and hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+        try:
+            thread_id = threading.get_native_id()
+            previous_nice = os.getpriority(os.PRIO_PROCESS, thread_id)
+            os.setpriority(os.PRIO_PROCESS, thread_id, previous_nice + nice)
+            restore_steps.append(lambda: os.setpriority(os.PRIO_PROCESS, thread_id, previous_nice))
+        except OSError as exc:
+            logger.warning(f"Could not change live thread priority by {nice}: {exc}")
+
+    def _restore():
+        for step in reversed(restore_steps):
+            try:
+                step()
+            except OSError:
+                pass
+
+    return _restore
+
+# libjpeg-turbo encoder for stream frames; None until first use, False when unavailable.
+_live_turbo_jpeg = None
+_live_turbo_jpeg_lock = Lock()
+
+
+def _get_live_turbo_jpeg():
+    global _live_turbo_jpeg
+    if _live_turbo_jpeg is None:
+        with _live_turbo_jpeg_lock:
+            if _live_turbo_jpeg is None:
+                try:
+                    from turbojpeg import TurboJPEG
+                    _live_turbo_jpeg = TurboJPEG()
+                except Exception as exc:
+                    logger.info(f"TurboJPEG unavailable, using OpenCV JPEG encoder for live stream: {exc}")
+                    _live_turbo_jpeg = False
+    return _live_turbo_jpeg or None
+
+
+def _encode_live_jpeg(frame: np.ndarray, jpeg_quality: int) -> Optional[bytes]:
+    """Encode a BGR stream frame to JPEG bytes, preferring libjpeg-turbo when installed."""
+    encoder = _get_live_turbo_jpeg()
+    if encoder is not None:
+        try:
+            from turbojpeg import TJPF_BGR, TJSAMP_420
+            return encoder.encode(
+                frame,
+                quality=int(jpeg_quality),
+                pixel_format=TJPF_BGR,
+                jpeg_subsample=TJSAMP_420,
+            )
+        except Exception as exc:
+            logger.debug(f"TurboJPEG encode failed, falling back to OpenCV: {exc}")
+
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
+    if not ok:
+        return None
+    return buffer.tobytes()
+
+
+class _LiveFramePool:
+    """Ring of preallocated frame buffers reused for annotated stream frames.
+
+    A slot is handed out again `size` acquisitions later, so holders (the HUD
+    pass and the JPEG encoder) must be done with it by then. Anything kept
+    longer, such as queued violation frames, must be copied.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(2, int(size))
+        self._slots: List[np.ndarray] = []
+        self._shape = None
+        self._index = 0
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        if self._shape != (tuple(shape), np.dtype(dtype)):
+            self._slots = [np.empty(shape, dtype=dtype) for _ in range(self.size)]
+            self._shape = (tuple(shape), np.dtype(dtype))
+            self._index = 0
+        slot = self._slots[self._index]
+        self._index = (self._index + 1) % self.size
+        return slot
+
+
+class _LiveJpegEncoder:
+    """Per-stream JPEG encoder thread so encoding overlaps the next YOLO inference.
+
+    Only the newest annotated frame is kept: submitting while an older frame is
+    still pending replaces it. Consumers call `take_new()` (non-blocking) or
+    `wait_new()` (woken by the encoder) for bytes they have not yielded yet.
+    """
+
+    def __init__(self, jpeg_quality: int):
+        self.jpeg_quality = int(jpeg_quality)
+        self._pending: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=1)
+        self._lock = Lock()
+        self._latest_jpeg: Optional[bytes] = None
+        self._latest_seq = 0
+        self._taken_seq = 0
+        self._new_jpeg_event = Event()
+        self._thread = Thread(target=self._run, daemon=True, name='live-jpeg-encoder')
+        self._thread.start()
+
+    def _run(self) -> None:
+        # Dedicated daemon thread: pinning lasts for its lifetime, no restore needed.
+        _tune_live_thread(LIVE_ENCODER_CPU)
+        while True:
+            frame = self._pending.get()
+            if frame is None:
+                return
+            try:
+                jpeg = _encode_live_jpeg(frame, self.jpeg_quality)
+            except Exception as exc:
+                logger.error(f"Live JPEG encode failed: {exc}")
+                jpeg = None
+            if jpeg is None:
+                continue
+            with self._lock:
+                self._latest_jpeg = jpeg
+                self._latest_seq += 1
+            self._new_jpeg_event.set()
+
+    def submit(self, frame: np.ndarray) -> None:
+        """Queue a frame for encoding, dropping any older frame still waiting."""
+        while True:
+            try:
+                self._pending.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._pending.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def take_new(self) -> Optional[bytes]:
+        """Return the newest encoded frame if it has not been taken yet."""
+        with self._lock:
+            if self._latest_seq == self._taken_seq:
+                return None
+            self._taken_seq = self._latest_seq
+            self._new_jpeg_event.clear()
+            return self._latest_jpeg
+
+    def wait_new(self, timeout: float) -> Optional[bytes]:
+        """Block until a not-yet-taken frame is encoded (or `timeout` elapses)."""
+        if timeout > 0:
+            self._new_jpeg_event.wait(timeout)
+        return self.take_new()
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Finish any pending encode and stop the worker thread."""
+        try:
+            self._pending.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout=timeout)
+
+
 def generate_frames(conf=0.25, target_fps=14, jpeg_quality=72):
     """Generate frames from active live source with YOLO detection and violation processing."""
 
@@ -16587,108 +16975,197 @@ def generate_frames(conf=0.25, target_fps=14, jpeg_quality=72):
     logger.info("=" * 80)
 
     frame_interval = 1.0 / max(1, int(target_fps))
-    last_yield_ts = 0.0
+    next_yield_deadline = time.monotonic()
+    jpeg_encoder = _LiveJpegEncoder(jpeg_quality)
+    restore_thread_tuning = _tune_live_thread(LIVE_CAPTURE_CPU, LIVE_CAPTURE_NICE)
+    # In flight per slot: the batch being annotated, one frame pending encode, one encoding.
+    annotated_pool = _LiveFramePool(LIVE_INFERENCE_BATCH + 3)
 
     try:
-        while True:
-            with camera_lock:
-                if not _is_active_live_source_locked():
-                    break
-                ret, frame, error_message = _read_active_frame_locked()
-                if not ret:
-                    logger.warning(error_message or 'Failed to read frame from active source')
+        source_ended = False
+        stream_warmed = False
+        static_ref_hash = None
+        static_ref_detections = []
+        static_skips = 0
+        while not source_ended:
+            pending_frames = []
+            batch_deadline = time.monotonic() + LIVE_INFERENCE_BATCH_WINDOW_SECONDS
+            while len(pending_frames) < LIVE_INFERENCE_BATCH:
+                with camera_lock:
+                    if not _is_active_live_source_locked():
+                        source_ended = True
+                        break
+                    ret, frame, error_message = _read_active_frame_locked()
+                    if not ret:
+                        logger.warning(error_message or 'Failed to read frame from active source')
+                        source_ended = True
+                        break
+                pending_frames.append(frame)
+                if time.monotonic() >= batch_deadline:
                     break
 
-            # Run YOLO detection
-            try:
-                detections, annotated = predict_image(frame, conf=conf)
-                violation_detections = _extract_violation_detections(detections) if detections else []
-
-                # Keep a persistent on-frame status HUD so users always see live YOLO state,
-                # even when there are no current violation boxes.
-                cv2.rectangle(annotated, (10, 10), (390, 72), (0, 0, 0), -1)
-                cv2.putText(
-                    annotated,
-                    f"YOLO active | detections: {len(detections)}",
-                    (18, 36),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.62,
-                    (80, 255, 120),
-                    2,
-                    cv2.LINE_AA,
-                )
-                cv2.putText(
-                    annotated,
-                    f"violations: {len(violation_detections)}",
-                    (18, 62),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.56,
-                    (0, 220, 255),
-                    2,
-                    cv2.LINE_AA,
-                )
+            if not pending_frames:
+                break
 
-                # Log all detections for debugging
-                if detections:
-                    detected_classes = [d['class_name'] for d in detections]
-                    logger.debug(f"Detected: {detected_classes}")
-
-                # Check for violations in background thread (non-blocking)
-                if detections and FULL_PIPELINE_AVAILABLE:
-                    if violation_detections:
-                        # Log detected violations
-                        violation_classes = [d.get('class_name') for d in violation_detections]
-                        logger.info("=" * 80)
-                        logger.info(f" PPE VIOLATION DETECTED: {violation_classes}")
-                        logger.info(f"Caption generator available: {caption_generator is not None}")
-                        logger.info(f"Report generator available: {report_generator is not None}")
-                        logger.info(f"Violation queue available: {violation_queue is not None}")
-                        logger.info("=" * 80)
-
-                        # Use queue-based approach to prevent missing violations
-                        # enqueue_violation is fast (saves images, adds to queue)
-                        # Queue worker processes reports in background
-                        frame_copy = frame.copy()
-                        detections_copy = detections.copy()
-
-                        report_id = enqueue_violation(
-                            frame_copy,
-                            detections_copy,
-                            trigger_source='live',
-                            annotated_frame=annotated.copy(),
-                        )
-                        if report_id:
-                            logger.info(f" Violation {report_id} queued for processing")
-                        else:
-                            logger.debug("Violation not queued (cooldown or already processing)")
+            if not stream_warmed:
+                stream_warmed = True
+                if LIVE_WARMUP_ITERATIONS:
+                    try:
+                        warmup_model(frame_shape=pending_frames[0].shape[:2], iterations=LIVE_WARMUP_ITERATIONS)
+                    except Exception as warmup_error:
+                        logger.warning(f"Live YOLO warmup skipped: {warmup_error}")
+
+            # Near-identical frames reuse the detections of the last inferred frame:
+            # reuse_refs[i] is the in-batch index to copy from, or -1 for the previous batch.
+            reuse_refs = [None] * len(pending_frames)
+            infer_indices = list(range(len(pending_frames)))
+            if LIVE_STATIC_SKIP_HAMMING:
+                infer_indices = []
+                for idx, pending in enumerate(pending_frames):
+                    frame_hash = _frame_dhash(pending)
+                    if (
+                        static_ref_hash is not None
+                        and static_skips < LIVE_STATIC_SKIP_MAX_FRAMES
+                        and bin(frame_hash ^ static_ref_hash).count('1') < LIVE_STATIC_SKIP_HAMMING
+                    ):
+                        reuse_refs[idx] = infer_indices[-1] if infer_indices else -1
+                        static_skips += 1
+                    else:
+                        infer_indices.append(idx)
+                        static_ref_hash = frame_hash
+                        static_skips = 0
+
+            # Run YOLO detection (one batched forward when several frames are pending)
+            try:
+                annotated_outs = [annotated_pool.acquire(f.shape, f.dtype) for f in pending_frames]
+                infer_frames = [pending_frames[i] for i in infer_indices]
+                infer_outs = [annotated_outs[i] for i in infer_indices]
+                if len(infer_frames) == 1:
+                    inferred = [predict_image(infer_frames[0], conf=conf, annotated_out=infer_outs[0])]
+                elif infer_frames:
+                    inferred = predict_images(infer_frames, conf=conf, annotated_outs=infer_outs)
+                else:
+                    inferred = []
+            except Exception as e:
+                static_ref_hash = None
+                logger.error(f"Error processing frame: {e}")
+                continue
 
-                # Encode frame as JPEG
-                ret, buffer = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
-                if not ret:
+            batch_results = [None] * len(pending_frames)
+            for idx, result in zip(infer_indices, inferred):
+                batch_results[idx] = result
+            for idx, ref in enumerate(reuse_refs):
+                if ref is None:
                     continue
+                ref_detections = static_ref_detections if ref < 0 else batch_results[ref][0]
+                np.copyto(annotated_outs[idx], pending_frames[idx])
+                batch_results[idx] = (ref_detections, draw_detections(annotated_outs[idx], ref_detections))
+            if infer_indices:
+                static_ref_detections = batch_results[infer_indices[-1]][0]
 
-                # Pace stream frames to keep latency predictable on slower machines/networks.
-                now = time.monotonic()
-                wait_s = frame_interval - (now - last_yield_ts)
-                if wait_s > 0:
-                    time.sleep(wait_s)
+            for frame, (detections, annotated), reused in zip(pending_frames, batch_results, reuse_refs):
+                try:
+                    violation_detections = _extract_violation_detections(detections) if detections else []
+
+                    # Keep a persistent on-frame status HUD so users always see live YOLO state,
+                    # even when there are no current violation boxes.
+                    cv2.rectangle(annotated, (10, 10), (390, 72), (0, 0, 0), -1)
+                    cv2.putText(
+                        annotated,
+                        f"YOLO active | detections: {len(detections)}",
+                        (18, 36),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.62,
+                        (80, 255, 120),
+                        2,
+                        cv2.LINE_AA,
+                    )
+                    cv2.putText(
+                        annotated,
+                        f"violations: {len(violation_detections)}",
+                        (18, 62),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.56,
+                        (0, 220, 255),
+                        2,
+                        cv2.LINE_AA,
+                    )
 
-                frame_bytes = buffer.tobytes()
+                    # Log all detections for debugging
+                    if detections:
+                        detected_classes = [d['class_name'] for d in detections]
+                        logger.debug(f"Detected: {detected_classes}")
+
+                    # Check for violations in background thread (non-blocking).
+                    # Reused detections were already checked on their inferred frame.
+                    if detections and FULL_PIPELINE_AVAILABLE and reused is None:
+                        if violation_detections:
+                            # Log detected violations
+                            violation_classes = [d.get('class_name') for d in violation_detections]
+                            logger.info("=" * 80)
+                            logger.info(f" PPE VIOLATION DETECTED: {violation_classes}")
+                            logger.info(f"Caption generator available: {caption_generator is not None}")
+                            logger.info(f"Report generator available: {report_generator is not None}")
+                            logger.info(f"Violation queue available: {violation_queue is not None}")
+                            logger.info("=" * 80)
+
+                            # Use queue-based approach to prevent missing violations
+                            # enqueue_violation is fast (saves images, adds to queue)
+                            # Queue worker processes reports in background.
+                            # It persists both frames synchronously and keeps no
+                            # reference, so the pooled `annotated` buffer needs no copy.
+                            report_id = enqueue_violation(
+                                frame,
+                                detections.copy(),
+                                trigger_source='live',
+                                annotated_frame=annotated,
+                            )
+                            if report_id:
+                                logger.info(f" Violation {report_id} queued for processing")
+                            else:
+                                logger.debug("Violation not queued (cooldown or already processing)")
+
+                    # Hand off JPEG encoding so it overlaps the next inference;
+                    # stream whichever frame the encoder finished most recently.
+                    jpeg_encoder.submit(annotated)
+                    frame_bytes = jpeg_encoder.take_new()
+                    if frame_bytes is None:
+                        # Nothing new encoded yet: wake as soon as the encoder publishes,
+                        # but never past this frame's deadline, and never resend old bytes.
+                        frame_bytes = jpeg_encoder.wait_new(next_yield_deadline - time.monotonic())
+                    if frame_bytes is None:
+                        continue
 
-                # Yield frame in multipart format
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                last_yield_ts = time.monotonic()
+                    # Pace stream frames against a fixed deadline: only wait out whatever
+                    # is left of the frame budget, and wake immediately on stop.
+                    remaining_s = next_yield_deadline - time.monotonic()
+                    if remaining_s > 0:
+                        live_stream_stop_event.wait(remaining_s)
 
-            except Exception as e:
-                logger.error(f"Error processing frame: {e}")
-                continue
+                    # Yield frame in multipart format
+                    yield (b'--frame\r\n'
+                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                    # When already behind, restart the cadence from now instead of bursting.
+                    next_yield_deadline = max(next_yield_deadline + frame_interval, time.monotonic())
+
+                except Exception as e:
+                    logger.error(f"Error processing frame: {e}")
+                    continue
+
+        # Source ended: deliver the last frame still in the encoder.
+        jpeg_encoder.close()
+        frame_bytes = jpeg_encoder.take_new()
+        if frame_bytes is not None:
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
     except GeneratorExit:
         logger.info("Client disconnected from stream")
     except Exception as e:
         logger.error(f"Stream error: {e}")
     finally:
+        restore_thread_tuning()
+        jpeg_encoder.close(timeout=0.2)
         logger.info("Frame generation stopped  releasing camera")
         with camera_lock:
             _stop_live_source_locked()
@@ -16819,8 +17296,8 @@ def live_depth_status():
     """Return RealSense depth telemetry and capability details."""
     payload = _build_live_state_payload()
 
-    with camera_lock:
-        depth_telemetry = live_source_adapter.get_depth_telemetry_locked()
+    # Depth snapshots have their own lock; do not queue behind a blocking camera read.
+    depth_telemetry = live_source_adapter.get_depth_telemetry()
 
     payload['depth_telemetry'] = depth_telemetry
     return jsonify(payload)
@@ -16829,8 +17306,7 @@ def live_depth_status():
 @app.route('/api/live/depth/preview')
 def live_depth_preview():
     """Return RealSense depth preview image if available."""
-    with camera_lock:
-        preview = live_source_adapter.get_depth_preview_locked()
+    preview = live_source_adapter.get_depth_preview()
 
     if not preview:
         return Response(status=204)
@@ -16959,64 +17435,242 @@ def upload_inference():
         # Run inference
         detections, annotated = predict_image(frame, conf=conf)
 
-        # Check for violations
-        violation_detections = _extract_violation_detections(detections)
-        report_queued = False
-        report_queue_reason = None
-        queued_report_id = None
+        result = _upload_inference_result(frame, detections, annotated)
+        response_source_scope = 'local' if _is_local_pipeline_runtime_active() else 'cloud'
+        response_source_label = 'Local' if response_source_scope == 'local' else 'Cloud'
 
-        # If violations detected, use queue system (consistent with live camera)
-        if violation_detections and FULL_PIPELINE_AVAILABLE:
-            violation_types = [d['class_name'] for d in violation_detections]
-            logger.info(f" Uploaded image violation detected: {violation_types}")
+        return jsonify({
+            'success': True,
+            **result,
+            'source_scope': response_source_scope,
+            'source_label': response_source_label,
+            'local_draft_required': response_source_scope == 'local',
+        })
 
-            # Use queue system for processing (same as live camera)
-            frame_copy = frame.copy()
-            detections_copy = detections.copy()
-            queued_report_id = enqueue_violation(
-                frame_copy,
-                detections_copy,
-                trigger_source='upload',
-                annotated_frame=annotated.copy(),
-            )
-            report_queued = queued_report_id is not None
-            if report_queued:
-                logger.info(f" Violation queued for processing: {queued_report_id}")
-            else:
-                report_queue_reason = 'cooldown_or_already_processing'
-                logger.info(" Violation not queued (cooldown or already processing)")
-        elif violation_detections and not FULL_PIPELINE_AVAILABLE:
-            report_queue_reason = 'pipeline_components_unavailable'
+    except Exception as e:
+        logger.error(f"Inference error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def _upload_inference_result(frame, detections, annotated) -> Dict[str, Any]:
+    """Queue an uploaded image's violations and build its per-image response fields."""
+    # Check for violations
+    violation_detections = _extract_violation_detections(detections)
+    report_queued = False
+    report_queue_reason = None
+    queued_report_id = None
+
+    # If violations detected, use queue system (consistent with live camera)
+    if violation_detections and FULL_PIPELINE_AVAILABLE:
+        violation_types = [d['class_name'] for d in violation_detections]
+        logger.info(f" Uploaded image violation detected: {violation_types}")
+
+        # Use queue system for processing (same as live camera)
+        frame_copy = frame.copy()
+        detections_copy = detections.copy()
+        queued_report_id = enqueue_violation(
+            frame_copy,
+            detections_copy,
+            trigger_source='upload',
+            annotated_frame=annotated.copy(),
+        )
+        report_queued = queued_report_id is not None
+        if report_queued:
+            logger.info(f" Violation queued for processing: {queued_report_id}")
+        else:
+            report_queue_reason = 'cooldown_or_already_processing'
+            logger.info(" Violation not queued (cooldown or already processing)")
+    elif violation_detections and not FULL_PIPELINE_AVAILABLE:
+        report_queue_reason = 'pipeline_components_unavailable'
+
+    # Encode annotated image to base64
+    _, buffer = cv2.imencode('.jpg', annotated)
+    img_base64 = base64.b64encode(buffer).decode('utf-8')
+
+    return {
+        'detections': detections,
+        'annotated_image': f'data:image/jpeg;base64,{img_base64}',
+        'count': len(detections),
+        'violations_detected': len(violation_detections) > 0,
+        'violation_count': len(violation_detections),
+        'report_queued': report_queued,
+        'report_queue_reason': report_queue_reason,
+        'report_id': queued_report_id,
+    }
+
+
+UPLOAD_BATCH_MAX_IMAGES = max(1, int(os.getenv('UPLOAD_BATCH_MAX_IMAGES', '16')))
+
+
+@app.route('/api/inference/upload-batch', methods=['POST'])
+def upload_inference_batch():
+    """Run one batched YOLO forward over several uploaded images.
+
+    Each image gets the same result fields and report queueing as
+    /api/inference/upload; images that fail to decode are reported per item.
+    """
+    startup_gate = _startup_gate_response()
+    if startup_gate is not None:
+        return startup_gate
+
+    if not is_model_ready():
+        _prepare_live_runtime(
+            reason='upload-inference',
+            warmup_yolo_runtime=True,
+            refresh_cloud_clients=False,
+        )
+
+    files = [file for file in request.files.getlist('images') if file.filename]
+    if not files:
+        return jsonify({'error': 'No images provided'}), 400
+    if len(files) > UPLOAD_BATCH_MAX_IMAGES:
+        return jsonify({'error': f'At most {UPLOAD_BATCH_MAX_IMAGES} images per batch'}), 400
+
+    try:
+        conf = float(request.form.get('conf', 0.10))
+        frames = [
+            cv2.imdecode(np.frombuffer(file.read(), np.uint8), cv2.IMREAD_COLOR)
+            for file in files
+        ]
+        decoded = [frame for frame in frames if frame is not None]
+        inferred = iter(predict_images(decoded, conf=conf) if decoded else [])
+
+        results = []
+        for file, frame in zip(files, frames):
+            if frame is None:
+                results.append({'filename': file.filename, 'error': 'Invalid image format'})
+                continue
+            detections, annotated = next(inferred)
+            results.append({'filename': file.filename, **_upload_inference_result(frame, detections, annotated)})
 
-        # Encode annotated image to base64
-        _, buffer = cv2.imencode('.jpg', annotated)
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
         response_source_scope = 'local' if _is_local_pipeline_runtime_active() else 'cloud'
         response_source_label = 'Local' if response_source_scope == 'local' else 'Cloud'
-
         return jsonify({
             'success': True,
-            'detections': detections,
-            'annotated_image': f'data:image/jpeg;base64,{img_base64}',
-            'count': len(detections),
-            'violations_detected': len(violation_detections) > 0,
-            'violation_count': len(violation_detections),
-            'report_queued': report_queued,
-            'report_queue_reason': report_queue_reason,
-            'report_id': queued_report_id,
+            'results': results,
+            'count': len(results),
             'source_scope': response_source_scope,
             'source_label': response_source_label,
             'local_draft_required': response_source_scope == 'local',
         })
 
     except Exception as e:
-        logger.error(f"Inference error: {e}")
+        logger.error(f"Batch inference error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+# Browser live frames from several phones/tabs arrive as independent requests.
+# A single worker coalesces the ones in flight together into one predict_images()
+# forward (up to LIVE_FRAME_BATCH_MAX, waiting at most LIVE_FRAME_BATCH_WAIT_MS
+# for stragglers). A lone request never waits. LIVE_FRAME_BATCH_MAX=1 disables.
+LIVE_FRAME_BATCH_MAX = max(1, min(int(_env_float('LIVE_FRAME_BATCH_MAX', 8)), 32))
+LIVE_FRAME_BATCH_WAIT_SECONDS = max(0.0, _env_float('LIVE_FRAME_BATCH_WAIT_MS', 10.0) / 1000.0)
+# Upper bound on how long a request waits for the batch worker before running
+# its own predict_image() (covers a stalled or dead worker thread).
+LIVE_FRAME_BATCH_TIMEOUT_SECONDS = max(1.0, _env_float('LIVE_FRAME_BATCH_TIMEOUT_SECONDS', 30.0))
+
+_live_frame_batch_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_live_frame_batch_lock = threading.Lock()
+_live_frame_batch_worker: Optional[threading.Thread] = None
+# Live-frame requests that have been accepted but not yet queued their frame.
+_live_frame_requests_active = 0
+
+
+def _release_live_frame_slot(slot: Dict[str, bool]) -> None:
+    global _live_frame_requests_active
+    with _live_frame_batch_lock:
+        if slot.get('pending'):
+            slot['pending'] = False
+            _live_frame_requests_active -= 1
+
+
+def _run_live_frame_batch(items: List[Dict[str, Any]]) -> None:
+    groups: Dict[float, List[Dict[str, Any]]] = {}
+    for item in items:
+        groups.setdefault(item['conf'], []).append(item)
+    for conf, group in groups.items():
+        try:
+            frames = [item['frame'] for item in group]
+            if len(frames) == 1:
+                results = [predict_image(frames[0], conf=conf)]
+            else:
+                results = predict_images(frames, conf=conf)
+            for item, result in zip(group, results):
+                item['result'] = result
+            for item in group[len(results):]:
+                item['error'] = RuntimeError(f"predict_images returned {len(results)} results for {len(group)} frames")
+        except Exception as e:
+            for item in group:
+                item['error'] = e
+        finally:
+            for item in group:
+                item['done'].set()
+
+
+def _live_frame_batch_loop() -> None:
+    while True:
+        items = [_live_frame_batch_queue.get()]
+        deadline = time.monotonic() + LIVE_FRAME_BATCH_WAIT_SECONDS
+        while len(items) < LIVE_FRAME_BATCH_MAX:
+            try:
+                items.append(_live_frame_batch_queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            # Only wait while other live-frame requests are still decoding.
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or _live_frame_requests_active <= 0:
+                break
+            try:
+                items.append(_live_frame_batch_queue.get(timeout=min(remaining, 0.002)))
+            except queue.Empty:
+                pass
+        _run_live_frame_batch(items)
+
+
+def _predict_live_frame(frame: np.ndarray, conf: float, slot: Optional[Dict[str, bool]] = None):
+    """predict_image() for one live frame, batched with concurrent live-frame requests.
+
+    `slot` is the caller's in-flight marker; it is released as soon as the frame
+    is queued so the batcher stops waiting on requests that are past inference.
+    """
+    global _live_frame_batch_worker
+    slot = slot if slot is not None else {}
+    if LIVE_FRAME_BATCH_MAX <= 1:
+        _release_live_frame_slot(slot)
+        return predict_image(frame, conf=conf)
+    if _live_frame_batch_worker is None or not _live_frame_batch_worker.is_alive():
+        with _live_frame_batch_lock:
+            if _live_frame_batch_worker is None or not _live_frame_batch_worker.is_alive():
+                _live_frame_batch_worker = threading.Thread(
+                    target=_live_frame_batch_loop, name='LiveFrameBatcher', daemon=True
+                )
+                _live_frame_batch_worker.start()
+    item = {'frame': frame, 'conf': conf, 'done': threading.Event()}
+    _live_frame_batch_queue.put(item)
+    _release_live_frame_slot(slot)
+    if not item['done'].wait(LIVE_FRAME_BATCH_TIMEOUT_SECONDS):
+        logger.warning("Live-frame batch worker did not answer in time; running inference inline")
+        return predict_image(frame, conf=conf)
+    if 'error' in item:
+        raise item['error']
+    return item['result']
+
+
 @app.route('/api/inference/live-frame', methods=['POST'])
 def live_frame_inference():
     """Low-latency near-edge inference path for browser-owned live camera frames (phone/web)."""
+    global _live_frame_requests_active
+    slot = {'pending': True}
+    with _live_frame_batch_lock:
+        _live_frame_requests_active += 1
+    try:
+        return _live_frame_inference(slot)
+    finally:
+        _release_live_frame_slot(slot)
+
+
+def _live_frame_inference(slot: Dict[str, bool]):
     startup_gate = _startup_gate_response()
     if startup_gate is not None:
         return startup_gate
@@ -17044,7 +17698,7 @@ def live_frame_inference():
             return jsonify({'error': 'Invalid image format'}), 400
 
         conf = float(request.form.get('conf', 0.10))
-        detections, _annotated = predict_image(frame, conf=conf)
+        detections, _annotated = _predict_live_frame(frame, conf, slot)
 
         violation_detections = _extract_violation_detections(detections)
         report_queued = False
@@ -17424,6 +18078,20 @@ def system_info():
     return jsonify(info)
 
 
+@app.route('/api/system/cache-stats', methods=['GET'])
+def api_system_cache_stats():
+    """Report hit rates of the RAG query embedding cache and the on-disk LLM cache."""
+    if not FULL_PIPELINE_AVAILABLE:
+        return jsonify({'available': False, 'message': 'Report pipeline not available'}), 503
+
+    llm_cache = getattr(report_generator, 'llm_cache', None)
+    return jsonify({
+        'available': True,
+        'embedding_cache': embedding_cache_stats(),
+        'llm_cache': llm_cache.get_stats() if llm_cache is not None else None,
+    })
+
+
 @app.route('/api/system/egress', methods=['GET'])
 def api_system_egress():
     """Get Supabase storage egress usage and budget status."""
@@ -17669,7 +18337,7 @@ def not_found(e):
         return jsonify({'error': 'Not found'}), 404
     if not SERVE_FRONTEND:
         return jsonify({'error': 'Not found'}), 404
-    return send_from_directory('frontend', 'index.html')
+    return _frontend_index_response()
 
 
 @app.errorhandler(500)
@@ -18062,8 +18730,7 @@ def _load_local_mode_heartbeats_from_file() -> Dict[str, Dict[str, Any]]:
         if not path.exists():
             continue
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                payload = json.load(f)
+            payload = load_json_file(path)
             if not isinstance(payload, dict):
                 logger.warning(f"Ignoring non-dict local heartbeat payload in {path.name}")
                 continue
@@ -18141,8 +18808,7 @@ def _load_pending_devices_from_file() -> Dict[str, Dict[str, Any]]:
         if not path.exists():
             continue
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_file(path)
             if not isinstance(data, dict):
                 logger.warning(f"Ignoring non-dict pending device payload in {path.name}")
                 continue
@@ -18465,8 +19131,7 @@ def _load_bootstrap_token_state_from_file() -> Dict[str, Dict[str, str]]:
         if not path.exists():
             continue
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+            state = load_json_file(path)
             if not isinstance(state, dict):
                 logger.warning(f"Ignoring non-dict bootstrap token payload in {path.name}")
                 continue
@@ -19404,11 +20069,185 @@ def _render_installer_batch_script(
     return content, context.get('__CASM_INSTALLER_VERSION__', 'unknown')
 
 
+import concurrent.futures as _cf
 import smtplib
 import socket
+import ssl
 import threading
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+
+
+# Authenticated SMTP sessions are pooled and reused across admin
+# notifications, so a burst of device requests pays the TCP + STARTTLS + AUTH
+# handshake once per connection instead of per message. Up to
+# SMTP_POOL_MAX_CONNS sessions are kept idle; one idle for longer than
+# SMTP_POOL_IDLE_SECONDS is closed instead of reused, and a reused session is
+# health-checked with NOOP and reopened once if the server dropped it.
+SMTP_POOL_MAX_CONNS = max(1, int(_env_float('SMTP_POOL_MAX_CONNS', 4)))
+SMTP_POOL_IDLE_SECONDS = max(0.0, _env_float('SMTP_POOL_IDLE_SECONDS', 240.0))
+_admin_smtp_idle: List[Tuple[Tuple[Any, ...], Any, float]] = []
+_admin_smtp_lock = Lock()
+
+
+class _ResumingTLSContext(ssl.SSLContext):
+    """SSLContext that offers the last TLS session seen for a host on reconnect.
+
+    smtplib's starttls() has no session argument, so the saved session is
+    injected here by server hostname; a server that declines it simply does a
+    full handshake.
+    """
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None and server_hostname:
+            session = _admin_smtp_tls_sessions.get(server_hostname)
+        return super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+
+
+# Same verification policy as smtplib's default starttls() context.
+_admin_smtp_tls_context = _ResumingTLSContext(ssl.PROTOCOL_TLS_CLIENT)
+_admin_smtp_tls_context.check_hostname = False
+_admin_smtp_tls_context.verify_mode = ssl.CERT_NONE
+_admin_smtp_tls_sessions: Dict[str, Any] = {}
+
+
+_ADMIN_SMTP_ENV_KEYS = (
+    'SMTP_PORT', 'SMTP_USERNAME', 'SMTP_PASSWORD', 'SMTP_PASSWORD_STRIP_SPACES',
+    'SMTP_FORCE_IPV4', 'SMTP_TIMEOUT_SECONDS',
+)
+
+
+@lru_cache(maxsize=1)
+def _parse_admin_smtp_settings(raw_values: Tuple[Optional[str], ...]) -> Tuple[int, str, str, bool, int]:
+    port, user, password, strip_spaces, force_ipv4, timeout = raw_values
+    smtp_port = int(port or '587')
+    smtp_user = (user or '').strip()
+    smtp_pass = (password or '').strip()
+    if str(strip_spaces or 'true').strip().lower() not in {'0', 'false', 'no', 'off'}:
+        smtp_pass = smtp_pass.replace(' ', '')
+    force_ipv4_enabled = str(force_ipv4 or 'true').strip().lower() not in {'0', 'false', 'no', 'off'}
+    try:
+        timeout_seconds = max(1, int(timeout or '8'))
+    except Exception:
+        timeout_seconds = 8
+    return smtp_port, smtp_user, smtp_pass, force_ipv4_enabled, timeout_seconds
+
+
+def _admin_smtp_settings() -> Tuple[int, str, str, bool, int]:
+    """(port, user, password, force_ipv4, timeout) parsed once per distinct SMTP_* environment."""
+    return _parse_admin_smtp_settings(tuple(os.getenv(name) for name in _ADMIN_SMTP_ENV_KEYS))
+
+
+def _resolve_admin_smtp_hosts(smtp_server, smtp_port, force_ipv4) -> List[str]:
+    if not force_ipv4:
+        return [smtp_server]
+    try:
+        ipv4_hosts = []
+        for addr_info in socket.getaddrinfo(smtp_server, smtp_port, socket.AF_INET, socket.SOCK_STREAM):
+            ip_addr = str((addr_info[4] or ('',))[0] or '').strip()
+            if ip_addr and ip_addr not in ipv4_hosts:
+                ipv4_hosts.append(ip_addr)
+        if ipv4_hosts:
+            return ipv4_hosts + [smtp_server]
+    except Exception as resolve_err:
+        logger.warning(f'Failed to resolve IPv4 SMTP hosts for {smtp_server}: {resolve_err}')
+    return [smtp_server]
+
+
+def _open_admin_smtp_session(smtp_server, force_ipv4, smtp_port, smtp_user, smtp_pass, timeout_seconds):
+    # Resolution only happens here, so a notification that reuses a pooled
+    # session does no DNS lookup at all.
+    smtp_hosts = _resolve_admin_smtp_hosts(smtp_server, smtp_port, force_ipv4)
+    last_smtp_error = None
+    for smtp_host in smtp_hosts:
+        server = None
+        try:
+            server = smtplib.SMTP(smtp_host, smtp_port, timeout=timeout_seconds)
+            if smtp_host != smtp_server:
+                # Keep original host for TLS SNI/cert hostname logic.
+                server._host = smtp_server  # type: ignore[attr-defined]
+            server.ehlo()
+            server.starttls(context=_admin_smtp_tls_context)
+            server.ehlo()
+            if smtp_user and smtp_pass:
+                server.login(smtp_user, smtp_pass)
+            tls_session = getattr(getattr(server, 'sock', None), 'session', None)
+            if tls_session is not None:
+                _admin_smtp_tls_sessions[smtp_server] = tls_session
+            return server
+        except Exception as connect_err:
+            last_smtp_error = connect_err
+            logger.warning(f'Failed SMTP attempt via {smtp_host}:{smtp_port}: {connect_err}')
+            _quit_smtp_quietly(server)
+    raise last_smtp_error or smtplib.SMTPConnectError(-1, f'No SMTP host reachable for {smtp_server}')
+
+
+def _quit_smtp_quietly(server) -> None:
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+
+def _close_admin_smtp_session():
+    """Close every idle pooled SMTP session."""
+    with _admin_smtp_lock:
+        idle = list(_admin_smtp_idle)
+        _admin_smtp_idle.clear()
+    for _, server, _ in idle:
+        _quit_smtp_quietly(server)
+
+
+_atexit.register(_close_admin_smtp_session)
+
+
+def _acquire_admin_smtp_session(session_key, smtp_server, force_ipv4, smtp_port, smtp_user, smtp_pass,
+                                timeout_seconds):
+    """Check out a live pooled session for these settings, or open a new one."""
+    while True:
+        with _admin_smtp_lock:
+            index = next(
+                (i for i in range(len(_admin_smtp_idle) - 1, -1, -1) if _admin_smtp_idle[i][0] == session_key),
+                None,
+            )
+            entry = _admin_smtp_idle.pop(index) if index is not None else None
+        if entry is None:
+            break
+        _, server, idle_since = entry
+        if time.monotonic() - idle_since <= SMTP_POOL_IDLE_SECONDS:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+        _quit_smtp_quietly(server)
+    return _open_admin_smtp_session(smtp_server, force_ipv4, smtp_port, smtp_user, smtp_pass, timeout_seconds)
+
+
+def _release_admin_smtp_session(session_key, server) -> None:
+    with _admin_smtp_lock:
+        if len(_admin_smtp_idle) < SMTP_POOL_MAX_CONNS:
+            _admin_smtp_idle.append((session_key, server, time.monotonic()))
+            return
+    _quit_smtp_quietly(server)
+
+
+def _send_admin_smtp_message(msg, *, recipients, smtp_server, force_ipv4, smtp_port, smtp_user, smtp_pass, timeout_seconds):
+    session_key = (smtp_server, smtp_port, smtp_user, smtp_pass)
+    for attempt in range(2):
+        server = _acquire_admin_smtp_session(
+            session_key, smtp_server, force_ipv4, smtp_port, smtp_user, smtp_pass, timeout_seconds
+        )
+        try:
+            server.send_message(msg, to_addrs=recipients)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPException, OSError) as send_err:
+            _quit_smtp_quietly(server)
+            if attempt:
+                raise
+            logger.info(f'SMTP session dropped ({send_err}); reconnecting once')
+            continue
+        _release_admin_smtp_session(session_key, server)
+        return
 
 
 def _notify_admin_sync(machine_id, status='pending', token=None):
@@ -19450,6 +20289,9 @@ def _notify_admin_sync(machine_id, status='pending', token=None):
             logger.error(f'Failed to send webhook notification: {e}')
 
     admin_email = os.getenv('ADMIN_EMAIL', '').strip()
+    # ADMIN_EMAIL may list several addresses (comma/semicolon separated); they
+    # all get one message, i.e. one DATA with a RCPT TO per address.
+    admin_recipients = [addr.strip() for addr in re.split(r'[,;]', admin_email) if addr.strip()]
 
     resend_api_key = os.getenv('RESEND_API_KEY', '').strip()
     resend_from_email = os.getenv('RESEND_FROM_EMAIL', '').strip()
@@ -19479,7 +20321,7 @@ def _notify_admin_sync(machine_id, status='pending', token=None):
                 },
                 json={
                     'from': resend_from_email,
-                    'to': [admin_email],
+                    'to': admin_recipients,
                     'subject': subject,
                     'text': message_plain,
                 },
@@ -19497,94 +20339,67 @@ def _notify_admin_sync(machine_id, status='pending', token=None):
 
     if smtp_server and admin_email:
         try:
-            smtp_port = int(os.getenv('SMTP_PORT', '587'))
-            smtp_user = os.getenv('SMTP_USERNAME', '').strip()
-            smtp_pass = os.getenv('SMTP_PASSWORD', '').strip()
-            strip_pw_spaces = str(os.getenv('SMTP_PASSWORD_STRIP_SPACES', 'true')).strip().lower() not in {
-                '0', 'false', 'no', 'off'
-            }
-            if strip_pw_spaces:
-                smtp_pass = smtp_pass.replace(' ', '')
-
-            force_ipv4 = str(os.getenv('SMTP_FORCE_IPV4', 'true')).strip().lower() not in {
-                '0', 'false', 'no', 'off'
-            }
-            try:
-                smtp_timeout_seconds = max(1, int(os.getenv('SMTP_TIMEOUT_SECONDS', '8')))
-            except Exception:
-                smtp_timeout_seconds = 8
+            smtp_port, smtp_user, smtp_pass, force_ipv4, smtp_timeout_seconds = _admin_smtp_settings()
 
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = smtp_user or 'casm-system@localhost'
-            msg['To'] = admin_email
+            msg['To'] = ', '.join(admin_recipients)
             msg['Subject'] = subject
-            msg.attach(MIMEText(message_plain, 'plain'))
-
-            smtp_hosts = [smtp_server]
-            if force_ipv4:
-                try:
-                    ipv4_hosts = []
-                    for addr_info in socket.getaddrinfo(smtp_server, smtp_port, socket.AF_INET, socket.SOCK_STREAM):
-                        ip_addr = str((addr_info[4] or ('',))[0] or '').strip()
-                        if ip_addr and ip_addr not in ipv4_hosts:
-                            ipv4_hosts.append(ip_addr)
-                    if ipv4_hosts:
-                        smtp_hosts = ipv4_hosts + [smtp_server]
-                except Exception as resolve_err:
-                    logger.warning(f'Failed to resolve IPv4 SMTP hosts for {smtp_server}: {resolve_err}')
-
-            last_smtp_error = None
-            for smtp_host in smtp_hosts:
-                server = None
-                try:
-                    server = smtplib.SMTP(smtp_host, smtp_port, timeout=smtp_timeout_seconds)
-                    if smtp_host != smtp_server:
-                        # Keep original host for TLS SNI/cert hostname logic.
-                        server._host = smtp_server  # type: ignore[attr-defined]
-                    server.ehlo()
-                    server.starttls()
-                    server.ehlo()
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-                    server.quit()
-                    last_smtp_error = None
-                    break
-                except Exception as send_err:
-                    last_smtp_error = send_err
-                    logger.warning(f'Failed SMTP attempt via {smtp_host}:{smtp_port}: {send_err}')
-                    if server is not None:
-                        try:
-                            server.quit()
-                        except Exception:
-                            pass
-
-            if last_smtp_error is not None:
-                raise last_smtp_error
+            msg.set_content(message_plain)
+
+            _send_admin_smtp_message(
+                msg,
+                recipients=admin_recipients,
+                smtp_server=smtp_server,
+                force_ipv4=force_ipv4,
+                smtp_port=smtp_port,
+                smtp_user=smtp_user,
+                smtp_pass=smtp_pass,
+                timeout_seconds=smtp_timeout_seconds,
+            )
         except Exception as e:
             logger.error(f'Failed to send email notification: {e}')
 
 
-def notify_admin(machine_id, status='pending', token=None):
-    """Dispatch admin notifications without blocking request lifecycle."""
+# Admin notifications run on a small shared pool so device requests return
+# immediately and several emails can go out in parallel over pooled sessions.
+NOTIFICATION_WORKERS = max(1, int(_env_float('NOTIFICATION_WORKERS', 4)))
+_notification_executor: Optional[_cf.ThreadPoolExecutor] = None
+_notification_executor_lock = Lock()
+
+
+def _get_notification_executor() -> _cf.ThreadPoolExecutor:
+    global _notification_executor
+    if _notification_executor is None:
+        with _notification_executor_lock:
+            if _notification_executor is None:
+                _notification_executor = _cf.ThreadPoolExecutor(
+                    max_workers=NOTIFICATION_WORKERS,
+                    thread_name_prefix='notify-admin',
+                )
+                _atexit.register(_notification_executor.shutdown, wait=True)
+    return _notification_executor
+
+
+def notify_admin(machine_id, status='pending', token=None) -> Optional[_cf.Future]:
+    """Dispatch admin notifications without blocking request lifecycle.
+
+    Returns the pending Future when dispatched asynchronously, else None.
+    """
     async_enabled = str(os.getenv('NOTIFICATION_ASYNC', 'true')).strip().lower() not in {
         '0', 'false', 'no', 'off'
     }
 
     if not async_enabled:
         _notify_admin_sync(machine_id, status=status, token=token)
-        return
+        return None
 
     try:
-        threading.Thread(
-            target=_notify_admin_sync,
-            args=(machine_id, status, token),
-            daemon=True,
-            name='notify-admin',
-        ).start()
+        return _get_notification_executor().submit(_notify_admin_sync, machine_id, status, token)
     except Exception as e:
-        logger.error(f'Failed to start async admin notification worker: {e}')
+        logger.error(f'Failed to queue async admin notification: {e}')
         _notify_admin_sync(machine_id, status=status, token=token)
+        return None
 
 
 # ---------------------------------------------------------------------------
@@ -19605,8 +20420,7 @@ def _load_device_audit_log() -> list:
         if not DEVICE_AUDIT_LOG_FILE.exists():
             return []
         try:
-            with open(DEVICE_AUDIT_LOG_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_file(DEVICE_AUDIT_LOG_FILE)
             if isinstance(data, list):
                 return data
         except Exception as e:
@@ -19621,10 +20435,9 @@ def _append_device_audit_event(machine_id: str, event: str, actor: str = 'system
             entries = []
             if DEVICE_AUDIT_LOG_FILE.exists():
                 try:
-                    with open(DEVICE_AUDIT_LOG_FILE, 'r', encoding='utf-8') as f:
-                        loaded = json.load(f)
-                        if isinstance(loaded, list):
-                            entries = loaded
+                    loaded = load_json_file(DEVICE_AUDIT_LOG_FILE)
+                    if isinstance(loaded, list):
+                        entries = loaded
                 except Exception:
                     entries = []
 
@@ -19673,8 +20486,7 @@ def _load_assistant_session_records() -> Dict[str, Any]:
         if not ASSISTANT_SESSION_LOG_FILE.exists():
             return {}
         try:
-            with open(ASSISTANT_SESSION_LOG_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_file(ASSISTANT_SESSION_LOG_FILE)
             if isinstance(data, dict):
                 return data
         except Exception as e:
@@ -19781,8 +20593,7 @@ def _upsert_assistant_session_record(payload: Dict[str, Any], request_meta: Opti
         records = {}
         if ASSISTANT_SESSION_LOG_FILE.exists():
             try:
-                with open(ASSISTANT_SESSION_LOG_FILE, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
+                loaded = load_json_file(ASSISTANT_SESSION_LOG_FILE)
                 if isinstance(loaded, dict):
                     records = loaded
             except Exception:
@@ -20456,6 +21267,21 @@ def sync_assistant_sessions():
         return jsonify({'success': False, 'error': 'Assistant sync failed'}), 500
 
 
+@lru_cache(maxsize=None)
+def _compile_inline_template(source: str):
+    return app.jinja_env.from_string(source)
+
+
+def _render_inline_template(source: str, **context) -> str:
+    """render_template_string() that compiles each inline admin page only once.
+
+    Flask recompiles string templates on every call; the admin pages below
+    are constant strings, so their compiled Template is cached by source.
+    """
+    app.update_template_context(context)
+    return _compile_inline_template(source).render(context)
+
+
 @app.route('/admin/devices', methods=['GET', 'POST'])
 def admin_devices():
     if not ADMIN_PASSWORD:
@@ -20535,7 +21361,6 @@ def admin_devices():
     except (TypeError, ValueError):
         cleared_tokens = 0
 
-    from flask import render_template_string
     html_template = """
     <!DOCTYPE html>
     <html lang="en">
@@ -20720,7 +21545,7 @@ def admin_devices():
     </body>
     </html>
     """
-    return render_template_string(
+    return _render_inline_template(
         html_template,
         devices=devices,
         reset_all=reset_all,
@@ -20758,7 +21583,6 @@ def admin_devices_audit_log():
     if request.args.get('format') == 'json':
         return jsonify({'count': len(entries), 'entries': entries})
 
-    from flask import render_template_string
     html = """
     <!DOCTYPE html><html lang="en"><head>
       <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1">
@@ -20808,7 +21632,7 @@ def admin_devices_audit_log():
       </table>
     </div></body></html>
     """
-    return render_template_string(html, entries=entries, count=len(entries))
+    return _render_inline_template(html, entries=entries, count=len(entries))
 
 
 @app.route('/admin/assistant-sessions', methods=['GET'])
@@ -20841,7 +21665,6 @@ def admin_assistant_sessions():
             safe_entries.append(safe)
         return jsonify({'count': len(safe_entries), 'entries': safe_entries})
 
-    from flask import render_template_string
     html = """
     <!DOCTYPE html><html lang="en"><head>
       <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1">
@@ -20916,7 +21739,7 @@ def admin_assistant_sessions():
       </main>
     </body></html>
     """
-    return render_template_string(html, entries=entries)
+    return _render_inline_template(html, entries=entries)
 
 
 @app.route('/admin/devices/quick-approve', methods=['GET'])
@@ -20958,7 +21781,6 @@ def admin_devices_quick_approve():
 
     installer_request_link = f"/api/bootstrap/installer/request?machine_id={quote(machine_id)}"
 
-    from flask import render_template_string
     html_template = """
     <!DOCTYPE html>
     <html lang="en">
@@ -21011,7 +21833,7 @@ def admin_devices_quick_approve():
     </body>
     </html>
     """
-    return render_template_string(
+    return _render_inline_template(
         html_template,
         machine_id=machine_id,
         installer_request_link=installer_request_link,
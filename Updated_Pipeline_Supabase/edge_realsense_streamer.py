@@ -9,6 +9,7 @@ import argparse
 import json
 import signal
 import sys
+import threading
 import time
 from typing import Dict, Optional
 
@@ -79,6 +80,101 @@ def _encode_color_frame(frame, jpeg_quality: int) -> Optional[bytes]:
     return encoded.tobytes()
 
 
+class _LatestFrame:
+    """Single-slot mailbox holding the newest captured frame."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+
+    def publish(self, frame) -> None:
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def wait_newer(self, seq: int, timeout: float):
+        """Block until a frame newer than `seq` is published; return `(seq, frame)`."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq, timeout=timeout)
+            return self._seq, self._frame
+
+
+def _upload_loop(args, ingest_url: str, source, latest: _LatestFrame, stop_event, stats) -> None:
+    session = requests.Session()
+    headers = _build_headers(args.token)
+    verify_tls = not bool(args.insecure)
+
+    send_interval = 1.0 / max(1.0, float(args.upload_fps))
+    next_send_at = 0.0
+    last_status_at = 0.0
+    seen_seq = 0
+
+    while not stop_event.is_set():
+        # Honour the upload rate first, then take whichever frame is newest.
+        remaining = next_send_at - time.monotonic()
+        if remaining > 0 and stop_event.wait(remaining):
+            break
+        seq, frame = latest.wait_newer(seen_seq, timeout=1.0)
+        if seq == seen_seq or frame is None:
+            continue
+        seen_seq = seq
+
+        color_jpeg = _encode_color_frame(frame, args.jpeg_quality)
+        if not color_jpeg:
+            stats["errors"] += 1
+            continue
+
+        depth_telemetry = source.get_depth_telemetry()
+        depth_preview = source.get_depth_preview_jpeg()
+        capabilities = source.get_capabilities()
+
+        files = {
+            "frame": ("frame.jpg", color_jpeg, "image/jpeg"),
+        }
+        if depth_preview:
+            files["depth_preview"] = ("depth_preview.jpg", depth_preview, "image/jpeg")
+
+        payload = {
+            "device_name": source.device_name or "Intel RealSense (Edge Relay)",
+            "depth_telemetry": json.dumps(depth_telemetry),
+            "capabilities": json.dumps(capabilities),
+        }
+
+        try:
+            response = session.post(
+                ingest_url,
+                data=payload,
+                files=files,
+                headers=headers,
+                timeout=(3.0, 10.0),
+                verify=verify_tls,
+            )
+
+            if response.status_code >= 300:
+                stats["errors"] += 1
+                if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
+                    preview = response.text[:220].replace("\n", " ")
+                    print(f"WARN: ingest failed ({response.status_code}): {preview}")
+                    last_status_at = time.monotonic()
+            else:
+                stats["sent"] += 1
+                if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
+                    depth_center = depth_telemetry.get("center_distance_m")
+                    depth_info = f"center={depth_center}m" if depth_center is not None else "center=unknown"
+                    print(f"OK: sent={stats['sent']}, errors={stats['errors']}, {depth_info}")
+                    last_status_at = time.monotonic()
+
+        except Exception as exc:
+            stats["errors"] += 1
+            if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
+                print(f"WARN: upload exception: {exc}")
+                last_status_at = time.monotonic()
+
+        next_send_at = time.monotonic() + send_interval
+
+
 def main() -> int:
     args = _parse_args()
     base_url = _normalize_base_url(args.backend_url)
@@ -102,100 +198,50 @@ def main() -> int:
 
     print(f"RealSense started: {source.device_name or 'Intel RealSense'}")
 
-    running = True
+    stop_event = threading.Event()
 
     def _handle_signal(_signum, _frame):
-        nonlocal running
-        running = False
+        stop_event.set()
 
     signal.signal(signal.SIGINT, _handle_signal)
     signal.signal(signal.SIGTERM, _handle_signal)
 
-    session = requests.Session()
-    headers = _build_headers(args.token)
-    verify_tls = not bool(args.insecure)
+    latest = _LatestFrame()
+    stats = {"sent": 0, "errors": 0}
+    uploader = threading.Thread(
+        target=_upload_loop,
+        args=(args, ingest_url, source, latest, stop_event, stats),
+        daemon=True,
+        name="edge-realsense-upload",
+    )
+    uploader.start()
 
-    send_interval = 1.0 / max(1.0, float(args.upload_fps))
-    next_send_at = 0.0
     last_status_at = 0.0
-    sent_count = 0
-    error_count = 0
-
     try:
-        while running:
+        # Capture runs at camera rate and only publishes the newest frame; the
+        # uploader wakes on publish instead of polling, so a slow POST never
+        # stalls the RealSense pipeline.
+        while not stop_event.is_set():
             ok, frame, read_error = source.read()
             if not ok or frame is None:
-                error_count += 1
+                stats["errors"] += 1
                 if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
                     print(f"WARN: read failed: {read_error or 'unknown'}")
                     last_status_at = time.monotonic()
-                time.sleep(0.03)
-                continue
-
-            now = time.monotonic()
-            if now < next_send_at:
-                time.sleep(min(0.01, next_send_at - now))
-                continue
-
-            color_jpeg = _encode_color_frame(frame, args.jpeg_quality)
-            if not color_jpeg:
-                error_count += 1
+                stop_event.wait(0.03)
                 continue
-
-            depth_telemetry = source.get_depth_telemetry()
-            depth_preview = source.get_depth_preview_jpeg()
-            capabilities = source.get_capabilities()
-
-            files = {
-                "frame": ("frame.jpg", color_jpeg, "image/jpeg"),
-            }
-            if depth_preview:
-                files["depth_preview"] = ("depth_preview.jpg", depth_preview, "image/jpeg")
-
-            payload = {
-                "device_name": source.device_name or "Intel RealSense (Edge Relay)",
-                "depth_telemetry": json.dumps(depth_telemetry),
-                "capabilities": json.dumps(capabilities),
-            }
-
-            try:
-                response = session.post(
-                    ingest_url,
-                    data=payload,
-                    files=files,
-                    headers=headers,
-                    timeout=(3.0, 10.0),
-                    verify=verify_tls,
-                )
-
-                if response.status_code >= 300:
-                    error_count += 1
-                    if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
-                        preview = response.text[:220].replace("\n", " ")
-                        print(f"WARN: ingest failed ({response.status_code}): {preview}")
-                        last_status_at = time.monotonic()
-                else:
-                    sent_count += 1
-                    if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
-                        depth_center = depth_telemetry.get("center_distance_m")
-                        depth_info = f"center={depth_center}m" if depth_center is not None else "center=unknown"
-                        print(f"OK: sent={sent_count}, errors={error_count}, {depth_info}")
-                        last_status_at = time.monotonic()
-
-            except Exception as exc:
-                error_count += 1
-                if (time.monotonic() - last_status_at) >= max(1.0, float(args.status_interval)):
-                    print(f"WARN: upload exception: {exc}")
-                    last_status_at = time.monotonic()
-
-            next_send_at = time.monotonic() + send_interval
+            latest.publish(frame)
 
     finally:
+        stop_event.set()
+        latest.publish(None)
+        uploader.join(timeout=15.0)
         try:
             source.stop()
         except Exception:
             pass
 
+    sent_count, error_count = stats["sent"], stats["errors"]
     print(f"Stopped edge relay. Sent={sent_count}, errors={error_count}")
     return 0
 
@@ -3,6 +3,8 @@ Small helper to run a single-image inference against the project's YOLO model.
 
 Provides:
 - predict_image(input_image, model_path=None, conf=0.25, imgsz=640)
+- predict_images(input_images, model_path=None, conf=0.25, imgsz=640)  (one batched forward)
+- draw_detections(frame, detections)  (in-place OpenCV box/label drawing)
 
 Input:
 - input_image: either a file path (str), bytes, or a numpy.ndarray (BGR or RGB).
@@ -26,6 +28,7 @@ python infer_image.py path/to/image.jpg
 
 from typing import Tuple, List, Union
 import cv2
+import logging
 import numpy as np
 import os
 from pathlib import Path
@@ -40,6 +43,7 @@ _cached_model_path = None
 _cached_yolo_class = None
 _cached_model_lock = Lock()
 _cached_model_warm_paths = set()
+_cached_model_warm_shapes = set()
 try:
     _YOLO_PREDICT_MAX_CONCURRENCY = int(os.getenv('YOLO_PREDICT_MAX_CONCURRENCY', '1') or '1')
 except (TypeError, ValueError):
@@ -47,6 +51,59 @@ except (TypeError, ValueError):
 _YOLO_PREDICT_MAX_CONCURRENCY = max(1, min(_YOLO_PREDICT_MAX_CONCURRENCY, 4))
 _yolo_predict_semaphore = Semaphore(_YOLO_PREDICT_MAX_CONCURRENCY)
 
+# Inference backend: 'pytorch' runs the .pt weights directly, 'tensorrt' exports
+# (once) and runs a TensorRT engine cached next to the weights on CUDA hosts.
+_YOLO_BACKEND = (os.getenv('YOLO_BACKEND', 'pytorch') or 'pytorch').strip().lower()
+# Engine precision: 'fp16' (default) or 'int8'. INT8 needs a calibration dataset
+# YAML (YOLO_INT8_CALIB_DATA) whose images are representative live frames.
+_YOLO_ENGINE_PRECISION = (os.getenv('YOLO_ENGINE_PRECISION', 'fp16') or 'fp16').strip().lower()
+_YOLO_INT8_CALIB_DATA = (os.getenv('YOLO_INT8_CALIB_DATA', '') or '').strip()
+try:
+    _YOLO_ENGINE_IMGSZ = int(os.getenv('YOLO_ENGINE_IMGSZ', '640') or '640')
+except (TypeError, ValueError):
+    _YOLO_ENGINE_IMGSZ = 640
+# Max batch of the TensorRT engine. Above 1 the engine is exported with dynamic
+# batch so micro-batched live frames run as one forward; defaults to the live
+# stream's LIVE_INFERENCE_BATCH so the engine matches how it is driven.
+try:
+    _YOLO_ENGINE_BATCH = int(os.getenv('YOLO_ENGINE_BATCH') or os.getenv('LIVE_INFERENCE_BATCH', '1') or '1')
+except (TypeError, ValueError):
+    _YOLO_ENGINE_BATCH = 1
+_YOLO_ENGINE_BATCH = max(1, min(_YOLO_ENGINE_BATCH, 16))
+_cached_model_imgsz = None
+_cached_model_max_batch = None
+# Positional class-name tuple of the last model decoded, so per-frame detection
+# decoding indexes it directly instead of re-sorting model.names every call.
+_cached_class_names = (None, ())
+
+# Optional GPU preprocessing: upload the raw BGR frame once and letterbox it on
+# CUDA into a reused buffer instead of resizing on the CPU before the H2D copy.
+_YOLO_GPU_PREPROCESS = os.getenv('YOLO_GPU_PREPROCESS', 'false').lower() in ('1', 'true', 'yes', 'on')
+_YOLO_STRIDE = 32
+_gpu_letterbox_buffers = {}
+_gpu_pinned_staging = {}
+# The buffers above are shared, and _yolo_predict_semaphore admits up to
+# YOLO_PREDICT_MAX_CONCURRENCY predicts at once, so a letterboxed tensor is
+# guarded by this lock from the time it is filled until model.predict returns.
+_gpu_letterbox_lock = Lock()
+
+# cuDNN autotuning pays off for the fixed-size live stream; disable for highly
+# variable input sizes (each new shape triggers a fresh autotune).
+_YOLO_CUDNN_BENCHMARK = os.getenv('YOLO_CUDNN_BENCHMARK', 'true').lower() in ('1', 'true', 'yes', 'on')
+_torch_backends_configured = False
+
+# FP16 inference on CUDA (ignored on CPU). The model's precision is fixed the first
+# time the predictor is set up, so every predict/warmup call must pass the same value.
+_YOLO_HALF = os.getenv('YOLO_HALF', 'true').lower() in ('1', 'true', 'yes', 'on')
+_cuda_available_cache = None
+
+# Optional torch.compile of the PyTorch graph (CUDA Graphs with 'reduce-overhead').
+# Off by default: compilation adds startup time and only pays off for fixed shapes.
+_YOLO_COMPILE = os.getenv('YOLO_COMPILE', 'false').lower() in ('1', 'true', 'yes', 'on')
+_YOLO_COMPILE_MODE = (os.getenv('YOLO_COMPILE_MODE', 'reduce-overhead') or 'reduce-overhead').strip()
+
+logger = logging.getLogger(__name__)
+
 
 def _get_yolo_class():
     """Import YOLO lazily so lightweight tests can import this module without torch startup."""
@@ -66,20 +123,200 @@ def _get_yolo_class():
     return _cached_yolo_class
 
 
+def _cuda_available() -> bool:
+    global _cuda_available_cache
+    if _cuda_available_cache is None:
+        try:
+            import torch
+            _cuda_available_cache = bool(torch.cuda.is_available())
+        except Exception:
+            _cuda_available_cache = False
+    return _cuda_available_cache
+
+
+def _use_half() -> bool:
+    """Run FP16 only on CUDA; TensorRT engines already carry their own precision."""
+    return _YOLO_HALF and _cached_model_imgsz is None and _cuda_available()
+
+
+def _configure_torch_backends() -> None:
+    """Enable TF32 tensor-core matmuls and cuDNN autotuning once per process."""
+    global _torch_backends_configured
+    if _torch_backends_configured:
+        return
+    _torch_backends_configured = True
+
+    try:
+        import torch
+        torch.set_float32_matmul_precision('high')
+        if torch.cuda.is_available():
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cudnn.benchmark = _YOLO_CUDNN_BENCHMARK
+    except Exception as exc:
+        logger.debug(f"Skipping torch backend tuning: {exc}")
+
+
+def _resolve_engine_path(yolo_class, resolved_model_path: str) -> Union[str, None]:
+    """Return a TensorRT engine for the weights, exporting it on first use.
+
+    FP16 engines are cached as `<weights>.engine`, INT8 engines as
+    `<weights>.int8.engine`, and dynamic-batch builds add `.b<N>` (e.g.
+    `<weights>.int8.b8.engine`) so differently built engines can coexist.
+    INT8 without a calibration dataset falls back to FP16. Returns None when
+    the TensorRT backend is disabled or unavailable so callers fall back to
+    the PyTorch weights.
+    """
+    if _YOLO_BACKEND != 'tensorrt' or not resolved_model_path.endswith('.pt'):
+        return None
+    if not _cuda_available():
+        logger.info("YOLO_BACKEND=tensorrt requested but CUDA is unavailable; using PyTorch weights")
+        return None
+
+    int8 = _YOLO_ENGINE_PRECISION == 'int8'
+    if int8 and not (_YOLO_INT8_CALIB_DATA and os.path.exists(_YOLO_INT8_CALIB_DATA)):
+        logger.warning("YOLO_ENGINE_PRECISION=int8 needs YOLO_INT8_CALIB_DATA; exporting FP16 engine instead")
+        int8 = False
+
+    weights_path = Path(resolved_model_path)
+    engine_suffix = ('.int8' if int8 else '') + (f'.b{_YOLO_ENGINE_BATCH}' if _YOLO_ENGINE_BATCH > 1 else '')
+    engine_path = weights_path.with_suffix(engine_suffix + '.engine')
+    if engine_path.exists():
+        return str(engine_path)
+
+    export_kwargs = {'int8': True, 'data': _YOLO_INT8_CALIB_DATA} if int8 else {'half': True}
+    if _YOLO_ENGINE_BATCH > 1:
+        export_kwargs.update(dynamic=True, batch=_YOLO_ENGINE_BATCH)
+    try:
+        logger.info(
+            f"Exporting TensorRT {'INT8' if int8 else 'FP16'} engine for {resolved_model_path} "
+            f"(imgsz={_YOLO_ENGINE_IMGSZ}, batch={_YOLO_ENGINE_BATCH})"
+        )
+        exported = yolo_class(resolved_model_path).export(
+            format='engine',
+            imgsz=_YOLO_ENGINE_IMGSZ,
+            device=0,
+            workspace=4,
+            verbose=False,
+            **export_kwargs,
+        )
+    except Exception as exc:
+        logger.warning(f"TensorRT export failed, using PyTorch weights: {exc}")
+        return None
+
+    # Ultralytics always writes `<weights>.engine`; move INT8 / dynamic builds
+    # aside so a later run with other settings does not silently pick them up.
+    exported_path = Path(str(exported)) if exported else weights_path.with_suffix('.engine')
+    if exported_path.exists() and exported_path != engine_path:
+        exported_path = exported_path.replace(engine_path)
+    return str(exported_path) if exported_path.exists() else None
+
+
+def _maybe_compile_model(model) -> None:
+    """Wrap the underlying nn.Module with torch.compile when YOLO_COMPILE is enabled."""
+    if not _YOLO_COMPILE or not _cuda_available():
+        return
+    try:
+        import torch
+        model.model = torch.compile(model.model, mode=_YOLO_COMPILE_MODE, fullgraph=False)
+        logger.info(f"YOLO model compiled with torch.compile (mode={_YOLO_COMPILE_MODE})")
+    except Exception as exc:
+        logger.warning(f"torch.compile unavailable, running eager model: {exc}")
+
+
 def _ensure_model_loaded(resolved_model_path: str):
     """Load and cache the YOLO model once per resolved weights path."""
-    global _cached_model, _cached_model_path
+    global _cached_model, _cached_model_path, _cached_model_imgsz, _cached_model_max_batch
 
     with _cached_model_lock:
         if _cached_model is None or _cached_model_path != resolved_model_path:
             yolo_class = _get_yolo_class()
-            _cached_model = yolo_class(resolved_model_path)
+            _configure_torch_backends()
+            engine_path = _resolve_engine_path(yolo_class, resolved_model_path)
+            if engine_path:
+                _cached_model = yolo_class(engine_path, task='detect')
+                # TensorRT engines have fixed input bindings; always predict at the export size
+                # and never exceed the exported max batch.
+                _cached_model_imgsz = _YOLO_ENGINE_IMGSZ
+                _cached_model_max_batch = _YOLO_ENGINE_BATCH
+            else:
+                _cached_model = yolo_class(resolved_model_path)
+                _cached_model_imgsz = None
+                _cached_model_max_batch = None
+                _maybe_compile_model(_cached_model)
             _cached_model_path = resolved_model_path
             _cached_model_warm_paths.discard(resolved_model_path)
+            _cached_model_warm_shapes.clear()
 
         return _cached_model
 
 
+def _effective_imgsz(imgsz: int) -> int:
+    """Pin inference size to the engine binding shape when a TensorRT engine is loaded."""
+    return _cached_model_imgsz or imgsz
+
+
+def _gpu_letterbox(img: np.ndarray, imgsz: int):
+    """Letterbox a BGR uint8 frame on the GPU.
+
+    Returns `(tensor, ratio, (pad_x, pad_y))` where `tensor` is a reused
+    (1, 3, H, W) float32 RGB buffer in [0, 1], or None when CUDA is unavailable.
+    Callers must hold `_gpu_letterbox_lock` while the buffer is in use.
+    """
+    return _gpu_letterbox_batch([img], imgsz)
+
+
+def _gpu_letterbox_batch(imgs: List[np.ndarray], imgsz: int):
+    """Letterbox same-shaped BGR uint8 frames on the GPU in one upload.
+
+    Frames are staged in a reused pinned host buffer so the host-to-device copy
+    is a single asynchronous DMA, then resized into a reused (B, 3, H, W)
+    float32 RGB buffer. Returns `(tensor, ratio, (pad_x, pad_y))` shared by all
+    frames, or None when CUDA is unavailable or the shapes differ.
+    Callers must hold `_gpu_letterbox_lock` while the buffers are in use.
+    """
+    if not _YOLO_GPU_PREPROCESS or not _cuda_available() or not imgs:
+        return None
+    h, w = imgs[0].shape[:2]
+    if any(img.shape != imgs[0].shape for img in imgs):
+        return None
+
+    import torch
+    import torch.nn.functional as F
+
+    n = len(imgs)
+    ratio = min(imgsz / h, imgsz / w)
+    new_h, new_w = int(round(h * ratio)), int(round(w * ratio))
+    if _cached_model_imgsz:
+        # TensorRT bindings are square and fixed.
+        out_h = out_w = imgsz
+    else:
+        out_h = int(np.ceil(new_h / _YOLO_STRIDE) * _YOLO_STRIDE)
+        out_w = int(np.ceil(new_w / _YOLO_STRIDE) * _YOLO_STRIDE)
+    pad_x, pad_y = (out_w - new_w) // 2, (out_h - new_h) // 2
+
+    buf = _gpu_letterbox_buffers.get((out_h, out_w))
+    if buf is None or buf.shape[0] < n:
+        buf = torch.empty((n, 3, out_h, out_w), device='cuda', dtype=torch.float32)
+        _gpu_letterbox_buffers[(out_h, out_w)] = buf
+    buf = buf[:n]
+    buf.fill_(114 / 255.0)
+
+    staging = _gpu_pinned_staging.get((h, w))
+    if staging is None or staging.shape[0] < n:
+        staging = torch.empty((n, h, w, 3), dtype=torch.uint8).pin_memory()
+        _gpu_pinned_staging[(h, w)] = staging
+    staging_np = staging.numpy()
+    for i, img in enumerate(imgs):
+        np.copyto(staging_np[i], img)
+
+    src = staging[:n].to('cuda', non_blocking=True)
+    src = src.permute(0, 3, 1, 2).flip(1).float().div_(255.0)  # NHWC BGR -> NCHW RGB
+    resized = F.interpolate(src, size=(new_h, new_w), mode='bilinear', align_corners=False)
+    buf[:, :, pad_y:pad_y + new_h, pad_x:pad_x + new_w].copy_(resized)
+    return buf, ratio, (pad_x, pad_y)
+
+
 def resolve_model_path(model_path: str = None) -> str:
     """Resolve YOLO weights path across local/hosted working-directory layouts."""
     script_dir = Path(__file__).resolve().parent
@@ -160,17 +397,40 @@ def warmup_model(
     model_path: str = None,
     conf: float = 0.25,
     imgsz: int = 640,
+    frame_shape: Tuple[int, int] = None,
+    iterations: int = 1,
 ) -> str:
-    """Load the YOLO weights and run a tiny dummy inference once."""
+    """Load the YOLO weights and run a tiny dummy inference once.
+
+    With `frame_shape` (height, width) the dummy frame goes through
+    `predict_image` at that exact shape `iterations` times, so cuDNN autotuning
+    and lazy CUDA initialisation for the live stream's input size happen here
+    rather than on the first real frame. Each (weights, shape) pair is warmed once.
+    """
     resolved_model_path = resolve_model_path(model_path)
 
+    if frame_shape is not None:
+        warm_key = (resolved_model_path, int(frame_shape[0]), int(frame_shape[1]))
+        with _cached_model_lock:
+            if warm_key in _cached_model_warm_shapes:
+                return resolved_model_path
+        dummy = np.zeros((warm_key[1], warm_key[2], 3), dtype=np.uint8)
+        for _ in range(max(1, int(iterations))):
+            predict_image(dummy, model_path=resolved_model_path, conf=0.99, imgsz=imgsz)
+        with _cached_model_lock:
+            _cached_model_warm_shapes.add(warm_key)
+            _cached_model_warm_paths.add(resolved_model_path)
+        return resolved_model_path
+
     with _cached_model_lock:
         if resolved_model_path in _cached_model_warm_paths:
             return resolved_model_path
 
     model = _ensure_model_loaded(resolved_model_path)
+    imgsz = _effective_imgsz(imgsz)
     dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
-    model.predict(dummy, imgsz=imgsz, conf=conf, iou=0.45, half=False, verbose=False)
+    for _ in range(max(1, int(iterations))):
+        model.predict(dummy, imgsz=imgsz, conf=conf, iou=0.45, half=_use_half(), verbose=False)
 
     with _cached_model_lock:
         _cached_model_warm_paths.add(resolved_model_path)
@@ -178,16 +438,113 @@ def warmup_model(
     return resolved_model_path
 
 
+def _model_class_names(model) -> Tuple[str, ...]:
+    """Class names indexed by class id, built once per loaded model."""
+    global _cached_class_names
+
+    cached_model, cached_names = _cached_class_names
+    if model is cached_model:
+        return cached_names
+    if isinstance(model.names, dict):
+        # dict mapping may not be positional; build tuple by sorted keys
+        names = tuple(model.names[k] for k in sorted(model.names.keys()))
+    else:
+        names = tuple(model.names)
+    _cached_class_names = (model, names)
+    return names
+
+
+def _annotation_canvas(img: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Copy `img` into the caller's preallocated `out` buffer when it fits, else allocate."""
+    if out is not None and out.shape == img.shape and out.dtype == img.dtype:
+        np.copyto(out, img)
+        return out
+    return img.copy()
+
+
+def _unletterbox_boxes(xyxy: np.ndarray, letterbox, shape) -> np.ndarray:
+    """Map (N, 4) letterboxed xyxy boxes back to image coordinates in one fused pass.
+
+    Works in place on a float32 copy: subtract pads, divide by the ratio, then
+    clip against a per-column upper bound, without fancy-index temporaries.
+    """
+    ratio, (pad_x, pad_y) = letterbox
+    h, w = shape
+    boxes = np.array(xyxy, dtype=np.float32, copy=True)
+    boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+    boxes *= np.float32(1.0 / ratio)
+    np.clip(boxes, 0.0, np.array([w, h, w, h], dtype=np.float32), out=boxes)
+    return boxes
+
+
+def _detections_from_result(res, img: np.ndarray, names: Tuple[str, ...],
+                            letterbox=None, out: np.ndarray = None) -> Tuple[List[dict], np.ndarray]:
+    """Convert one Ultralytics result into detection dicts and an annotated copy of `img`.
+
+    `letterbox` is the `(ratio, (pad_x, pad_y))` used for GPU preprocessing; boxes
+    are mapped back from the letterboxed tensor to `img` coordinates. When `out`
+    is given the annotation is drawn into it instead of a fresh copy.
+    """
+    detections = []
+    annotated = _annotation_canvas(img, out)
+
+    if res is None or not hasattr(res, 'boxes') or len(res.boxes) == 0:
+        return detections, annotated
+
+    boxes = res.boxes
+    xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes, 'xyxy') else np.array([])
+    confs = boxes.conf.cpu().numpy() if hasattr(boxes, 'conf') else np.array([])
+    clses = boxes.cls.cpu().numpy().astype(int) if hasattr(boxes, 'cls') else np.array([])
+
+    if letterbox is not None and len(xyxy):
+        xyxy = _unletterbox_boxes(xyxy, letterbox, img.shape[:2])
+
+    # Convert whole columns once instead of casting every element in the loop.
+    boxes_list = np.asarray(xyxy).astype(np.int64).tolist()
+    scores_list = np.asarray(confs, dtype=np.float64).tolist()
+    class_ids = np.asarray(clses).astype(np.int64).tolist()
+    num_names = len(names)
+
+    for bbox, sc, cls_id in zip(boxes_list, scores_list, class_ids):
+        class_name = names[cls_id] if cls_id < num_names else str(cls_id)
+        detections.append({'bbox': bbox, 'score': sc, 'class_name': class_name, 'class_id': cls_id})
+
+    draw_detections(annotated, detections)
+    return detections, annotated
+
+
+# BGR colors indexed by class id so a class keeps its color from frame to frame.
+_CLASS_PALETTE = ((0,255,0), (0,0,255), (255,0,0), (0,255,255), (255,0,255), (255,255,0))
+_LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def draw_detections(frame: np.ndarray, detections: List[dict]) -> np.ndarray:
+    """Draw boxes and `class score` labels in place with plain OpenCV primitives."""
+    palette_size = len(_CLASS_PALETTE)
+    for det in detections:
+        x1, y1, x2, y2 = det['bbox']
+        color = _CLASS_PALETTE[det['class_id'] % palette_size]
+        label = f"{det['class_name']} {det['score']:.2f}"
+        (text_w, text_h), _ = cv2.getTextSize(label, _LABEL_FONT, 0.6, 1)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.rectangle(frame, (x1, y1 - text_h - 6), (x1 + text_w + 6, y1), color, -1)
+        cv2.putText(frame, label, (x1 + 3, y1 - 4), _LABEL_FONT, 0.6, (0,0,0), 1, cv2.LINE_AA)
+    return frame
+
+
 def predict_image(input_image: Union[str, bytes, np.ndarray],
                   model_path: str = None,
                   conf: float = 0.25,
-                  imgsz: int = 640) -> Tuple[List[dict], np.ndarray]:
+                  imgsz: int = 640,
+                  annotated_out: np.ndarray = None) -> Tuple[List[dict], np.ndarray]:
     """Run inference on a single image and return detections + annotated image.
 
     Contract:
     - Loads YOLO model from `model_path` or project's default.
     - Returns detections list and annotated BGR image.
     - Does not write any files.
+    - If `annotated_out` matches the image shape/dtype, the annotated image is
+      drawn into (and returned as) that buffer instead of a new allocation.
 
     Edge cases:
     - Raises ValueError for unreadable inputs.
@@ -202,54 +559,115 @@ def predict_image(input_image: Union[str, bytes, np.ndarray],
     if img.dtype != np.uint8:
         img = img.astype(np.uint8)
 
-    # perform prediction with half=False to avoid dtype mismatch
+    # perform prediction in FP16 on CUDA (input is uint8, so no dtype mismatch)
     # Note: Default conf=0.25 reduces false positives (especially hardhat/hair confusion)
     # Can be overridden by caller if needed, but 0.25 is recommended for PPE detection
+    letterbox = None
+    letterbox_locked = False
     _yolo_predict_semaphore.acquire()
     try:
-        results = model.predict(img, imgsz=imgsz, conf=conf, iou=0.45, half=False, verbose=False)
+        source = img
+        if _YOLO_GPU_PREPROCESS:
+            _gpu_letterbox_lock.acquire()
+            letterbox_locked = True
+            try:
+                prepared = _gpu_letterbox(img, _effective_imgsz(imgsz))
+            except Exception as exc:
+                logger.debug(f"GPU letterbox failed, using CPU preprocessing: {exc}")
+                prepared = None
+            if prepared is not None:
+                source, ratio, pads = prepared
+                letterbox = (ratio, pads)
+            else:
+                _gpu_letterbox_lock.release()
+                letterbox_locked = False
+        results = model.predict(source, imgsz=_effective_imgsz(imgsz), conf=conf, iou=0.45, half=_use_half(), verbose=False)
     finally:
+        if letterbox_locked:
+            _gpu_letterbox_lock.release()
         _yolo_predict_semaphore.release()
-    detections = []
-    annotated = img.copy()
 
     if len(results) == 0:
-        return detections, annotated
+        return [], _annotation_canvas(img, annotated_out)
 
-    res = results[0]
-    if not hasattr(res, 'boxes') or len(res.boxes) == 0:
-        return detections, annotated
+    return _detections_from_result(
+        results[0], img, _model_class_names(model), letterbox=letterbox, out=annotated_out
+    )
 
-    boxes = res.boxes
-    xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes, 'xyxy') else np.array([])
-    confs = boxes.conf.cpu().numpy() if hasattr(boxes, 'conf') else np.array([])
-    clses = boxes.cls.cpu().numpy().astype(int) if hasattr(boxes, 'cls') else np.array([])
 
-    # color palette
-    palette = [(0,255,0), (0,0,255), (255,0,0), (0,255,255), (255,0,255), (255,255,0)]
+def predict_images(input_images: List[Union[str, bytes, np.ndarray]],
+                   model_path: str = None,
+                   conf: float = 0.25,
+                   imgsz: int = 640,
+                   annotated_outs: List[np.ndarray] = None) -> List[Tuple[List[dict], np.ndarray]]:
+    """Run one batched inference over several images.
 
-    names = []
-    if isinstance(model.names, dict):
-        # dict mapping may not be positional; build list by sorted keys
-        names = [model.names[k] for k in sorted(model.names.keys())]
-    else:
-        names = list(model.names)
-
-    for i, (bb, sc, cls_id) in enumerate(zip(xyxy, confs, clses)):
-        x1, y1, x2, y2 = map(int, bb)
-        class_name = names[int(cls_id)] if int(cls_id) < len(names) else str(cls_id)
-        det = {'bbox': [x1, y1, x2, y2], 'score': float(sc), 'class_name': class_name, 'class_id': int(cls_id)}
-        detections.append(det)
-
-        # draw on annotated image
-        color = palette[i % len(palette)]
-        cv2.rectangle(annotated, (x1,y1), (x2,y2), color, 2)
-        label = f"{class_name} {sc:.2f}"
-        t_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
-        cv2.rectangle(annotated, (x1, y1 - t_size[1] - 6), (x1 + t_size[0] + 6, y1), color, -1)
-        cv2.putText(annotated, label, (x1 + 3, y1 - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,0), 1, cv2.LINE_AA)
+    Same per-image contract as `predict_image`, but all images go through a
+    single `model.predict` call so the forward pass is batched on the GPU.
+    Returns one `(detections, annotated_image)` tuple per input, in order.
+    `annotated_outs` optionally supplies one preallocated buffer per input.
+    """
+    if not input_images:
+        return []
 
-    return detections, annotated
+    imgs = []
+    for input_image in input_images:
+        img = _read_image(input_image)
+        if img.dtype != np.uint8:
+            img = img.astype(np.uint8)
+        imgs.append(img)
+
+    resolved_model_path = resolve_model_path(model_path)
+    model = _ensure_model_loaded(resolved_model_path)
+
+    letterbox = None
+    letterbox_locked = False
+    _yolo_predict_semaphore.acquire()
+    try:
+        source = imgs
+        if _YOLO_GPU_PREPROCESS:
+            _gpu_letterbox_lock.acquire()
+            letterbox_locked = True
+            try:
+                prepared = _gpu_letterbox_batch(imgs, _effective_imgsz(imgsz))
+            except Exception as exc:
+                logger.debug(f"GPU batch letterbox failed, using CPU preprocessing: {exc}")
+                prepared = None
+            if prepared is not None:
+                source, ratio, pads = prepared
+                letterbox = (ratio, pads)
+            else:
+                _gpu_letterbox_lock.release()
+                letterbox_locked = False
+        # TensorRT engines accept at most their exported batch; split larger batches.
+        max_batch = _cached_model_max_batch or len(imgs)
+        results = []
+        for start in range(0, len(imgs), max_batch):
+            results.extend(model.predict(
+                source[start:start + max_batch],
+                imgsz=_effective_imgsz(imgsz),
+                conf=conf,
+                iou=0.45,
+                half=_use_half(),
+                verbose=False,
+            ) or [])
+    finally:
+        if letterbox_locked:
+            _gpu_letterbox_lock.release()
+        _yolo_predict_semaphore.release()
+
+    names = _model_class_names(model)
+    outs = list(annotated_outs or [])
+    return [
+        _detections_from_result(
+            results[i] if i < len(results) else None,
+            img,
+            names,
+            letterbox=letterbox,
+            out=outs[i] if i < len(outs) else None,
+        )
+        for i, img in enumerate(imgs)
+    ]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,76 @@
+"""
+Flask JSON provider backed by orjson.
+
+Large dashboard payloads (/api/violations, /api/stats) spend most of their
+response time in stdlib json encoding. When orjson is installed this provider
+serialises jsonify() responses with it; otherwise, and for any value orjson
+rejects (e.g. integers wider than 64 bits), Flask's default encoder is used.
+Output keeps Flask's conventions: sorted keys, HTTP-date datetimes.
+
+load_json_file() is the matching reader for the per-report metadata.json
+sidecars that listing endpoints parse on every request.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with an orjson fast path for dumps()."""
+
+    def _orjson_option(self, kwargs):
+        """Map the dumps() kwargs Flask passes onto orjson options, or None if orjson can't honour them."""
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        remaining = dict(kwargs)
+        # response() passes compact separators (orjson's only output) or indent=2 in debug.
+        if tuple(remaining.pop('separators', (',', ':'))) != (',', ':'):
+            return None
+        indent = remaining.pop('indent', None)
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            return None
+        if remaining.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return None if remaining else option
+
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(kwargs) if orjson is not None else None
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj, **kwargs)
+
+
+def install_orjson_provider(app) -> None:
+    """Route app.json (and so jsonify) through OrjsonProvider."""
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+
+
+def load_json_file(path):
+    """Parse a UTF-8 JSON file, via orjson when available.
+
+    Files orjson rejects but the stdlib accepts (NaN/Infinity literals written
+    by json.dump) fall back to json.loads.
+    """
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
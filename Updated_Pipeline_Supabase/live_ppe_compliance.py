@@ -1,6 +1,19 @@
 from ultralytics import YOLO
 import cv2
 import numpy as np
+import logging
+import os
+import threading
+import time
+
+# Per-frame and per-detection output is DEBUG level, so the default INFO level
+# keeps the inference loop free of console I/O; set LIVE_PPE_LOG_LEVEL=DEBUG
+# to trace class mapping.
+logging.basicConfig(
+    level=os.getenv('LIVE_PPE_LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger('live_ppe_compliance')
 
 # Load your best model
 model = YOLO('Results/ppe_yolov86/weights/best.pt')
@@ -62,84 +75,158 @@ random.seed(42)
 for cls in PROJECT_CLASSES:
     COLOR_MAP[cls] = tuple(int(x) for x in np.array([random.randint(0,255) for _ in range(3)]))
 
-DEBUG = True
-if DEBUG:
-    # model.names can be a dict or list; build a stable list for printing
+DEBUG = logger.isEnabledFor(logging.DEBUG)
+if logger.isEnabledFor(logging.INFO):
+    # model.names can be a dict or list; build a stable list for logging
     if isinstance(model.names, dict):
         names_list = [model.names[k] for k in sorted(model.names.keys())]
     else:
         names_list = list(model.names)
-    print('Model class list:')
+    logger.info('Model class list:')
     for i, n in enumerate(names_list):
-        print(f'  id={i} name="{n}" norm="{_norm(n)}"')
-    print('Starting live inference. Press q to quit.')
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print('Frame read failed, exiting')
-        break
-
-    # Run model on the frame
-    results = model.predict(frame, imgsz=640, conf=0.25, iou=0.45)
-    # results is a list; take first element
-    if len(results) == 0:
-        cv2.imshow('PPE Live', frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        logger.info('  id=%d name="%s" norm="%s"', i, n, _norm(n))
+logger.info('Starting live inference. Press q to quit.')
+
+
+# Latest annotated frame handed from the inference thread to the display loop.
+# The main thread only paints (imshow/waitKey), so window events are never
+# stuck behind YOLO and UI refresh is decoupled from inference FPS.
+class LatestFrame:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self.closed = False
+        # Smoothed gap between published frames, i.e. the source cadence.
+        self.last_frame_ts = None
+        self.frame_interval = 1.0 / 30.0
+
+    def publish(self, frame):
+        with self._cond:
+            now = time.monotonic()
+            if self.last_frame_ts is not None:
+                self.frame_interval += 0.2 * ((now - self.last_frame_ts) - self.frame_interval)
+            self.last_frame_ts = now
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def next_wait(self, min_wait=0.005, max_wait=0.1):
+        """Seconds until the next frame is expected, clamped so window events keep flowing."""
+        with self._cond:
+            if self.last_frame_ts is None:
+                return max_wait
+            remaining = self.frame_interval - (time.monotonic() - self.last_frame_ts)
+        if remaining <= 0:
+            # Frame is overdue; publish() will wake the waiter when it lands.
+            return max_wait
+        return min(max(remaining, min_wait), max_wait)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def wait_newer(self, seq, timeout):
+        """Return (seq, frame) once a frame newer than `seq` exists, or on timeout/close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq or self.closed, timeout)
+            return self._seq, self._frame
+
+
+def inference_loop(stop_event, latest):
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            logger.error('Frame read failed, exiting')
             break
-        continue
-
-    res = results[0]
-    person_boxes = []
-    ppe_boxes = {c: [] for c in PROJECT_CLASSES if c != 'Person'}
-
-    if hasattr(res, 'boxes') and len(res.boxes) > 0:
-        boxes = res.boxes
-        xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes, 'xyxy') else np.array([])
-        confs = boxes.conf.cpu().numpy() if hasattr(boxes, 'conf') else np.array([])
-        clses = boxes.cls.cpu().numpy().astype(int) if hasattr(boxes, 'cls') else np.array([])
-
-        for bb, conf, cls in zip(xyxy, confs, clses):
-            x1, y1, x2, y2 = map(int, bb)
-            src_name = model.names[int(cls)]
-            norm = _norm(src_name)
-            # Map to project name using exact norm or heuristics
-            mapped = find_project_name(norm)
-            if mapped is None:
-                # fallback to original src_name if nothing matches
-                target_name = src_name
+
+        # Run model on the frame
+        results = model.predict(frame, imgsz=640, conf=0.25, iou=0.45)
+        # results is a list; take first element
+        if len(results) == 0:
+            latest.publish(frame)
+            continue
+
+        res = results[0]
+        person_boxes = []
+        ppe_boxes = {c: [] for c in PROJECT_CLASSES if c != 'Person'}
+
+        if hasattr(res, 'boxes') and len(res.boxes) > 0:
+            boxes = res.boxes
+            xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes, 'xyxy') else np.array([])
+            confs = boxes.conf.cpu().numpy() if hasattr(boxes, 'conf') else np.array([])
+            clses = boxes.cls.cpu().numpy().astype(int) if hasattr(boxes, 'cls') else np.array([])
+
+            for bb, conf, cls in zip(xyxy, confs, clses):
+                x1, y1, x2, y2 = map(int, bb)
+                src_name = model.names[int(cls)]
+                norm = _norm(src_name)
+                # Map to project name using exact norm or heuristics
+                mapped = find_project_name(norm)
+                if mapped is None:
+                    # fallback to original src_name if nothing matches
+                    target_name = src_name
+                    if DEBUG:
+                        logger.debug("No project mapping for '%s' (norm='%s'), using source name", src_name, norm)
+                else:
+                    target_name = mapped
+                    if DEBUG and _norm(target_name) != norm:
+                        logger.debug("Mapped '%s' (norm=%s) -> '%s'", src_name, norm, target_name)
+
                 if DEBUG:
-                    print(f"[DEBUG] No project mapping for '{src_name}' (norm='{norm}'), using source name")
-            else:
-                target_name = mapped
-                if DEBUG and _norm(target_name) != norm:
-                    print(f"[DEBUG] Mapped '{src_name}' (norm={norm}) -> '{target_name}'")
-
-            if DEBUG:
-                print(f"[DETECT] cls={cls} src='{src_name}' norm='{norm}' mapped='{target_name}' conf={conf:.2f}")
-
-            # store boxes for later logic
-            if target_name == 'Person' or _norm(target_name) == _norm('Person'):
-                person_boxes.append((x1,y1,x2,y2, conf, target_name))
-            else:
-                ppe_boxes.setdefault(target_name, []).append((x1,y1,x2,y2, conf, target_name))
-
-            # Draw box and label for all mapped classes
-            color = COLOR_MAP.get(target_name, (0,255,0))
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-            label = f"{target_name} {conf:.2f}"
-            t_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
-            cv2.rectangle(frame, (x1, y1 - t_size[1] - 6), (x1 + t_size[0] + 6, y1), color, -1)
-            cv2.putText(frame, label, (x1 + 3, y1 - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,0), 1, cv2.LINE_AA)
-
-    # Optional: print counts per frame
-    print('--- New Frame ---')
-    print(f'Found {len(person_boxes)} persons.')
-    for ppe_item, items in ppe_boxes.items():
-        print(f'Found {len(items)} of {ppe_item}')
-
-    cv2.imshow('PPE Live', frame)
+                    logger.debug(
+                        "[DETECT] cls=%s src='%s' norm='%s' mapped='%s' conf=%.2f",
+                        cls, src_name, norm, target_name, conf,
+                    )
+
+                # store boxes for later logic
+                if target_name == 'Person' or _norm(target_name) == _norm('Person'):
+                    person_boxes.append((x1,y1,x2,y2, conf, target_name))
+                else:
+                    ppe_boxes.setdefault(target_name, []).append((x1,y1,x2,y2, conf, target_name))
+
+                # Draw box and label for all mapped classes
+                color = COLOR_MAP.get(target_name, (0,255,0))
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                label = f"{target_name} {conf:.2f}"
+                t_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
+                cv2.rectangle(frame, (x1, y1 - t_size[1] - 6), (x1 + t_size[0] + 6, y1), color, -1)
+                cv2.putText(frame, label, (x1 + 3, y1 - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,0), 1, cv2.LINE_AA)
+
+        # Optional: per-frame counts
+        if DEBUG:
+            logger.debug(
+                'Frame: %d persons; %s',
+                len(person_boxes),
+                ', '.join(f'{len(items)} {ppe_item}' for ppe_item, items in ppe_boxes.items()),
+            )
+
+        latest.publish(frame)
+
+    latest.close()
+
+
+stop_event = threading.Event()
+latest = LatestFrame()
+worker = threading.Thread(target=inference_loop, args=(stop_event, latest), name='ppe-inference', daemon=True)
+worker.start()
+
+# Display loop: paint whatever is newest and keep pumping window events even
+# while the next inference is still running. The wait is paced to the measured
+# frame cadence and returns early as soon as a new frame is published.
+shown_seq = 0
+while True:
+    seq, frame = latest.wait_newer(shown_seq, timeout=latest.next_wait())
+    if frame is not None and seq != shown_seq:
+        cv2.imshow('PPE Live', frame)
+        shown_seq = seq
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
+    if latest.closed and seq == shown_seq:
+        break
 
+stop_event.set()
+worker.join(timeout=5)
 cap.release()
 cv2.destroyAllWindows()
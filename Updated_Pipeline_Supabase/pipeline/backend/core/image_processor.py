@@ -16,9 +16,11 @@ Usage:
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-from typing import List, Dict, Any, Tuple, Union, Optional
+from typing import List, Dict, Any, Tuple, Union, Optional, Sequence
 from pathlib import Path
 import sys
 
@@ -34,6 +36,98 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Fastest baseline JPEG settings for the OpenCV fallback encoder.
+_CV2_JPEG_FAST_PARAMS = [cv2.IMWRITE_JPEG_OPTIMIZE, 0, cv2.IMWRITE_JPEG_PROGRESSIVE, 0]
+
+# libjpeg-turbo encoder; None until first use, False when unavailable.
+_turbo_jpeg = None
+_jpeg_lock = threading.Lock()
+_jpeg_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_turbo_jpeg():
+    global _turbo_jpeg
+    if _turbo_jpeg is None:
+        with _jpeg_lock:
+            if _turbo_jpeg is None:
+                try:
+                    from turbojpeg import TurboJPEG
+                    _turbo_jpeg = TurboJPEG()
+                except Exception as e:
+                    logger.info(f"TurboJPEG unavailable, using OpenCV JPEG encoder: {e}")
+                    _turbo_jpeg = False
+    return _turbo_jpeg or None
+
+
+def _get_jpeg_executor() -> ThreadPoolExecutor:
+    global _jpeg_executor
+    if _jpeg_executor is None:
+        with _jpeg_lock:
+            if _jpeg_executor is None:
+                _jpeg_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='JpegWriter')
+    return _jpeg_executor
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 95) -> Optional[bytes]:
+    """Encode a BGR image to JPEG bytes, preferring libjpeg-turbo when installed."""
+    encoder = _get_turbo_jpeg()
+    if encoder is not None:
+        try:
+            from turbojpeg import TJPF_BGR, TJSAMP_420
+            return encoder.encode(
+                np.ascontiguousarray(image),
+                quality=int(quality),
+                pixel_format=TJPF_BGR,
+                jpeg_subsample=TJSAMP_420,
+            )
+        except Exception as e:
+            logger.debug(f"TurboJPEG encode failed, falling back to OpenCV: {e}")
+
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(quality), *_CV2_JPEG_FAST_PARAMS])
+    return buffer.tobytes() if ok else None
+
+
+def _write_jpeg(image: np.ndarray, path: Path, quality: int) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() not in ('.jpg', '.jpeg'):
+        # Other formats (.png, ...) keep cv2.imwrite's extension-based encoding.
+        return bool(cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)]))
+    data = encode_jpeg(image, quality)
+    if not data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def write_jpegs(items: Sequence[Tuple[np.ndarray, Union[str, Path]]], quality: int = 95) -> List[bool]:
+    """
+    Encode and write several JPEGs concurrently.
+    
+    Both encoders release the GIL, so e.g. original.jpg and annotated.jpg are
+    compressed in parallel. Returns once every file is on disk, so callers may
+    reuse the source buffers and hand the paths on immediately. Paths without a
+    .jpg/.jpeg suffix are written by cv2.imwrite in their own format.
+    
+    Returns:
+        One success flag per item
+    """
+    paths = [Path(path) for _, path in items]
+    if len(items) == 1:
+        futures = None
+    else:
+        executor = _get_jpeg_executor()
+        futures = [executor.submit(_write_jpeg, image, path, quality) for (image, _), path in zip(items, paths)]
+    
+    results = []
+    for index, path in enumerate(paths):
+        try:
+            ok = futures[index].result() if futures else _write_jpeg(items[index][0], path, quality)
+        except Exception as e:
+            logger.error(f"Error saving image {path}: {e}")
+            ok = False
+        results.append(ok)
+    return results
+
 
 class ImageProcessor:
     """
@@ -213,34 +307,53 @@ class ImageProcessor:
         overlay = frame.copy()
         height, width = overlay.shape[:2]
         
-        # Semi-transparent background for text
-        overlay_bg = overlay.copy()
-        cv2.rectangle(
-            overlay_bg,
-            (10, 10),
-            (300, 100),
-            (0, 0, 0),
-            -1
-        )
-        cv2.addWeighted(overlay_bg, 0.6, overlay, 0.4, 0, overlay)
+        # Semi-transparent background for text: 60% black over the panel.
+        panel = overlay[10:101, 10:301]
+        overlay[10:101, 10:301] = cv2.convertScaleAbs(panel, alpha=0.4)
         
-        # Add text
+        # Text only changes when a value ticks, so its anti-aliased coverage
+        # mask is rendered once per distinct text and alpha-blended in.
+        texts = tuple(f"{key}: {value}" for key, value in info.items())
+        ys, xs, alpha = self._get_info_overlay_layer(texts, height, width)
+        if alpha.size:
+            pixels = overlay[ys, xs].astype(np.float32)
+            pixels += (255.0 - pixels) * alpha
+            overlay[ys, xs] = (pixels + 0.5).astype(np.uint8)
+        
+        return overlay
+    
+    def _get_info_overlay_layer(
+        self,
+        texts: Tuple[str, ...],
+        height: int,
+        width: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (rows, cols, alpha) of the rendered info text, cached per text and frame size."""
+        cache_key = (texts, height, width)
+        cached = getattr(self, '_info_overlay_cache', None)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
+        mask = np.zeros((height, width), dtype=np.uint8)
         y_offset = 30
-        for key, value in info.items():
-            text = f"{key}: {value}"
+        for text in texts:
             cv2.putText(
-                overlay,
+                mask,
                 text,
                 (20, y_offset),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.6,
-                (255, 255, 255),
+                255,
                 2,
                 cv2.LINE_AA
             )
             y_offset += 25
         
-        return overlay
+        ys, xs = np.nonzero(mask)
+        alpha = (mask[ys, xs].astype(np.float32) / 255.0)[:, None]
+        layer = (ys, xs, alpha)
+        self._info_overlay_cache = (cache_key, layer)
+        return layer
     
     # =========================================================================
     # UTILITY FUNCTIONS
@@ -292,22 +405,27 @@ class ImageProcessor:
         Returns:
             True if successful
         """
-        try:
-            path = Path(path)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            
-            cv2.imwrite(
-                str(path),
-                image,
-                [cv2.IMWRITE_JPEG_QUALITY, quality]
-            )
-            
+        ok = write_jpegs([(image, path)], quality)[0]
+        if ok:
             logger.debug(f"Image saved: {path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving image: {e}")
-            return False
+        return ok
+    
+    def save_images(
+        self,
+        items: Sequence[Tuple[np.ndarray, Union[str, Path]]],
+        quality: int = 95
+    ) -> List[bool]:
+        """
+        Save several images to disk, encoding them concurrently.
+        
+        Args:
+            items: (image, path) pairs
+            quality: JPEG quality (1-100)
+        
+        Returns:
+            One success flag per item
+        """
+        return write_jpegs(items, quality)
 
 
 # =============================================================================
@@ -20,7 +20,11 @@ class LiveSourceAdapter:
     """Small adapter that normalizes live camera source lifecycle operations."""
 
     def __init__(self):
+        # `lock` guards the capture source and is held across blocking frame reads;
+        # `preview_lock` only guards the small depth preview/telemetry snapshot so
+        # preview readers never wait behind a camera read.
         self.lock = Lock()
+        self.preview_lock = Lock()
         self.active_camera = None
         self.active_camera_source = 'webcam'
         self.active_camera_index = 0
@@ -69,6 +73,25 @@ class LiveSourceAdapter:
         except Exception:
             warmup_sleep = 0.06
         self.webcam_start_warmup_sleep_seconds = max(0.0, min(warmup_sleep, 0.5))
+        # When inference runs slower than the camera, frames queue up in the driver.
+        # Before reading, grab (without decoding) up to this many stale frames so the
+        # stream always analyses the newest one. 0 disables the drain.
+        try:
+            stale_grab_limit = int(os.getenv('WEBCAM_STALE_GRAB_LIMIT', '4'))
+        except Exception:
+            stale_grab_limit = 4
+        self.webcam_stale_grab_limit = max(0, min(stale_grab_limit, 30))
+        self._last_webcam_read_ts = 0.0
+        # Ask USB webcams for compressed MJPG instead of raw YUY2 so 720p30 fits the
+        # USB bus without the camera silently dropping frame rate.
+        self.webcam_prefer_mjpg = os.getenv('WEBCAM_PREFER_MJPG', 'true').lower() in (
+            '1', 'true', 'yes', 'on'
+        )
+        # Let the capture backend decode MJPG/H.264 on the GPU (MSMF/D3D11, FFmpeg
+        # VAAPI/CUDA) where OpenCV supports it; backends without support ignore it.
+        self.webcam_hw_decode = os.getenv('WEBCAM_HW_DECODE', 'false').lower() in (
+            '1', 'true', 'yes', 'on'
+        )
         try:
             stale_value = float(os.getenv('EDGE_REALSENSE_STALE_SECONDS', '4'))
         except Exception:
@@ -163,6 +186,34 @@ class LiveSourceAdapter:
 
         return False, None
 
+    # A buffered frame is returned by grab() almost immediately; a grab that blocks
+    # longer than this waited for a fresh exposure, so the backlog is drained.
+    _STALE_GRAB_BLOCK_SECONDS = 0.008
+    # Only drain when the caller was away for at least this long (about two 30 fps frames).
+    _STALE_GRAB_MIN_IDLE_SECONDS = 0.066
+
+    def _grab_latest_webcam_frame(self, cap) -> Tuple[bool, Optional[Any]]:
+        """Skip frames that queued up since the last read and decode only the newest."""
+        if self.webcam_stale_grab_limit <= 0:
+            return False, None
+        if time.monotonic() - self._last_webcam_read_ts < self._STALE_GRAB_MIN_IDLE_SECONDS:
+            return False, None
+
+        grabbed = False
+        try:
+            for _ in range(self.webcam_stale_grab_limit):
+                started = time.monotonic()
+                if not cap.grab():
+                    break
+                grabbed = True
+                if time.monotonic() - started > self._STALE_GRAB_BLOCK_SECONDS:
+                    break
+            if not grabbed:
+                return False, None
+            return cap.retrieve()
+        except Exception:
+            return False, None
+
     def _is_webcam_capture_ready(self, cap, *, attempts: Optional[int] = None) -> bool:
         ok, _ = self._read_webcam_frame_with_retries(
             cap,
@@ -230,12 +281,13 @@ class LiveSourceAdapter:
         if isinstance(depth_telemetry, dict):
             telemetry = self._default_depth_telemetry()
             telemetry.update(depth_telemetry)
-            self.edge_realsense_depth_telemetry = telemetry
         else:
-            self.edge_realsense_depth_telemetry = self._default_depth_telemetry()
+            telemetry = self._default_depth_telemetry()
 
-        if depth_preview_jpeg:
-            self.edge_realsense_depth_preview_jpeg = depth_preview_jpeg
+        with self.preview_lock:
+            self.edge_realsense_depth_telemetry = telemetry
+            if depth_preview_jpeg:
+                self.edge_realsense_depth_preview_jpeg = depth_preview_jpeg
 
         if isinstance(capabilities, dict):
             caps = dict(self.edge_realsense_capabilities)
@@ -246,6 +298,21 @@ class LiveSourceAdapter:
         self._webcam_probe_cache_ts = time.monotonic()
         return self._build_edge_realsense_snapshot_locked()
 
+    def _create_capture(self, camera_index: int, backend: Optional[int] = None, probe_mode: bool = False):
+        """Construct a VideoCapture, requesting hardware decode for real (non-probe) opens."""
+        if backend is None:
+            backend = getattr(cv2, 'CAP_ANY', 0)
+        if self.webcam_hw_decode and not probe_mode and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            try:
+                return cv2.VideoCapture(
+                    camera_index,
+                    backend,
+                    [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+                )
+            except Exception:
+                pass
+        return cv2.VideoCapture(camera_index, backend)
+
     def _open_webcam(self, camera_index: int, probe_mode: bool = False):
         """Open webcam with backend fallbacks while keeping probe noise low on Windows."""
         cap = None
@@ -273,7 +340,7 @@ class LiveSourceAdapter:
                     continue
 
                 try:
-                    cap = cv2.VideoCapture(camera_index, backend)
+                    cap = self._create_capture(camera_index, backend, probe_mode=probe_mode)
                 except Exception:
                     cap = None
 
@@ -311,7 +378,7 @@ class LiveSourceAdapter:
             if self._is_backend_suppressed(camera_index, 'any'):
                 return None
 
-            cap = cv2.VideoCapture(camera_index)
+            cap = self._create_capture(camera_index, probe_mode=probe_mode)
 
         if cap is not None and cap.isOpened():
             self._mark_backend_success(camera_index, 'any')
@@ -598,6 +665,9 @@ class LiveSourceAdapter:
 
         # Keep webcam buffer small to avoid stale-frame lag in annotated stream.
         try:
+            if self.webcam_prefer_mjpg:
+                # FOURCC must be set before the frame size for most UVC drivers.
+                self.active_camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
             self.active_camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             self.active_camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
             self.active_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
@@ -639,8 +709,11 @@ class LiveSourceAdapter:
         if self.active_camera is None or not self.active_camera.isOpened():
             return False, None, 'Webcam is not opened'
 
-        ok, frame = self._read_webcam_frame_with_retries(self.active_camera, delay_seconds=0.02)
+        ok, frame = self._grab_latest_webcam_frame(self.active_camera)
+        if not ok or frame is None:
+            ok, frame = self._read_webcam_frame_with_retries(self.active_camera, delay_seconds=0.02)
         if ok:
+            self._last_webcam_read_ts = time.monotonic()
             return True, frame, None
 
         # A single self-heal attempt handles transient Windows capture stalls.
@@ -658,32 +731,50 @@ class LiveSourceAdapter:
                 delay_seconds=self.webcam_start_warmup_sleep_seconds,
             )
             if ok:
+                self._last_webcam_read_ts = time.monotonic()
                 return True, frame, None
         else:
             self.active_camera = reopened
 
         return False, None, 'Failed to read webcam frame'
 
-    def get_depth_telemetry_locked(self) -> Dict[str, Any]:
-        """Get depth telemetry for active RealSense source (lock must be held)."""
-        if self.active_camera_source == 'realsense' and self.active_realsense_source is not None:
-            return self.active_realsense_source.get_depth_telemetry()
+    def get_depth_telemetry(self) -> Dict[str, Any]:
+        """Get depth telemetry for the active RealSense source without the capture lock."""
+        source = self.active_camera_source
+        realsense_source = self.active_realsense_source
+        if source == 'realsense' and realsense_source is not None:
+            return realsense_source.get_depth_telemetry()
 
-        if self.active_camera_source == 'edge_realsense':
-            return dict(self.edge_realsense_depth_telemetry)
+        if source == 'edge_realsense':
+            with self.preview_lock:
+                return dict(self.edge_realsense_depth_telemetry)
 
         return self._default_depth_telemetry()
 
-    def get_depth_preview_locked(self):
-        """Get latest depth preview jpeg for active RealSense source (lock must be held)."""
-        if self.active_camera_source == 'realsense' and self.active_realsense_source is not None:
-            return self.active_realsense_source.get_depth_preview_jpeg()
+    def get_depth_preview(self):
+        """Get latest depth preview jpeg for the active RealSense source without the capture lock.
 
-        if self.active_camera_source == 'edge_realsense':
-            return self.edge_realsense_depth_preview_jpeg
+        JPEG bytes are immutable, so the cached object is returned directly.
+        """
+        source = self.active_camera_source
+        realsense_source = self.active_realsense_source
+        if source == 'realsense' and realsense_source is not None:
+            return realsense_source.get_depth_preview_jpeg()
+
+        if source == 'edge_realsense':
+            with self.preview_lock:
+                return self.edge_realsense_depth_preview_jpeg
 
         return None
 
+    def get_depth_telemetry_locked(self) -> Dict[str, Any]:
+        """Get depth telemetry for active RealSense source (lock must be held)."""
+        return self.get_depth_telemetry()
+
+    def get_depth_preview_locked(self):
+        """Get latest depth preview jpeg for active RealSense source (lock must be held)."""
+        return self.get_depth_preview()
+
     def build_state_payload(self, force_webcam_refresh: bool = False) -> Dict[str, Any]:
         """Build live state payload consumed by frontend controls."""
         with self.lock:
@@ -21,14 +21,16 @@ import logging
 import threading
 import queue
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Callable
 from dataclasses import dataclass
 from enum import Enum
-import cv2
 import numpy as np
 from pathlib import Path
 
+from .image_processor import write_jpegs
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,6 +64,15 @@ class ViolationEvent:
     report_id: str  # Unique ID for this violation
 
 
+@dataclass(slots=True)
+class PipelineStats:
+    """Running counters; slotted so per-event updates are attribute stores, not dict probes."""
+    total_violations: int = 0
+    total_reports: int = 0
+    errors: int = 0
+    start_time: Optional[datetime] = None
+
+
 # =============================================================================
 # PIPELINE ORCHESTRATOR
 # =============================================================================
@@ -114,16 +125,29 @@ class PipelineOrchestrator:
         self.processing_thread: Optional[threading.Thread] = None
         self.should_stop = threading.Event()
         
-        # Statistics
-        self.stats = {
-            'total_violations': 0,
-            'total_reports': 0,
-            'start_time': None,
-            'errors': 0
-        }
+        # Report workers: caption/NLP/report jobs run off the processing thread
+        # so a slow LLM call never holds up the next violation. The semaphore
+        # keeps at most `report_workers` jobs in flight, leaving backpressure
+        # on the bounded violation queue.
+        self.report_workers = max(1, int(config.get('VIOLATION_RULES', {}).get('report_workers', 2)))
+        self._report_executor: Optional[ThreadPoolExecutor] = None
+        self._report_slots = threading.BoundedSemaphore(self.report_workers)
+        self.pending_reports: Dict[str, Future] = {}
+        self._pending_reports_lock = threading.Lock()
+        # Jobs inside _process_violation_event; detection resumes when it drops to 0.
+        self._active_report_jobs = 0
+        
+        # Statistics (counters are bumped from the detection thread and every report worker)
+        self.stats = PipelineStats()
+        self._stats_lock = threading.Lock()
         
         logger.info("Pipeline Orchestrator initialized")
     
+    def _increment_stat(self, name: str):
+        """Add one to a PipelineStats counter (thread-safe)."""
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+    
     # =========================================================================
     # STATE MANAGEMENT
     # =========================================================================
@@ -273,7 +297,11 @@ class PipelineOrchestrator:
         
         # Reset
         self.should_stop.clear()
-        self.stats['start_time'] = datetime.now()
+        self.stats.start_time = datetime.now()
+        self._report_executor = ThreadPoolExecutor(
+            max_workers=self.report_workers,
+            thread_name_prefix="PipelineReportWorker"
+        )
         
         # Start processing thread
         self.processing_thread = threading.Thread(
@@ -304,6 +332,11 @@ class PipelineOrchestrator:
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=5)
         
+        # In-flight reports finish in the background; queued ones are dropped.
+        if self._report_executor:
+            self._report_executor.shutdown(wait=False, cancel_futures=True)
+            self._report_executor = None
+        
         self.set_state(PipelineState.STOPPED)
         logger.info("[OK] Pipeline stopped")
     
@@ -389,7 +422,7 @@ class PipelineOrchestrator:
         # Add to queue
         try:
             self.violation_queue.put_nowait(event)
-            self.stats['total_violations'] += 1
+            self._increment_stat('total_violations')
             
             logger.warning(f"[!] VIOLATION DETECTED: {event.violation_summary}")
             
@@ -403,8 +436,9 @@ class PipelineOrchestrator:
                 'timestamp': event.timestamp.isoformat()
             })
             
-            # Pause YOLO stream (user requirement: pause on violation)
-            if self.yolo_stream:
+            # Pause YOLO stream (user requirement: pause on violation). With
+            # several report workers detection keeps running so jobs overlap.
+            if self.yolo_stream and self.report_workers == 1:
                 self.yolo_stream.pause()
             
             self.set_state(PipelineState.VIOLATION_DETECTED)
@@ -426,20 +460,26 @@ class PipelineOrchestrator:
         
         while not self.should_stop.is_set():
             try:
-                # Wait for violation event (timeout to check should_stop)
-                event = self.violation_queue.get(timeout=1)
+                # Wait for a free report worker before taking the next event
+                if not self._report_slots.acquire(timeout=1):
+                    continue
                 
-                # Process the violation
-                self._process_violation_event(event)
+                # Wait for violation event (timeout to check should_stop)
+                try:
+                    event = self.violation_queue.get(timeout=1)
+                except queue.Empty:
+                    self._report_slots.release()
+                    raise
                 
-                self.violation_queue.task_done()
+                # Process the violation on a report worker
+                self._submit_violation_event(event)
                 
             except queue.Empty:
                 # No violations in queue, continue waiting
                 continue
             except Exception as e:
                 logger.error(f"Error in processing loop: {e}", exc_info=True)
-                self.stats['errors'] += 1
+                self._increment_stat('errors')
                 self._trigger_callbacks('on_error', {
                     'error': str(e),
                     'context': 'processing_loop'
@@ -447,6 +487,50 @@ class PipelineOrchestrator:
         
         logger.info("Processing loop stopped")
     
+    def _submit_violation_event(self, event: ViolationEvent):
+        """Hand a violation event to the report workers, tracked by report_id."""
+        executor = self._report_executor
+        if executor is None:
+            try:
+                self._process_violation_event(event)
+            finally:
+                self._report_slots.release()
+                self.violation_queue.task_done()
+            return
+        
+        try:
+            future = executor.submit(self._process_violation_event, event)
+        except RuntimeError:
+            # Executor shut down between stop() and this event
+            self._report_slots.release()
+            self.violation_queue.task_done()
+            raise
+        with self._pending_reports_lock:
+            self.pending_reports[event.report_id] = future
+        future.add_done_callback(
+            lambda done, report_id=event.report_id: self._on_report_job_done(report_id, done)
+        )
+    
+    def _on_report_job_done(self, report_id: str, future: Future):
+        """Reconcile a finished report job and free its worker slot."""
+        with self._pending_reports_lock:
+            self.pending_reports.pop(report_id, None)
+        self._report_slots.release()
+        self.violation_queue.task_done()
+        
+        if future.cancelled():
+            logger.warning(f"Report job cancelled: {report_id}")
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Report job failed for {report_id}: {error}")
+            self._increment_stat('errors')
+            self._trigger_callbacks('on_error', {
+                'error': str(error),
+                'report_id': report_id,
+                'context': 'report_worker'
+            })
+    
     def _process_violation_event(self, event: ViolationEvent):
         """
         Process a violation event through the entire pipeline.
@@ -462,6 +546,8 @@ class PipelineOrchestrator:
         Args:
             event: ViolationEvent to process
         """
+        with self._pending_reports_lock:
+            self._active_report_jobs += 1
         self.set_state(PipelineState.PROCESSING)
         
         logger.info(f"Processing violation: {event.report_id}")
@@ -479,8 +565,10 @@ class PipelineOrchestrator:
             original_path = violation_dir / 'original.jpg'
             annotated_path = violation_dir / 'annotated.jpg'
             
-            cv2.imwrite(str(original_path), event.frame_original)
-            cv2.imwrite(str(annotated_path), event.frame_annotated)
+            write_jpegs([
+                (event.frame_original, original_path),
+                (event.frame_annotated, annotated_path),
+            ])
             
             logger.debug(f"Images saved: {violation_dir}")
             
@@ -566,7 +654,7 @@ class PipelineOrchestrator:
                 self.db_manager.save_violation(violation_data)
                 logger.info(f"Saved to database: {event.report_id}")
             
-            self.stats['total_reports'] += 1
+            self._increment_stat('total_reports')
             
             # Notify frontend: report ready!
             self._trigger_callbacks('on_report_ready', {
@@ -581,7 +669,7 @@ class PipelineOrchestrator:
             
         except Exception as e:
             logger.error(f"[X] Error processing violation {event.report_id}: {e}", exc_info=True)
-            self.stats['errors'] += 1
+            self._increment_stat('errors')
             self._trigger_callbacks('on_error', {
                 'error': str(e),
                 'report_id': event.report_id,
@@ -590,7 +678,11 @@ class PipelineOrchestrator:
         
         finally:
             # Step 5: Resume YOLO detection (user requirement: resume after processing)
-            if self.yolo_stream and self.state != PipelineState.STOPPED:
+            # once no other report job is still running.
+            with self._pending_reports_lock:
+                self._active_report_jobs -= 1
+                last_job = self._active_report_jobs == 0
+            if last_job and self.yolo_stream and self.state != PipelineState.STOPPED:
                 self.yolo_stream.resume()
                 self.set_state(PipelineState.DETECTING)
             
@@ -604,22 +696,24 @@ class PipelineOrchestrator:
     
     def get_status(self) -> Dict[str, Any]:
         """Get current pipeline status."""
+        stats = self.stats
         uptime = None
-        if self.stats['start_time']:
-            uptime = (datetime.now() - self.stats['start_time']).total_seconds()
+        if stats.start_time:
+            uptime = (datetime.now() - stats.start_time).total_seconds()
         
         return {
             'state': self.state.value,
             'queue_size': self.violation_queue.qsize(),
+            'pending_reports': len(self.pending_reports),
             'in_cooldown': self.is_in_cooldown(),
             'cooldown_remaining': max(0, self.cooldown_seconds - (
                 (datetime.now() - self.last_violation_time).total_seconds()
                 if self.last_violation_time else 0
             )),
             'statistics': {
-                'total_violations': self.stats['total_violations'],
-                'total_reports': self.stats['total_reports'],
-                'errors': self.stats['errors'],
+                'total_violations': stats.total_violations,
+                'total_reports': stats.total_reports,
+                'errors': stats.errors,
                 'uptime_seconds': uptime
             }
         }
@@ -47,6 +47,11 @@ class RealSenseSource:
             "depth_available": False,
         }
         self._last_depth_preview_jpeg = None
+        # Reused depth-preview buffers: scaled depth at stream size, then the
+        # downscaled grey and colour-mapped preview (320x180).
+        self._depth_8u_buf = None
+        self._depth_preview_grey = np.empty((180, 320), dtype=np.uint8)
+        self._depth_preview_color = np.empty((180, 320, 3), dtype=np.uint8)
 
     def get_status(self) -> Dict[str, Optional[str]]:
         """Return SDK and device availability status."""
@@ -237,10 +242,15 @@ class RealSenseSource:
                         min_distance = None
                         max_distance = None
 
-                    depth_8u = cv2.convertScaleAbs(depth_image, alpha=0.03)
-                    depth_colormap = cv2.applyColorMap(depth_8u, cv2.COLORMAP_JET)
-                    depth_colormap = cv2.resize(depth_colormap, (320, 180), interpolation=cv2.INTER_LINEAR)
-                    ok, encoded = cv2.imencode('.jpg', depth_colormap, [cv2.IMWRITE_JPEG_QUALITY, 60])
+                    if self._depth_8u_buf is None or self._depth_8u_buf.shape != depth_image.shape:
+                        self._depth_8u_buf = np.empty(depth_image.shape, dtype=np.uint8)
+                    cv2.convertScaleAbs(depth_image, dst=self._depth_8u_buf, alpha=0.03)
+                    # Downscale before colour mapping (1/3 the bytes), with INTER_AREA for
+                    # alias-free shrinking, into preallocated buffers.
+                    cv2.resize(self._depth_8u_buf, (320, 180), dst=self._depth_preview_grey,
+                               interpolation=cv2.INTER_AREA)
+                    cv2.applyColorMap(self._depth_preview_grey, cv2.COLORMAP_JET, dst=self._depth_preview_color)
+                    ok, encoded = cv2.imencode('.jpg', self._depth_preview_color, [cv2.IMWRITE_JPEG_QUALITY, 60])
                     preview_jpeg = encoded.tobytes() if ok else None
 
                     with self._state_lock:
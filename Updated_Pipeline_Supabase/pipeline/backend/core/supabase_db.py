@@ -9,16 +9,17 @@ Manages violations in detection_events, violations, and flood_logs tables.
 import logging
 import os
 import json
+import queue
 import re
 import time
 from functools import wraps
-from threading import RLock
+from threading import Event, Lock, RLock, Thread
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone, timedelta
 
 import psycopg2
 from psycopg2 import extensions
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2.extras import RealDictCursor, Json, execute_values
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,16 @@ class SupabaseDatabaseManager:
         self._operation_lock = RLock()
         self.reconnect_backoff_seconds = max(3, int(os.getenv('SUPABASE_DB_RECONNECT_BACKOFF_SECONDS', '12')))
         self._reconnect_retry_after_epoch = 0.0
+        # Background flood_logs writer: rows queued via enqueue_log_event() are
+        # inserted in one multi-row statement per batch (size or interval bound).
+        self.log_batch_size = max(1, int(os.getenv('SUPABASE_LOG_BATCH_SIZE', '32')))
+        self.log_flush_interval_seconds = max(0.01, int(os.getenv('SUPABASE_LOG_FLUSH_MS', '100')) / 1000.0)
+        # A failed batch is retried (reconnecting first) this many times before it is dropped.
+        self.log_write_attempts = max(1, int(os.getenv('SUPABASE_LOG_WRITE_ATTEMPTS', '3')))
+        self._log_event_queue: queue.Queue = queue.Queue(maxsize=max(self.log_batch_size * 32, 256))
+        self._log_writer_lock = Lock()
+        self._log_writer_stop = Event()
+        self._log_writer_thread: Optional[Thread] = None
         
         try:
             self._connect()
@@ -285,6 +296,11 @@ class SupabaseDatabaseManager:
     
     def close(self):
         """Close database connection."""
+        writer = getattr(self, '_log_writer_thread', None)
+        if writer is not None and writer.is_alive():
+            # Let the writer drain queued flood_logs rows before the connection goes.
+            self._log_writer_stop.set()
+            writer.join(timeout=max(1.0, self.log_flush_interval_seconds * 10))
         if self.conn and not self.conn.closed:
             self.conn.close()
             logger.info("Database connection closed")
@@ -1372,6 +1388,148 @@ class SupabaseDatabaseManager:
         logger.error(f"Failed to log event: {last_error}")
         return False
 
+    def enqueue_log_event(
+        self,
+        event_type: str,
+        message: str,
+        report_id: Optional[str] = None,
+        device_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Queue a flood_logs row for the background batch writer without blocking.
+        
+        Falls back to a synchronous log_event() when the writer is unavailable
+        or its queue is full. A batch the writer cannot insert is retried, one
+        flush interval apart, up to log_write_attempts times; if every attempt
+        fails it is dropped with a warning naming the number of lost events.
+        
+        Returns:
+            True if queued or logged, False otherwise
+        """
+        event = {
+            'event_type': event_type,
+            'message': message,
+            'report_id': report_id,
+            'device_id': device_id,
+            'metadata': metadata,
+        }
+        log_queue = getattr(self, '_log_event_queue', None)
+        if log_queue is None or not self._ensure_log_writer():
+            return self.log_event(**event)
+        try:
+            log_queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return self.log_event(**event)
+
+    def _ensure_log_writer(self) -> bool:
+        """Start the flood_logs writer thread on first use."""
+        with self._log_writer_lock:
+            if self._log_writer_stop.is_set():
+                return False
+            if self._log_writer_thread is None or not self._log_writer_thread.is_alive():
+                self._log_writer_thread = Thread(
+                    target=self._log_writer_loop,
+                    name='SupabaseLogWriter',
+                    daemon=True,
+                )
+                self._log_writer_thread.start()
+        return True
+
+    def _log_writer_loop(self) -> None:
+        """Drain queued flood_logs rows in batches of up to log_batch_size every flush interval."""
+        log_queue = self._log_event_queue
+        retry_batch: List[Dict[str, Any]] = []
+        failed_attempts = 0
+        while True:
+            try:
+                batch = retry_batch + [log_queue.get(timeout=self.log_flush_interval_seconds)]
+            except queue.Empty:
+                if not retry_batch:
+                    if self._log_writer_stop.is_set():
+                        return
+                    continue
+                batch = retry_batch
+            retry_batch = []
+
+            deadline = time.monotonic() + self.log_flush_interval_seconds
+            while len(batch) < self.log_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(log_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_log_event_batch(batch)
+                failed_attempts = 0
+            except Exception as e:
+                failed_attempts += 1
+                if failed_attempts >= self.log_write_attempts:
+                    logger.warning(
+                        f"Dropped {len(batch)} queued flood_logs event(s) after "
+                        f"{failed_attempts} failed write(s): {e}"
+                    )
+                    failed_attempts = 0
+                    continue
+                logger.warning(
+                    f"flood_logs batch write failed ({failed_attempts}/{self.log_write_attempts}), "
+                    f"retrying {len(batch)} event(s): {e}"
+                )
+                retry_batch = batch
+                # Give the connection a flush interval to recover before reconnecting.
+                self._log_writer_stop.wait(self.log_flush_interval_seconds)
+
+    def _write_log_event_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert queued flood_logs rows with one statement and one commit."""
+        self._ensure_connection()
+
+        rows = []
+        device_ids = set()
+        for event in batch:
+            normalized_device_id = self._normalize_device_id(event.get('device_id'))
+            if normalized_device_id:
+                device_ids.add(normalized_device_id)
+            metadata = event.get('metadata')
+            rows.append((
+                event.get('event_type'),
+                event.get('report_id'),
+                normalized_device_id,
+                event.get('message'),
+                Json(metadata) if metadata else None,
+            ))
+
+        try:
+            with self.conn.cursor() as cur:
+                # Audit rows: do not wait for the WAL flush on commit.
+                cur.execute("SET LOCAL synchronous_commit TO OFF")
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO public.flood_logs
+                    (event_type, report_id, device_id, message, metadata)
+                    VALUES %s
+                    """,
+                    rows,
+                    page_size=max(1, len(rows)),
+                )
+            self.conn.commit()
+        except Exception as batch_error:
+            self._safe_rollback()
+            self._raise_if_connection_failure(batch_error, 'write_log_event_batch')
+            # Older flood_logs schemas lack device_id; log_event() knows that fallback.
+            logger.debug(f"Batched flood_logs insert failed, writing rows individually: {batch_error}")
+            for event in batch:
+                self.log_event(**event)
+            return
+
+        logger.debug(f"Logged {len(rows)} queued event(s)")
+        for normalized_device_id in device_ids:
+            self._upsert_device_presence(normalized_device_id)
+
     def get_device_stats(self, device_id: str) -> Dict[str, Any]:
         """Get aggregated status/severity counters for one camera device_id."""
         self._ensure_connection()
@@ -1547,6 +1705,7 @@ for _db_method_name in (
     'update_violation',
     'delete_violation',
     'log_event',
+    '_write_log_event_batch',
     'get_device_stats',
     'get_recent_logs',
 ):
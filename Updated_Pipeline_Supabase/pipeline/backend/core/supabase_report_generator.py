@@ -496,7 +496,9 @@ class SupabaseReportGenerator(ReportGenerator):
         if not is_reprocessing:
             try:
                 timing_started = time.perf_counter()
-                self.db_manager.log_event(
+                # Queued for the DB manager's batched flood_logs writer when available.
+                log_event = getattr(self.db_manager, 'enqueue_log_event', None) or self.db_manager.log_event
+                log_event(
                     event_type='report_generated',
                     message=f"Report generated and uploaded: {report_id}",
                     report_id=report_id,
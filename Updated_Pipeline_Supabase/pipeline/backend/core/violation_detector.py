@@ -162,6 +162,50 @@ def is_in_head_region(ppe_bbox: List[int], person_bbox: List[int]) -> bool:
     return True
 
 
+def pairwise_ppe_association(person_boxes: np.ndarray, ppe_boxes: np.ndarray,
+                             threshold: float = 0.3,
+                             head_ppe_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Vectorised is_within_or_near() for every person/PPE pair in one broadcast.
+    
+    Args:
+        person_boxes: (P, 4) array of person boxes [x1, y1, x2, y2]
+        ppe_boxes: (D, 4) array of PPE boxes [x1, y1, x2, y2]
+        threshold: IoU threshold
+        head_ppe_mask: Optional (D,) bool array of PPE that must sit in the head region
+    
+    Returns:
+        (P, D) bool array; [i, j] is True when PPE j belongs to person i
+    """
+    person_boxes = np.asarray(person_boxes, dtype=np.float64).reshape(-1, 4)
+    ppe_boxes = np.asarray(ppe_boxes, dtype=np.float64).reshape(-1, 4)
+    if not len(person_boxes) or not len(ppe_boxes):
+        return np.zeros((len(person_boxes), len(ppe_boxes)), dtype=bool)
+    
+    p_x1, p_y1, p_x2, p_y2 = (person_boxes[:, k:k + 1] for k in range(4))
+    g_x1, g_y1, g_x2, g_y2 = (ppe_boxes[:, k] for k in range(4))
+    
+    inter = (np.maximum(0.0, np.minimum(p_x2, g_x2) - np.maximum(p_x1, g_x1)) *
+             np.maximum(0.0, np.minimum(p_y2, g_y2) - np.maximum(p_y1, g_y1)))
+    union = (p_x2 - p_x1) * (p_y2 - p_y1) + (g_x2 - g_x1) * (g_y2 - g_y1) - inter
+    iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+    
+    g_cx = (g_x1 + g_x2) / 2
+    g_cy = (g_y1 + g_y2) / 2
+    center_inside = (p_x1 <= g_cx) & (g_cx <= p_x2) & (p_y1 <= g_cy) & (g_cy <= p_y2)
+    associated = (iou > threshold) | center_inside
+    
+    if head_ppe_mask is not None and np.any(head_ppe_mask):
+        # Same three checks as is_in_head_region(), evaluated for all pairs
+        p_w = p_x2 - p_x1
+        in_head = ((g_cy <= p_y1 + (p_y2 - p_y1) * 0.30) &
+                   (np.abs(g_cx - (p_x1 + p_x2) / 2) <= p_w * 0.40) &
+                   ((g_x2 - g_x1) <= p_w * 1.3))
+        associated &= in_head | ~np.asarray(head_ppe_mask, dtype=bool)
+    
+    return associated
+
+
 def normalize_class_name(name: str) -> str:
     """Normalize class name for consistent matching."""
     return ''.join(ch for ch in name.lower() if ch.isalnum())
@@ -308,21 +352,28 @@ class ViolationDetector:
             Same list with violations populated
         """
         for person_obj in person_objects:
-            for required, negative in self.required_ppe.items():
-                # Check if person has the required PPE
-                has_positive = person_obj.has_ppe(required)
-                has_negative = person_obj.has_ppe(negative)
-                
-                # Violation if:
-                # 1. Missing both positive and negative (ambiguous, assume violation)
-                # 2. Has explicit negative detection
-                if has_negative or (not has_positive and not has_negative):
-                    violation_msg = f"Missing {required}"
-                    person_obj.violations.append(violation_msg)
-                    logger.warning(f"Violation detected: {violation_msg} at bbox {person_obj.detection.bbox}")
+            self._apply_ppe_rules(person_obj)
         
         return person_objects
     
+    def _apply_ppe_rules(self, person_obj: PersonDetection) -> None:
+        """Populate violations for one person from their associated PPE items."""
+        ppe_items = person_obj.ppe_items
+        for required, negative in self.required_ppe.items():
+            negative_classes = (negative,) if isinstance(negative, str) else negative
+            
+            # Check if person has the required PPE
+            has_positive = bool(ppe_items.get(required))
+            has_negative = any(ppe_items.get(neg) for neg in negative_classes)
+            
+            # Violation if:
+            # 1. Missing both positive and negative (ambiguous, assume violation)
+            # 2. Has explicit negative detection
+            if has_negative or not has_positive:
+                violation_msg = f"Missing {required}"
+                person_obj.violations.append(violation_msg)
+                logger.warning(f"Violation detected: {violation_msg} at bbox {person_obj.detection.bbox}")
+    
     def associate_ppe_with_persons(self, persons: List[Detection], 
                                    ppe: List[Detection]) -> List[PersonDetection]:
         """
@@ -336,27 +387,76 @@ class ViolationDetector:
             List of PersonDetection objects with associated PPE
         """
         person_objects = []
+        association = self._association_matrix(persons, ppe)
         
-        for person in persons:
+        for person, row in zip(persons, association):
             person_obj = PersonDetection(detection=person)
             
             # Find all PPE items associated with this person
-            for ppe_item in ppe:
-                if is_within_or_near(ppe_item.bbox, person.bbox, self.iou_threshold,
-                                   ppe_class=ppe_item.class_name, 
-                                   strict_head_region=self.strict_head_region):
-                    class_name = ppe_item.class_name
-                    
-                    if class_name not in person_obj.ppe_items:
-                        person_obj.ppe_items[class_name] = []
-                    
-                    person_obj.ppe_items[class_name].append(ppe_item)
-                    logger.debug(f"Associated {class_name} with person at {person.bbox}")
+            for j in np.flatnonzero(row):
+                ppe_item = ppe[j]
+                class_name = ppe_item.class_name
+                
+                if class_name not in person_obj.ppe_items:
+                    person_obj.ppe_items[class_name] = []
+                
+                person_obj.ppe_items[class_name].append(ppe_item)
+                logger.debug(f"Associated {class_name} with person at {person.bbox}")
             
             person_objects.append(person_obj)
         
         return person_objects
     
+    def _association_matrix(self, persons: List[Detection], ppe: List[Detection]) -> np.ndarray:
+        """Person x PPE association mask for the current frame (see pairwise_ppe_association)."""
+        if not persons or not ppe:
+            return np.zeros((len(persons), len(ppe)), dtype=bool)
+        
+        head_ppe_mask = None
+        if self.strict_head_region:
+            class_names = np.array([item.class_name for item in ppe])
+            head_classes = [name for name in set(class_names.tolist()) if 'hardhat' in name.lower()]
+            head_ppe_mask = np.isin(class_names, head_classes)
+        
+        return pairwise_ppe_association(
+            [person.bbox for person in persons],
+            [item.bbox for item in ppe],
+            self.iou_threshold,
+            head_ppe_mask,
+        )
+    
+    def _associate_and_check(self, persons: List[Detection],
+                             ppe: List[Detection]) -> List[PersonDetection]:
+        """
+        Associate PPE with persons and check violations in a single pass.
+        
+        The person x PPE association is computed in one NumPy broadcast; each
+        person is then visited once to group matched PPE and run the rules.
+        
+        Args:
+            persons: List of person detections
+            ppe: List of PPE detections
+        
+        Returns:
+            List of PersonDetection objects with PPE and violations populated
+        """
+        person_objects = []
+        association = self._association_matrix(persons, ppe)
+        
+        for person, row in zip(persons, association):
+            person_obj = PersonDetection(detection=person)
+            ppe_items = person_obj.ppe_items
+            
+            for j in np.flatnonzero(row):
+                ppe_item = ppe[j]
+                ppe_items.setdefault(ppe_item.class_name, []).append(ppe_item)
+                logger.debug(f"Associated {ppe_item.class_name} with person at {person.bbox}")
+            
+            self._apply_ppe_rules(person_obj)
+            person_objects.append(person_obj)
+        
+        return person_objects
+    
     def detect_violations(self, detections: List[Dict], frame: np.ndarray, 
                          timestamp: str) -> Optional[ViolationEvent]:
         """
@@ -383,11 +483,8 @@ class ViolationDetector:
         
         logger.info(f"Frame analysis: {len(persons)} persons, {len(ppe)} PPE items")
         
-        # Associate PPE with persons
-        person_objects = self.associate_ppe_with_persons(persons, ppe)
-        
-        # Check for violations
-        person_objects = self.check_violations(person_objects)
+        # Associate PPE with persons and check violations in one pass
+        person_objects = self._associate_and_check(persons, ppe)
         
         # Create violation event
         violation_summary = []
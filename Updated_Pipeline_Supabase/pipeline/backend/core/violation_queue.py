@@ -482,7 +482,8 @@ class MultiDeviceViolationHandler:
             
             # Log success
             if hasattr(self.db, 'log_event'):
-                self.db.log_event(
+                log_event = getattr(self.db, 'enqueue_log_event', None) or self.db.log_event
+                log_event(
                     'violation_processed',
                     f"Successfully processed violation {report_id}",
                     report_id=report_id,
@@ -21,6 +21,12 @@ import tempfile
 
 logger = logging.getLogger(__name__)
 
+try:
+    from pipeline.backend.integration.llm_cache import LLMResponseCache, image_digest
+except ImportError as e:
+    LLMResponseCache = None
+    logger.info(f"LLM response cache not available: {e}")
+
 # =========================================================================
 # GEMINI BACKEND (Primary)
 # =========================================================================
@@ -55,6 +61,13 @@ except Exception as e:
     logging.debug(f"Legacy caption_image error: {e}")
 
 
+def _is_cacheable_caption(caption) -> bool:
+    text = str(caption or '').strip()
+    return bool(text) and not text.startswith(
+        ('Error', 'Failed', 'ALERT_', 'Image captioning not available')
+    )
+
+
 class CaptionGenerator:
     """
     Generates image captions using Gemini API (primary) or Qwen2.5-VL (fallback).
@@ -70,6 +83,7 @@ class CaptionGenerator:
         self.config = config
         self.model_loaded = False
         self._gemini_client = None
+        self.llm_cache = LLMResponseCache.from_env() if LLMResponseCache is not None else None
 
         # Determine backend. Strict local profile must keep captions on the
         # local Ollama/Gemma path even when a Gemini key exists.
@@ -152,6 +166,35 @@ class CaptionGenerator:
         Returns:
             Generated caption string
         """
+        llm_cache = getattr(self, 'llm_cache', None)
+        if llm_cache is None or not llm_cache.enabled:
+            return self._generate_caption_uncached(image, prompt=prompt, max_retries=max_retries)
+
+        # Identical frames (same incident, re-uploads) reuse the earlier caption.
+        # The provider route is part of the key so local and cloud captions never mix.
+        strict_local_profile = (
+            str(os.getenv('STRICT_PROVIDER_MODE_SPLIT', 'true')).strip().lower() in ('1', 'true', 'yes', 'on')
+            and str(os.getenv('CASM_ROUTING_PROFILE', '')).strip().lower() == 'local'
+        )
+        digest = image_digest(image if isinstance(image, np.ndarray) else str(image))
+        if not digest:
+            return self._generate_caption_uncached(image, prompt=prompt, max_retries=max_retries)
+        cache_key = llm_cache.make_key(
+            'caption', 'local' if strict_local_profile else 'cloud', prompt or '', digest
+        )
+        return llm_cache.get_or_compute(
+            'caption',
+            cache_key,
+            lambda: self._generate_caption_uncached(image, prompt=prompt, max_retries=max_retries),
+            should_store=_is_cacheable_caption,
+        )
+
+    def _generate_caption_uncached(
+        self,
+        image: Union[str, np.ndarray, Path],
+        prompt: Optional[str] = None,
+        max_retries: int = 1
+    ) -> str:
         # Convert numpy array to temporary file if needed
         temp_file = None
         image_path = image
@@ -11,12 +11,20 @@ PRIORITY: Focus on PPE items. Person detection is deprioritized because:
 """
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _keyword_patterns(keyword: str) -> Tuple['re.Pattern', 're.Pattern']:
+    """Compiled (mention, context window) patterns for one caption keyword."""
+    pattern = r'\b' + re.escape(keyword) + r's?\b'  # Allow plural
+    return re.compile(pattern), re.compile(r'(\w+\s+){0,5}' + pattern + r'(\s+\w+){0,5}')
+
+
 class CaptionValidator:
     """Validates captions against annotations to detect contradictions."""
 
@@ -30,6 +38,9 @@ class CaptionValidator:
         'boots': ['boot', 'boots', 'safety boots', 'steel toe', 'work boots'],
     }
 
+    # PPE items checked for caption/detector agreement, in report order
+    PPE_ITEMS = ('hardhat', 'mask', 'safety_vest', 'gloves', 'goggles', 'boots')
+
     # Person detection - LOW PRIORITY (YOLO often misses partial bodies)
     PERSON_CLASSES = {
         'person': ['person', 'worker', 'individual', 'people', 'human', 'man', 'woman']
@@ -57,6 +68,11 @@ class CaptionValidator:
         r'\bin\s+\w+\s+equipment\b'
     ]
 
+    # Each pattern list scanned as one alternation: a single search tells
+    # whether any of them occurs in the mention context
+    _NEGATION_RE = re.compile('|'.join(NEGATION_PATTERNS))
+    _PRESENCE_RE = re.compile('|'.join(PRESENCE_PATTERNS))
+
     def __init__(self):
         self.logger = logger
 
@@ -199,27 +215,20 @@ class CaptionValidator:
         context = ""
 
         for keyword in keywords:
-            pattern = r'\b' + re.escape(keyword) + r's?\b'  # Allow plural
-            if re.search(pattern, caption_lower):
+            mention_re, context_re = _keyword_patterns(keyword)
+            if mention_re.search(caption_lower):
                 item_found = True
 
                 # Extract context (surrounding words)
-                match = re.search(r'(\w+\s+){0,5}' + pattern + r'(\s+\w+){0,5}',
-                                caption_lower)
+                match = context_re.search(caption_lower)
                 if match:
                     context = match.group(0)
 
                     # Check if negation or presence
-                    for neg_pattern in self.NEGATION_PATTERNS:
-                        if re.search(neg_pattern, context):
-                            is_present = False
-                            break
-
-                    if is_present is None:
-                        for pos_pattern in self.PRESENCE_PATTERNS:
-                            if re.search(pos_pattern, context):
-                                is_present = True
-                                break
+                    if self._NEGATION_RE.search(context):
+                        is_present = False
+                    elif self._PRESENCE_RE.search(context):
+                        is_present = True
 
                 break
 
@@ -240,9 +249,7 @@ class CaptionValidator:
         contradictions = []
 
         # Check PPE items (HIGH PRIORITY - these are critical)
-        ppe_items = ['hardhat', 'mask', 'safety_vest', 'gloves', 'goggles', 'boots']
-
-        for item_type in ppe_items:
+        for item_type in self.PPE_ITEMS:
             detected = detected_items.get(item_type, False)
             mention = caption_mentions.get(item_type)
 
@@ -313,29 +320,18 @@ class CaptionValidator:
         Calculate validation confidence score (0-1).
         FOCUSES ON PPE AGREEMENT - person detection has minimal weight.
         """
-        score = 1.0
-
-        # Major penalty for contradictions (PPE only)
-        score -= len(contradictions) * 0.3
-
-        # Minor penalty for warnings
-        score -= len(warnings) * 0.1
-
-        # Bonus for PPE agreement (ONLY PPE, not person)
-        ppe_agreements = 0
-        ppe_checks = 0
-
-        ppe_items = ['hardhat', 'mask', 'safety_vest', 'gloves', 'goggles', 'boots']
-
-        for item_type in ppe_items:
-            detected = detected_items.get(item_type, False)
-            mention = caption_mentions.get(item_type)
-
-            if mention and mention['present'] is not None:
-                ppe_checks += 1
-                if (detected and mention['present']) or \
-                   (not detected and not mention['present']):
-                    ppe_agreements += 1
+        # Major penalty for contradictions (PPE only), minor one for warnings
+        score = 1.0 - len(contradictions) * 0.3 - len(warnings) * 0.1
+
+        # Bonus for PPE agreement (ONLY PPE, not person): one pass over the
+        # explicit caption statements, counting those the detector agrees with
+        stated = [
+            (bool(detected_items.get(item_type, False)), bool(mention['present']))
+            for item_type, mention in caption_mentions.items()
+            if item_type in self.PPE_ITEMS and mention['present'] is not None
+        ]
+        ppe_checks = len(stated)
+        ppe_agreements = sum(detected == present for detected, present in stated)
 
         if ppe_checks > 0:
             agreement_rate = ppe_agreements / ppe_checks
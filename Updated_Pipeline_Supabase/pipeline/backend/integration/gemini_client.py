@@ -23,8 +23,31 @@ import re
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Union, List
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.absolute()))
+
+from json_provider import load_json_file
 
 logger = logging.getLogger(__name__)
+# Patterns used to recover JSON from model output, compiled once per process.
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.IGNORECASE | re.DOTALL)
+_GENERIC_FENCE_RE = re.compile(r"```\s*(.*?)\s*```", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Lower-cased caption boilerplate, longest first; only the caption head is
+# lowered when checking for them.
+_CAPTION_BOILERPLATE_PREFIXES = (
+    "here is a description of the image:",
+    "here is a description:",
+    "based on the image,",
+    "in the image,",
+    "in the image",
+    "in this image,",
+    "in this image",
+)
+_CAPTION_BOILERPLATE_HEAD = max(len(prefix) for prefix in _CAPTION_BOILERPLATE_PREFIXES)
+
 GEMINI_REQUIRED_BY_DEFAULT = str(os.getenv('GEMINI_REQUIRED', 'false')).strip().lower() in ('1', 'true', 'yes', 'on')
 DEFAULT_GEMINI_MODEL_CANDIDATES = (
     "gemini-2.5-flash,"
@@ -243,7 +266,7 @@ class GeminiClient:
         elapsed = now - self._last_call_time
         if elapsed < self._min_interval:
             wait = self._min_interval - elapsed
-            logger.debug(f"Rate limiting: waiting {wait:.1f}s")
+            logger.debug("Rate limiting: waiting %.1fs", wait)
             time.sleep(wait)
         self._last_call_time = time.time()
 
@@ -392,7 +415,7 @@ class GeminiClient:
         """Sanitize debug text to keep logs safe and bounded."""
         limit = max_chars if isinstance(max_chars, int) and max_chars > 0 else self.raw_capture_max_chars
         text = str(value or "").replace('\r', '')
-        text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", text)
+        text = _CONTROL_CHARS_RE.sub("", text)
         if len(text) > limit:
             return f"{text[:limit]} ...[truncated {len(text) - limit} chars]"
         return text
@@ -653,7 +676,7 @@ class GeminiClient:
             pass
 
         # 2) Markdown fenced payloads
-        fenced_match = re.search(r"```json\s*(.*?)\s*```", raw_text, flags=re.IGNORECASE | re.DOTALL)
+        fenced_match = _JSON_FENCE_RE.search(raw_text)
         if fenced_match:
             candidate = fenced_match.group(1).strip()
             try:
@@ -664,7 +687,7 @@ class GeminiClient:
             except json.JSONDecodeError:
                 pass
 
-        generic_fence = re.search(r"```\s*(.*?)\s*```", raw_text, flags=re.DOTALL)
+        generic_fence = _GENERIC_FENCE_RE.search(raw_text)
         if generic_fence:
             candidate = generic_fence.group(1).strip()
             try:
@@ -679,8 +702,8 @@ class GeminiClient:
         candidate = self._extract_balanced_json_object(raw_text)
         if candidate:
             cleaned = candidate
-            cleaned = re.sub(r"^\ufeff", "", cleaned)
-            cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
+            cleaned = cleaned.removeprefix("\ufeff")
+            cleaned = _TRAILING_COMMA_RE.sub(r"\1", cleaned)
             cleaned = cleaned.strip()
             try:
                 parsed = json.loads(cleaned)
@@ -782,17 +805,9 @@ class GeminiClient:
             return ''
 
         text = re.sub(r'^(?:[-*]\s*)+', '', text).strip()
-        prefixes = (
-            "Here is a description of the image:",
-            "Here is a description:",
-            "Based on the image,",
-            "In the image,",
-            "In the image",
-            "In this image,",
-            "In this image",
-        )
-        for prefix in prefixes:
-            if text.lower().startswith(prefix.lower()):
+        head = text[:_CAPTION_BOILERPLATE_HEAD].lower()
+        for prefix in _CAPTION_BOILERPLATE_PREFIXES:
+            if head.startswith(prefix):
                 text = text[len(prefix):].strip(" ,:")
                 break
 
@@ -1324,8 +1339,7 @@ def load_regulations(regulations_path: Optional[str] = None) -> Dict[str, Any]:
         regulations_path = Path(regulations_path)
 
     try:
-        with open(regulations_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json_file(regulations_path)
         logger.info(f" Loaded {len(data.get('regulations', {}))} regulation entries from {regulations_path.name}")
         return data
     except FileNotFoundError:
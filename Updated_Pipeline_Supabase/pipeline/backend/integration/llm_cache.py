@@ -0,0 +1,200 @@
+"""
+LLM Response Cache - SQLite-backed cache for caption and NLP calls
+==================================================================
+
+Consecutive frames of the same incident (and re-runs of the same upload)
+produce byte-identical prompts and images; their caption / report JSON can be
+served from disk instead of repeating the model round trip.
+
+Keys are deterministic SHA-256 digests over the prompt version, provider,
+model, prompt text and image digest, so any change in inputs is a miss.
+Concurrent callers computing the same key are serialised behind a per-key
+(striped) lock so only one of them reaches the provider.
+
+Usage:
+    cache = LLMResponseCache.from_env()
+    key = cache.make_key('caption', backend, prompt, image_digest(path))
+    caption = cache.get_or_compute('caption', key, lambda: call_model(...))
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when prompt templates change so stale entries are never served.
+LLM_CACHE_PROMPT_VERSION = 'v2'
+
+DEFAULT_LLM_CACHE_PATH = Path(__file__).resolve().parents[1] / 'data' / 'llm_cache.db'
+DEFAULT_LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def image_digest(image: Union[str, Path, np.ndarray, bytes, None]) -> str:
+    """Return a BLAKE2b digest of an image file, array or encoded bytes ('' if unavailable)."""
+    if image is None:
+        return ''
+    hasher = hashlib.blake2b(digest_size=20)
+    try:
+        if isinstance(image, np.ndarray):
+            hasher.update(repr((image.shape, str(image.dtype))).encode('utf-8'))
+            hasher.update(np.ascontiguousarray(image).data)
+        elif isinstance(image, (bytes, bytearray)):
+            hasher.update(image)
+        else:
+            with open(image, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(1 << 20), b''):
+                    hasher.update(chunk)
+    except OSError:
+        return ''
+    return hasher.hexdigest()
+
+
+class LLMResponseCache:
+    """Thread-safe SQLite key/value cache with TTL for JSON-serialisable LLM outputs."""
+
+    def __init__(self, db_path: Union[str, Path], ttl_seconds: float = DEFAULT_LLM_CACHE_TTL_SECONDS,
+                 enabled: bool = True):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.enabled = bool(enabled)
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        # Striped per-key locks: bounded memory, and equal keys always share a stripe.
+        self._key_locks = [threading.Lock() for _ in range(64)]
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> 'LLMResponseCache':
+        enabled = os.getenv('LLM_CACHE_ENABLED', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+        try:
+            ttl_seconds = float(os.getenv('LLM_CACHE_TTL_SECONDS', str(DEFAULT_LLM_CACHE_TTL_SECONDS)))
+        except (TypeError, ValueError):
+            ttl_seconds = DEFAULT_LLM_CACHE_TTL_SECONDS
+        db_path = os.getenv('LLM_CACHE_PATH', '').strip() or str(DEFAULT_LLM_CACHE_PATH)
+        return cls(db_path, ttl_seconds=ttl_seconds, enabled=enabled)
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        hasher = hashlib.sha256()
+        for part in (LLM_CACHE_PROMPT_VERSION, namespace, *parts):
+            data = part if isinstance(part, bytes) else str('' if part is None else part).encode('utf-8')
+            hasher.update(len(data).to_bytes(8, 'little'))
+            hasher.update(data)
+        return hasher.hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), timeout=5.0, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                    'created_at REAL NOT NULL, PRIMARY KEY (namespace, key))'
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache disabled (cannot open {self.db_path}): {e}")
+                self.enabled = False
+                return None
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._conn_lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT value, created_at FROM llm_cache WHERE namespace = ? AND key = ?',
+                    (namespace, key),
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.ttl_seconds and (time.time() - row[1]) > self.ttl_seconds:
+                    conn.execute('DELETE FROM llm_cache WHERE namespace = ? AND key = ?', (namespace, key))
+                    conn.commit()
+                    return None
+            except sqlite3.Error as e:
+                logger.debug(f"LLM cache read failed: {e}")
+                return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            payload = json.dumps(value, default=str)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"LLM cache skipped unserialisable value: {e}")
+            return
+        with self._conn_lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (namespace, key, value, created_at) VALUES (?, ?, ?, ?)',
+                    (namespace, key, payload, time.time()),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"LLM cache write failed: {e}")
+
+    def _lock_for(self, namespace: str, key: str) -> threading.Lock:
+        return self._key_locks[hash((namespace, key)) % len(self._key_locks)]
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        should_store: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss.
+
+        Only values accepted by `should_store` are cached, so failures and error
+        strings are always retried. Callers racing on the same key wait for the
+        first computation instead of issuing duplicate provider calls.
+        """
+        if not self.enabled:
+            return compute()
+
+        key_lock = self._lock_for(namespace, key)
+        with key_lock:
+            cached = self.get(namespace, key)
+            if cached is not None:
+                self.hits += 1
+                logger.info(f"LLM cache hit ({namespace})")
+                return cached
+            self.misses += 1
+            value = compute()
+            if value is not None and should_store(value):
+                self.set(namespace, key, value)
+            return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'path': str(self.db_path),
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
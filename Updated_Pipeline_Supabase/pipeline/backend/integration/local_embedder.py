@@ -0,0 +1,97 @@
+"""
+Local Sentence Embeddings - in-process RAG query embeddings
+===========================================================
+
+Runs a sentence-transformers model (all-MiniLM-L6-v2 by default) inside the
+worker, so RAG queries are embedded with one batched forward pass instead of
+an HTTP round trip to Ollama. Selected by listing 'local' in
+EMBEDDING_PROVIDER_ORDER; the Chroma collection must have been built with the
+same model, since MiniLM vectors are 384-d rather than nomic's 768-d.
+
+On CUDA GPUs with bfloat16 support the weights are loaded natively in bf16
+(no fp32 copy, no autocast); pooled vectors are upcast to float32 before L2
+normalisation so bf16 rounding does not leak into the similarity scores.
+"""
+
+import logging
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+class LocalSentenceEmbedder:
+    """Lazily loaded SentenceTransformer shared by every report worker thread."""
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_EMBEDDING_MODEL, batch_size: int = 64,
+                 dtype: str = 'auto'):
+        self.model_name = model_name or DEFAULT_LOCAL_EMBEDDING_MODEL
+        self.batch_size = max(1, int(batch_size))
+        self.dtype = str(dtype or 'auto').strip().lower()
+        self.model = None
+        self.device = None
+        self._load_lock = threading.Lock()
+
+    def _weights_dtype(self, torch):
+        """Return the torch dtype to load weights in, or None for the fp32 default."""
+        if self.device != 'cuda' or self.dtype in ('float32', 'fp32'):
+            return None
+        if self.dtype in ('float16', 'fp16'):
+            return torch.float16
+        if self.dtype in ('auto', 'bfloat16', 'bf16') and torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return None
+
+    def load_model(self):
+        """Load the model on first use (GPU when available)."""
+        if self.model is not None:
+            return self.model
+        with self._load_lock:
+            if self.model is None:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+                weights_dtype = self._weights_dtype(torch)
+                model_kwargs = {'torch_dtype': weights_dtype} if weights_dtype is not None else None
+                logger.info(
+                    f"Loading local embedding model {self.model_name} on {self.device}"
+                    f" ({weights_dtype or 'float32'})"
+                )
+                self.model = SentenceTransformer(self.model_name, device=self.device, model_kwargs=model_kwargs)
+        return self.model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed `texts` in one batched call; returns a (len(texts), dim) float32 matrix."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        import torch
+
+        vectors = self.load_model().encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_tensor=True,
+            normalize_embeddings=False,
+            show_progress_bar=False,
+        )
+        vectors = torch.nn.functional.normalize(vectors.float(), p=2, dim=-1)
+        return vectors.cpu().numpy()
+
+
+_EMBEDDERS: Dict[str, LocalSentenceEmbedder] = {}
+_EMBEDDERS_LOCK = threading.Lock()
+
+
+def get_local_embedder(model_name: str = DEFAULT_LOCAL_EMBEDDING_MODEL, batch_size: int = 64,
+                       dtype: str = 'auto') -> LocalSentenceEmbedder:
+    """Return the process-wide embedder for `model_name`, creating it on first use."""
+    key = model_name or DEFAULT_LOCAL_EMBEDDING_MODEL
+    with _EMBEDDERS_LOCK:
+        embedder = _EMBEDDERS.get(key)
+        if embedder is None:
+            embedder = _EMBEDDERS[key] = LocalSentenceEmbedder(key, batch_size=batch_size, dtype=dtype)
+        return embedder
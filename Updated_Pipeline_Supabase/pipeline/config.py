@@ -85,7 +85,8 @@ VIOLATION_RULES = {
         'NO-Safety Vest': True
     },
     'max_queue_size': 10,
-    'violation_cooldown': 60
+    'violation_cooldown': 60,
+    'report_workers': int(os.getenv('REPORT_WORKERS', '2'))  # concurrent caption/report jobs in the orchestrator
 }
 
 # =========================================================================
@@ -223,7 +224,18 @@ RAG_CONFIG = {
     'use_chroma': False,  # Disabled — Gemini uses direct regulation injection instead of ChromaDB
     'chroma_path': BASE_DIR / 'pipeline' / 'backend' / 'chroma_db',
     'collection_name': 'dosh_guidelines',  # Actual collection name
-    'embedding_model': 'nomic-embed-text',  # Ollama embedding model (only used if use_chroma=True)
+    'embedding_model': os.getenv('OLLAMA_EMBEDDING_MODEL', 'nomic-embed-text'),  # Ollama embedding model (only used if use_chroma=True)
+    # Expected quantisation of the Ollama embedding model, checked when it is
+    # preloaded. q8_0 recommended (e.g. embeddinggemma:300m-qat-q8_0, ~4.5x faster
+    # than bf16 for batched embeds); q4_0 tested slower than q8_0. A different
+    # model family means re-ingesting the Chroma collection with it.
+    'embedding_model_dtype': os.getenv('OLLAMA_EMBEDDING_MODEL_DTYPE', 'q8_0'),
+    # In-process sentence-transformers model for the 'local' embedding provider.
+    # Its vectors are 384-d, so the Chroma collection must be re-ingested with it.
+    'local_embedding_model': os.getenv('LOCAL_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
+    'local_embedding_batch_size': int(os.getenv('LOCAL_EMBEDDING_BATCH_SIZE', '64') or 64),
+    # Weight precision on CUDA: auto (bf16 where supported), bfloat16, float16 or float32.
+    'local_embedding_dtype': os.getenv('LOCAL_EMBEDDING_DTYPE', 'auto'),
     'data_source': _resolve_rag_data_source(),
     'regulations_file': BASE_DIR / 'pipeline' / 'backend' / 'data' / 'malaysian_regulations.json',
     'num_similar_incidents': 2,
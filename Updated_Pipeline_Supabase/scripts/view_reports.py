@@ -31,6 +31,7 @@ sys.path.insert(0, _os.path.abspath(_os.path.join(_os.path.dirname(__file__), '.
 # Import Supabase managers
 from pipeline.backend.core.supabase_db import create_db_manager_from_env
 from pipeline.backend.core.supabase_storage import create_storage_manager_from_env
+from json_provider import install_orjson_provider
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -41,6 +42,7 @@ app = Flask(__name__,
             template_folder='report_templates',
             static_folder='frontend',
             static_url_path='/static')
+install_orjson_provider(app)
 
 # Initialize Supabase managers
 try:
@@ -196,7 +198,12 @@ def get_image(report_id, filename):
         signed_url = storage_manager.get_signed_url(image_key)
         
         if signed_url:
-            return redirect(signed_url)
+            response = redirect(signed_url)
+            # Let the browser reuse the redirect (skipping the DB lookup and URL
+            # signing) for well under the signed URL's lifetime.
+            redirect_max_age = max(0, int(storage_manager.signed_url_ttl) // 2)
+            response.headers['Cache-Control'] = f'private, max-age={redirect_max_age}'
+            return response
         else:
             abort(500, description="Failed to generate signed URL")
             
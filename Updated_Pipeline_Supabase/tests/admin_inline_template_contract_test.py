@@ -0,0 +1,56 @@
+"""
+Offline contract test for the cached inline admin templates.
+
+Admin pages built from inline HTML strings must compile once and keep
+rendering exactly what render_template_string() produced.
+"""
+
+import base64
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+
+import casm_app
+from flask import render_template_string
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_audit_log_page_compiles_once_and_matches_string_rendering(monkeypatch):
+    entries = [
+        {"ts": "2026-01-01T00:00:00Z", "machine_id": "m-1", "event": "approved", "actor": "admin",
+         "metadata": {"ip": "192.0.2.1"}},
+        {"ts": "2026-01-01T00:01:00Z", "machine_id": "m-<2>", "event": "rejected", "actor": "admin", "metadata": {}},
+    ]
+    monkeypatch.setattr(casm_app, "ADMIN_PASSWORD", "secret")
+    monkeypatch.setattr(casm_app, "ADMIN_USERNAME", "")
+    monkeypatch.setattr(casm_app, "_load_device_audit_log", lambda: list(entries))
+    casm_app._compile_inline_template.cache_clear()
+    headers = {"Authorization": "Basic " + base64.b64encode(b"admin:secret").decode("ascii")}
+
+    client = casm_app.app.test_client()
+    first = client.get("/admin/devices/audit-log", headers=headers)
+    second = client.get("/admin/devices/audit-log", headers=headers)
+
+    _assert(first.status_code == 200, f"Unexpected status {first.status_code}")
+    _assert(first.data == second.data, "Cached template must render identically")
+    _assert("m-&lt;2&gt;" in first.get_data(as_text=True), "Autoescaping must still apply")
+    info = casm_app._compile_inline_template.cache_info()
+    _assert(info.misses == 1 and info.hits == 1, f"Expected one compile and one reuse, got {info}")
+
+    with casm_app.app.test_request_context("/admin/devices/audit-log"):
+        template = "{% for e in entries %}{{ e.machine_id }}|{% endfor %}{{ count }}{{ request.path }}"
+        expected = render_template_string(template, entries=entries, count=len(entries))
+        _assert(
+            casm_app._render_inline_template(template, entries=entries, count=len(entries)) == expected,
+            "Inline rendering must match render_template_string, including context processors",
+        )
@@ -0,0 +1,177 @@
+"""
+Offline contract test for the reused admin-notification SMTP session.
+
+Consecutive notifications must share one STARTTLS/AUTH handshake, a session
+the server dropped must be reopened exactly once, and async notifications
+must fan out over pooled sessions without blocking the caller.
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+
+import casm_app
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+class _FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.logins = 0
+        self.sent = []
+        self.drop_next_send = False
+        _FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        return 250, b"ok"
+
+    def starttls(self, context=None):
+        self.tls_context = context
+        self.sock = type("_FakeTLSSocket", (), {"session": f"tls-session-{len(_FakeSMTP.instances)}"})()
+        return 220, b"ready"
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def noop(self):
+        return 250, b"ok"
+
+    def send_message(self, msg, to_addrs=None):
+        if self.drop_next_send:
+            raise casm_app.smtplib.SMTPServerDisconnected("idle timeout")
+        self.sent.append(msg["Subject"])
+        self.last_message = msg
+        self.last_recipients = to_addrs
+
+    def quit(self):
+        pass
+
+
+def _configure_smtp_env(monkeypatch):
+    _FakeSMTP.instances = []
+    monkeypatch.setattr(casm_app.smtplib, "SMTP", _FakeSMTP)
+    for name, value in {
+        "ADMIN_EMAIL": "admin@example.com",
+        "SMTP_SERVER": "smtp.example.com",
+        "SMTP_USERNAME": "casm@example.com",
+        "SMTP_PASSWORD": "secret",
+        "SMTP_FORCE_IPV4": "false",
+    }.items():
+        monkeypatch.setenv(name, value)
+    for name in ("NOTIFICATION_WEBHOOK_URL", "RESEND_API_KEY", "RESEND_FROM_EMAIL"):
+        monkeypatch.delenv(name, raising=False)
+    casm_app._close_admin_smtp_session()
+
+
+def test_admin_notifications_reuse_one_smtp_session(monkeypatch):
+    _configure_smtp_env(monkeypatch)
+    try:
+        casm_app._notify_admin_sync("machine-a", status="pending", token="t1")
+        casm_app._notify_admin_sync("machine-b", status="approved")
+        _assert(len(_FakeSMTP.instances) == 1, f"Expected one SMTP session, got {len(_FakeSMTP.instances)}")
+        _assert(_FakeSMTP.instances[0].logins == 1, "AUTH should run once per session")
+        _assert(len(_FakeSMTP.instances[0].sent) == 2, "Both notifications should be sent")
+        message = _FakeSMTP.instances[0].last_message
+        _assert(not message.is_multipart() and message.get_content_type() == "text/plain", "Expected a plain-text message")
+        _assert("machine-b" in message.get_content(), "Body should carry the machine id")
+
+        _FakeSMTP.instances[0].drop_next_send = True
+        casm_app._notify_admin_sync("machine-c", status="approved")
+        _assert(len(_FakeSMTP.instances) == 2, "A dropped session should be reopened once")
+        _assert(_FakeSMTP.instances[1].sent == ["Edge Node Approved"], "Message must be retried on the new session")
+    finally:
+        casm_app._close_admin_smtp_session()
+
+
+def test_async_notifications_fan_out_over_pooled_sessions(monkeypatch):
+    _configure_smtp_env(monkeypatch)
+    monkeypatch.setenv("NOTIFICATION_ASYNC", "true")
+    both_sending = threading.Barrier(2, timeout=5)
+    original_send = _FakeSMTP.send_message
+
+    def _send_together(self, msg, to_addrs=None):
+        both_sending.wait()
+        original_send(self, msg, to_addrs=to_addrs)
+
+    monkeypatch.setattr(_FakeSMTP, "send_message", _send_together)
+    try:
+        futures = [casm_app.notify_admin(machine_id, "approved") for machine_id in ("machine-a", "machine-b")]
+        for future in futures:
+            future.result(timeout=5)
+        _assert(len(_FakeSMTP.instances) == 2, "Concurrent notifications should use separate sessions")
+        _assert(len(casm_app._admin_smtp_idle) == 2, "Both sessions should return to the idle pool")
+    finally:
+        casm_app._close_admin_smtp_session()
+
+
+def test_smtp_tls_session_is_offered_on_reconnect(monkeypatch):
+    _configure_smtp_env(monkeypatch)
+    casm_app._admin_smtp_tls_sessions.clear()
+    wrapped = []
+    monkeypatch.setattr(
+        casm_app.ssl.SSLContext,
+        "wrap_socket",
+        lambda self, sock, *args, **kwargs: wrapped.append(kwargs) or sock,
+    )
+    try:
+        casm_app._notify_admin_sync("machine-a", status="approved")
+        server = _FakeSMTP.instances[0]
+        _assert(server.tls_context is casm_app._admin_smtp_tls_context, "STARTTLS should use the shared context")
+        _assert(casm_app._admin_smtp_tls_sessions.get("smtp.example.com") == "tls-session-1",
+                "The negotiated TLS session should be remembered per server")
+
+        casm_app._admin_smtp_tls_context.wrap_socket(object(), server_hostname="smtp.example.com")
+        _assert(wrapped and wrapped[0]["session"] == "tls-session-1", "Reconnects must offer the saved session")
+    finally:
+        casm_app._close_admin_smtp_session()
+        casm_app._admin_smtp_tls_sessions.clear()
+
+
+def test_smtp_settings_are_parsed_once_and_pooled_sends_skip_dns(monkeypatch):
+    _configure_smtp_env(monkeypatch)
+    monkeypatch.setenv("SMTP_FORCE_IPV4", "true")
+    lookups = []
+    monkeypatch.setattr(
+        casm_app.socket,
+        "getaddrinfo",
+        lambda host, port, *args: lookups.append(host) or [(None, None, None, "", ("192.0.2.10", port))],
+    )
+    casm_app._parse_admin_smtp_settings.cache_clear()
+    try:
+        casm_app._notify_admin_sync("machine-a", status="approved")
+        casm_app._notify_admin_sync("machine-b", status="approved")
+        _assert(lookups == ["smtp.example.com"], f"Only the new session should resolve the host, got {lookups}")
+        _assert(casm_app._parse_admin_smtp_settings.cache_info().misses == 1, "Unchanged SMTP env must be parsed once")
+
+        monkeypatch.setenv("SMTP_PORT", "2525")
+        _assert(casm_app._admin_smtp_settings()[0] == 2525, "Changed SMTP env must be picked up")
+    finally:
+        casm_app._close_admin_smtp_session()
+        casm_app._parse_admin_smtp_settings.cache_clear()
+
+
+def test_multiple_admin_recipients_share_one_message(monkeypatch):
+    _configure_smtp_env(monkeypatch)
+    monkeypatch.setenv("ADMIN_EMAIL", "admin@example.com; lead@example.com, security@example.com")
+    try:
+        casm_app._notify_admin_sync("machine-a", status="approved")
+        server = _FakeSMTP.instances[0]
+        _assert(server.sent == ["Edge Node Approved"], f"Expected a single message, got {server.sent}")
+        _assert(
+            server.last_recipients == ["admin@example.com", "lead@example.com", "security@example.com"],
+            f"Every recipient should be on the one envelope, got {server.last_recipients}",
+        )
+    finally:
+        casm_app._close_admin_smtp_session()
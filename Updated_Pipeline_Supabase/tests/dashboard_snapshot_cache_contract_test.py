@@ -243,6 +243,58 @@ def test_stats_counts_cloud_storage_metadata_without_downloads():
             casm_app._invalidate_local_report_state_cache()
 
 
+def test_local_violation_listing_reuses_rows_until_folder_changes():
+    old_db_manager = casm_app.db_manager
+    old_violations_dir = casm_app.VIOLATIONS_DIR
+    old_violation_ttl = casm_app.VIOLATIONS_SNAPSHOT_CACHE_TTL_SECONDS
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            report_dir = Path(tmpdir) / "20260512_101500"
+            report_dir.mkdir()
+            (report_dir / "original.jpg").write_bytes(b"jpeg")
+            casm_app.db_manager = None
+            casm_app.VIOLATIONS_DIR = Path(tmpdir)
+            casm_app.VIOLATIONS_SNAPSHOT_CACHE_TTL_SECONDS = 0.0
+            casm_app._invalidate_dashboard_snapshot_cache()
+
+            with casm_app.app.test_client() as client:
+                first = client.get("/api/violations").json or []
+                second = client.get("/api/violations").json or []
+                (report_dir / "report.html").write_text("<html></html>")
+                os.utime(report_dir, ns=(report_dir.stat().st_atime_ns, report_dir.stat().st_mtime_ns + 1_000_000))
+                third = client.get("/api/violations").json or []
+
+            _assert(first == second, "Unchanged folders should yield identical cached rows")
+            _assert(first and first[0].get("status") == "pending", f"Expected pending row, got {first}")
+            _assert(third and third[0].get("status") == "completed", f"Expected refreshed row, got {third}")
+            _assert(
+                casm_app._parse_report_id_timestamp("20260512_101500").strftime("%Y%m%d_%H%M%S") == "20260512_101500",
+                "Fast report id parser must round-trip the id",
+            )
+            hits_before = casm_app._parse_report_id_naive.cache_info().hits
+            casm_app._parse_report_id_timestamp("20260512_101500")
+            _assert(casm_app._parse_report_id_naive.cache_info().hits == hits_before + 1, "Repeated ids should hit the parse cache")
+            _assert(casm_app._parse_report_id_naive("not-a-report") is None, "Malformed ids must not raise")
+
+            odd_dir = Path(tmpdir) / "manual-upload"
+            odd_dir.mkdir()
+            signature = casm_app._local_violation_row_signature(odd_dir)
+            casm_app._set_cached_local_violation_row(
+                odd_dir, "filesystem_fallback", signature, {"report_id": "manual-upload", "timestamp": "2000-01-01T00:00:00"}
+            )
+            cached = casm_app._get_cached_local_violation_row(odd_dir, "filesystem_fallback", signature)
+            _assert(
+                cached and cached["timestamp"] > "2000-01-01T00:00:00",
+                f"Unparseable ids must not freeze their fallback timestamp, got {cached}",
+            )
+        finally:
+            casm_app.db_manager = old_db_manager
+            casm_app.VIOLATIONS_DIR = old_violations_dir
+            casm_app.VIOLATIONS_SNAPSHOT_CACHE_TTL_SECONDS = old_violation_ttl
+            casm_app._invalidate_dashboard_snapshot_cache()
+
+
 def main():
     try:
         test_dashboard_endpoints_reuse_short_lived_snapshot_cache()
@@ -258,6 +310,13 @@ def main():
         print(f"FAIL: test_stats_counts_cloud_storage_metadata_without_downloads: {exc}")
         raise SystemExit(1)
 
+    try:
+        test_local_violation_listing_reuses_rows_until_folder_changes()
+        print("PASS: test_local_violation_listing_reuses_rows_until_folder_changes")
+    except Exception as exc:
+        print(f"FAIL: test_local_violation_listing_reuses_rows_until_folder_changes: {exc}")
+        raise SystemExit(1)
+
     print("Dashboard snapshot cache contract test passed")
 
 
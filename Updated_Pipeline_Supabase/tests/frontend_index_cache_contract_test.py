@@ -0,0 +1,58 @@
+"""
+Offline contract test for the in-memory frontend shell.
+
+index.html must be served from a cached copy (gzip when accepted), revalidate
+with its ETag, and pick up edits to the file without a restart.
+"""
+
+import gzip
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+
+import casm_app
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_index_served_from_memory_with_etag_and_gzip(monkeypatch, tmp_path):
+    (tmp_path / "frontend").mkdir()
+    index_file = tmp_path / "frontend" / "index.html"
+    index_file.write_bytes(b"<!doctype html><title>CASM</title>")
+    monkeypatch.setattr(casm_app, "SERVE_FRONTEND", True)
+    monkeypatch.setattr(casm_app, "ensure_startup_thread", lambda: None)
+    monkeypatch.setattr(casm_app.app, "root_path", str(tmp_path))
+    monkeypatch.setitem(casm_app._frontend_index_cache, "stamp", None)
+
+    with casm_app.app.test_client() as client:
+        plain = client.get("/")
+        etag = plain.headers.get("ETag", "").strip('"')
+        zipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+        zipped_etag = zipped.headers.get("ETag", "").strip('"')
+        revalidated = client.get("/", headers={"If-None-Match": f'"{etag}"'})
+        zipped_revalidated = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"{zipped_etag}"'})
+        cross_encoding = client.get("/", headers={"If-None-Match": f'"{zipped_etag}"'})
+
+        index_file.write_bytes(b"<!doctype html><title>CASM v2</title>")
+        os.utime(index_file, ns=(1, 1))
+        updated = client.get("/")
+
+    _assert(plain.status_code == 200 and plain.data.startswith(b"<!doctype html>"), "Shell should be served as-is")
+    _assert(plain.mimetype == "text/html", f"Unexpected mimetype {plain.mimetype}")
+    _assert(etag, "Shell responses must carry an ETag")
+    _assert(zipped.headers.get("Content-Encoding") == "gzip", "gzip clients should get the precompressed body")
+    _assert(gzip.decompress(zipped.data) == plain.data, "gzip body must match the plain body")
+    _assert(revalidated.status_code == 304 and not revalidated.data, "Matching ETag should revalidate with 304")
+    _assert(zipped_etag and zipped_etag != etag, "gzip and identity bodies need distinct ETags")
+    _assert(zipped_revalidated.status_code == 304, "gzip ETag should revalidate gzip requests")
+    _assert(cross_encoding.status_code == 200 and cross_encoding.data == plain.data, "gzip ETag must not revalidate identity")
+    _assert(b"CASM v2" in updated.data, "Edits to index.html must be picked up")
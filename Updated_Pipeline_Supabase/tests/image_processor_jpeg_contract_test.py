@@ -0,0 +1,75 @@
+"""
+Offline contract test for concurrent violation JPEG writes.
+
+write_jpegs() must leave every file decodable on disk before returning and
+report per-file failures instead of raising.
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core import image_processor
+from pipeline.backend.core.image_processor import ImageProcessor, write_jpegs
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_write_jpegs_persists_all_frames_before_returning(tmp_path):
+    rng = np.random.default_rng(11)
+    original = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    annotated = original.copy()
+    cv2.rectangle(annotated, (10, 10), (80, 80), (0, 0, 255), 2)
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("file")
+
+    flags = write_jpegs([
+        (original, tmp_path / "r1" / "original.jpg"),
+        (annotated, tmp_path / "r1" / "annotated.jpg"),
+        (original, blocker / "original.jpg"),
+    ])
+
+    _assert(flags == [True, True, False], f"Unexpected write flags {flags}")
+    for name in ("original.jpg", "annotated.jpg"):
+        decoded = cv2.imread(str(tmp_path / "r1" / name))
+        _assert(decoded is not None and decoded.shape == original.shape, f"{name} must be a readable JPEG")
+    _assert(ImageProcessor({}).save_images([(original, tmp_path / "r2" / "original.jpg")]) == [True],
+            "save_images should delegate to write_jpegs")
+
+
+def test_encode_jpeg_fallback_uses_fast_baseline_params(monkeypatch):
+    seen = []
+
+    def _fake_imencode(ext, image, params):
+        seen.append(params)
+        return True, np.frombuffer(b"\xff\xd8\xff\xd9", dtype=np.uint8)
+
+    monkeypatch.setattr(image_processor, "_turbo_jpeg", False)
+    monkeypatch.setattr(image_processor.cv2, "imencode", _fake_imencode)
+
+    data = image_processor.encode_jpeg(np.zeros((8, 8, 3), dtype=np.uint8), quality=85)
+
+    _assert(data == b"\xff\xd8\xff\xd9", "Encoded bytes should be returned unchanged")
+    params = dict(zip(seen[0][::2], seen[0][1::2]))
+    _assert(params[cv2.IMWRITE_JPEG_QUALITY] == 85, "Quality must be forwarded")
+    _assert(params[cv2.IMWRITE_JPEG_OPTIMIZE] == 0 and params[cv2.IMWRITE_JPEG_PROGRESSIVE] == 0,
+            "Fallback must use baseline, non-optimised encoding")
+
+
+def test_save_image_keeps_non_jpeg_formats(tmp_path):
+    image = np.random.default_rng(3).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+    processor = ImageProcessor.__new__(ImageProcessor)
+
+    _assert(processor.save_image(image, tmp_path / "frame.png"), "PNG save should succeed")
+    _assert((tmp_path / "frame.png").read_bytes().startswith(b"\x89PNG"), "A .png path must get PNG bytes")
+    _assert(np.array_equal(cv2.imread(str(tmp_path / "frame.png")), image), "PNG output must stay lossless")
+    _assert(processor.save_image(image, tmp_path / "frame.jpeg"), "JPEG save should succeed")
+    _assert((tmp_path / "frame.jpeg").read_bytes().startswith(b"\xff\xd8"), "A .jpeg path must get JPEG bytes")
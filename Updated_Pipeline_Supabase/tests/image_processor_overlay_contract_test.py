@@ -0,0 +1,52 @@
+"""
+Offline contract test for the cached info overlay.
+
+Repeated frames with unchanged info text must reuse the rendered text layer,
+and the blended output must match direct cv2.putText rendering.
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core.image_processor import ImageProcessor
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def _reference_overlay(frame, info):
+    overlay = frame.copy()
+    overlay_bg = overlay.copy()
+    cv2.rectangle(overlay_bg, (10, 10), (300, 100), (0, 0, 0), -1)
+    cv2.addWeighted(overlay_bg, 0.6, overlay, 0.4, 0, overlay)
+    y_offset = 30
+    for key, value in info.items():
+        cv2.putText(overlay, f"{key}: {value}", (20, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+        y_offset += 25
+    return overlay
+
+
+def test_info_overlay_reuses_text_layer_and_matches_reference():
+    processor = ImageProcessor({})
+    frame = np.random.default_rng(7).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    info = {"FPS": "29.8", "Queue": 2, "Violations": 1}
+
+    first = processor.add_info_overlay(frame, info)
+    cached_layer = processor._info_overlay_cache
+    second = processor.add_info_overlay(frame, info)
+
+    _assert(processor._info_overlay_cache is cached_layer, "Unchanged info must reuse the cached text layer")
+    _assert(np.array_equal(first, second), "Cached overlay must be deterministic")
+    diff = np.abs(first.astype(np.int16) - _reference_overlay(frame, info).astype(np.int16))
+    _assert(int(diff.max()) <= 1, f"Overlay drifted from putText rendering by {int(diff.max())}")
+
+    processor.add_info_overlay(frame, {**info, "FPS": "30.1"})
+    _assert(processor._info_overlay_cache is not cached_layer, "Changed info must re-render the text layer")
@@ -0,0 +1,126 @@
+"""
+Offline contract tests for dynamic-batch TensorRT engines.
+
+No GPU or TensorRT is needed: the YOLO class and model are faked so only the
+export arguments, engine naming and batch splitting are exercised.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import infer_image
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_engine_export_uses_dynamic_batch_and_distinct_name(monkeypatch, tmp_path):
+    weights = tmp_path / "best.pt"
+    weights.write_bytes(b"weights")
+    export_calls = []
+
+    class _FakeYOLO:
+        def __init__(self, path, task=None):
+            self.path = Path(path)
+
+        def export(self, **kwargs):
+            export_calls.append(kwargs)
+            exported = self.path.with_suffix(".engine")
+            exported.write_bytes(b"engine")
+            return str(exported)
+
+    monkeypatch.setattr(infer_image, "_YOLO_BACKEND", "tensorrt")
+    monkeypatch.setattr(infer_image, "_YOLO_ENGINE_PRECISION", "fp16")
+    monkeypatch.setattr(infer_image, "_YOLO_ENGINE_BATCH", 8)
+    monkeypatch.setattr(infer_image, "_cuda_available", lambda: True)
+
+    engine_path = infer_image._resolve_engine_path(_FakeYOLO, str(weights))
+
+    _assert(engine_path == str(tmp_path / "best.b8.engine"), f"Unexpected engine path {engine_path}")
+    _assert(export_calls[0].get("dynamic") is True and export_calls[0].get("batch") == 8, f"Bad export {export_calls}")
+    _assert(not (tmp_path / "best.engine").exists(), "Dynamic build must not be left under the static engine name")
+    _assert(infer_image._resolve_engine_path(_FakeYOLO, str(weights)) == engine_path, "Cached engine should be reused")
+    _assert(len(export_calls) == 1, "Existing engine must not be re-exported")
+
+
+def test_predict_images_splits_batches_above_engine_limit(monkeypatch):
+    chunk_sizes = []
+
+    class _FakeModel:
+        names = {0: "Person"}
+
+        def predict(self, source, **kwargs):
+            chunk_sizes.append(len(source))
+            return [None] * len(source)
+
+    monkeypatch.setattr(infer_image, "resolve_model_path", lambda model_path=None: "fake.engine")
+    monkeypatch.setattr(infer_image, "_ensure_model_loaded", lambda resolved_model_path: _FakeModel())
+    monkeypatch.setattr(infer_image, "_cached_model_max_batch", 2)
+    monkeypatch.setattr(infer_image, "_YOLO_GPU_PREPROCESS", False)
+
+    frames = [np.zeros((32, 32, 3), dtype=np.uint8) for _ in range(5)]
+    results = infer_image.predict_images(frames)
+
+    _assert(chunk_sizes == [2, 2, 1], f"Expected engine-sized chunks, got {chunk_sizes}")
+    _assert(len(results) == 5, "Every input frame must get a result")
+
+
+def test_class_names_are_built_once_per_model(monkeypatch):
+    class _CountingNames(dict):
+        sorts = 0
+
+        def keys(self):
+            _CountingNames.sorts += 1
+            return super().keys()
+
+    class _FakeModel:
+        names = _CountingNames({1: "NO-Hardhat", 0: "Hardhat"})
+
+    monkeypatch.setattr(infer_image, "_cached_class_names", (None, ()))
+    model = _FakeModel()
+
+    first = infer_image._model_class_names(model)
+    second = infer_image._model_class_names(model)
+
+    _assert(first == ("Hardhat", "NO-Hardhat"), f"Names must be ordered by class id, got {first}")
+    _assert(second is first and _CountingNames.sorts == 1, "Names should be decoded once per loaded model")
+    _assert(infer_image._model_class_names(_FakeModel()) is not first, "A new model must rebuild its names")
+
+
+def test_gpu_letterbox_buffer_is_locked_until_predict_returns(monkeypatch):
+    held_during_predict = []
+
+    class _FakeModel:
+        names = {0: "Person"}
+
+        def predict(self, source, **kwargs):
+            held_during_predict.append(infer_image._gpu_letterbox_lock.locked())
+            return [None]
+
+    monkeypatch.setattr(infer_image, "resolve_model_path", lambda model_path=None: "fake.pt")
+    monkeypatch.setattr(infer_image, "_ensure_model_loaded", lambda resolved_model_path: _FakeModel())
+    monkeypatch.setattr(infer_image, "_YOLO_GPU_PREPROCESS", True)
+    monkeypatch.setattr(infer_image, "_gpu_letterbox", lambda img, imgsz: ("shared-buffer", 1.0, (0, 0)))
+
+    monkeypatch.setattr(infer_image, "_gpu_letterbox_batch", lambda imgs, imgsz: ("shared-buffer", 1.0, (0, 0)))
+    frames = [np.zeros((32, 32, 3), dtype=np.uint8) for _ in range(2)]
+
+    infer_image.predict_image(frames[0])
+    infer_image.predict_images(frames)
+    monkeypatch.setattr(infer_image, "_gpu_letterbox", lambda img, imgsz: None)
+    monkeypatch.setattr(infer_image, "_gpu_letterbox_batch", lambda imgs, imgsz: None)
+    infer_image.predict_image(frames[0])
+    infer_image.predict_images(frames)
+
+    _assert(
+        held_during_predict == [True, True, False, False],
+        f"Lock must cover only GPU-letterboxed predicts, got {held_during_predict}",
+    )
+    _assert(not infer_image._gpu_letterbox_lock.locked(), "Letterbox lock must be released after predict")
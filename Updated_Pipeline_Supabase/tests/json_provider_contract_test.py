@@ -0,0 +1,95 @@
+"""
+Offline contract test for the orjson-backed Flask JSON provider.
+
+jsonify() output must stay equivalent to Flask's default encoder (sorted keys,
+HTTP-date datetimes), falling back to it for values orjson rejects.
+"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from flask import Flask, jsonify
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import json_provider
+from json_provider import OrjsonProvider, install_orjson_provider, load_json_file
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_orjson_provider_matches_default_jsonify_payload():
+    payload = {
+        'violations': [{'report_id': '20260101_100000', 'severity': 'HIGH', 'missing_ppe': ['Hardhat']}],
+        'generated_at': datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc),
+        'count': 1,
+        'big': 2 ** 70,
+    }
+    plain_app = Flask('plain')
+    fast_app = Flask('fast')
+    install_orjson_provider(fast_app)
+
+    with plain_app.app_context():
+        expected = jsonify(payload).get_data(as_text=True)
+    with fast_app.app_context():
+        response = jsonify(payload)
+
+    _assert(isinstance(fast_app.json, OrjsonProvider), "jsonify should use the orjson provider")
+    _assert(response.mimetype == 'application/json', "Response must keep the JSON mimetype")
+    _assert(json.loads(response.get_data(as_text=True)) == json.loads(expected), "Payload must match Flask's default encoder")
+    if json_provider.orjson is not None:
+        body = json.loads(fast_app.json.dumps({'b': 1, 'a': np.float32(0.5)}))
+        _assert(list(body) == ['a', 'b'], "Keys must stay sorted like the default provider")
+        _assert(body['a'] == 0.5, "numpy scalars should serialise")
+
+
+def test_jsonify_goes_through_orjson(monkeypatch):
+    if json_provider.orjson is None:
+        return
+    from types import SimpleNamespace
+
+    real = json_provider.orjson
+    calls = []
+
+    def _spy_dumps(obj, **kwargs):
+        calls.append(kwargs.get('option'))
+        return real.dumps(obj, **kwargs)
+
+    spy = SimpleNamespace(**{name: getattr(real, name) for name in dir(real) if not name.startswith('_')})
+    spy.dumps = _spy_dumps
+    monkeypatch.setattr(json_provider, 'orjson', spy)
+
+    app = Flask('spy')
+    install_orjson_provider(app)
+    payload = {'b': [1, 2], 'a': 'ok'}
+    with app.test_request_context():
+        compact = jsonify(payload).get_data(as_text=True)
+        app.debug = True
+        pretty = jsonify(payload).get_data(as_text=True)
+
+    _assert(len(calls) == 2, f"jsonify must serialise through orjson, got {len(calls)} calls")
+    _assert(compact == '{"a":"ok","b":[1,2]}\n', f"Compact output must match Flask's, got {compact!r}")
+    plain = Flask('plain-debug')
+    plain.debug = True
+    with plain.test_request_context():
+        expected_pretty = jsonify(payload).get_data(as_text=True)
+    _assert(pretty == expected_pretty, f"Debug output must match Flask's indent=2, got {pretty!r}")
+
+
+def test_load_json_file_matches_stdlib_including_nan(tmp_path):
+    metadata = {'report_id': '20260101_100000', 'missing_ppe': ['Hardhat'], 'caption': 'Pekerja tanpa topi \u2013 ok'}
+    plain = tmp_path / 'metadata.json'
+    plain.write_text(json.dumps(metadata, ensure_ascii=False), encoding='utf-8')
+    _assert(load_json_file(plain) == metadata, "Sidecar must parse to the same dict as json.load")
+
+    with_nan = tmp_path / 'nan.json'
+    with_nan.write_text(json.dumps({'confidence': float('nan')}), encoding='utf-8')
+    loaded = load_json_file(with_nan)
+    _assert(loaded['confidence'] != loaded['confidence'], "NaN written by json.dump must still load")
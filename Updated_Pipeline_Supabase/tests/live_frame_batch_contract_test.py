@@ -0,0 +1,128 @@
+"""
+Offline contract test for live-frame request batching.
+
+Concurrent /api/inference/live-frame requests must share one predict_images()
+forward and each get back its own detections; a lone request must go straight
+through predict_image() without waiting for company.
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+
+import casm_app
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def _detections_for(frame):
+    return [{"class_name": "person", "width": frame.shape[1]}]
+
+
+def test_concurrent_live_frames_share_one_forward(monkeypatch):
+    batches = []
+
+    def _fake_predict_images(frames, conf=0.25):
+        batches.append(sorted(frame.shape[1] for frame in frames))
+        return [(_detections_for(frame), frame) for frame in frames]
+
+    monkeypatch.setattr(casm_app, "predict_images", _fake_predict_images)
+    monkeypatch.setattr(casm_app, "predict_image", lambda frame, conf=0.25: (_detections_for(frame), frame))
+    monkeypatch.setattr(casm_app, "LIVE_FRAME_BATCH_WAIT_SECONDS", 2.0)
+    monkeypatch.setattr(casm_app, "_live_frame_requests_active", 3)
+
+    widths = [16, 24, 32]
+    results = {}
+
+    def _submit(width):
+        frame = np.zeros((8, width, 3), dtype=np.uint8)
+        results[width] = casm_app._predict_live_frame(frame, 0.2, {"pending": True})
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=_submit, args=(width,)) for width in widths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    elapsed = time.monotonic() - started
+
+    _assert(batches == [widths], f"Expected one batched forward over all frames, got {batches}")
+    _assert(all(results[w][0][0]["width"] == w for w in widths), "Each request must get its own detections")
+    _assert(casm_app._live_frame_requests_active == 0, "Queued frames must release their in-flight slot")
+    _assert(elapsed < 1.0, f"Batch should flush once every request has queued, took {elapsed:.2f}s")
+
+
+def test_short_batch_results_fail_only_unmatched_frames(monkeypatch):
+    monkeypatch.setattr(casm_app, "predict_images", lambda frames, conf=0.25: [(_detections_for(frames[0]), frames[0])])
+    items = [
+        {"frame": np.zeros((8, width, 3), dtype=np.uint8), "conf": 0.2, "done": threading.Event()}
+        for width in (16, 24)
+    ]
+
+    casm_app._run_live_frame_batch(items)
+
+    _assert(items[0]["result"][0][0]["width"] == 16, "Matched frame keeps its result")
+    _assert(isinstance(items[1].get("error"), RuntimeError), f"Unmatched frame needs an explicit error: {items[1]}")
+    _assert(all(item["done"].is_set() for item in items), "Every waiter must be released")
+
+
+def test_stalled_batch_worker_falls_back_to_inline_predict(monkeypatch):
+    class _StalledWorker:
+        def is_alive(self):
+            return True
+
+    calls = []
+    monkeypatch.setattr(casm_app, "_live_frame_batch_worker", _StalledWorker())
+    monkeypatch.setattr(casm_app, "_live_frame_batch_queue", casm_app.queue.Queue())
+    monkeypatch.setattr(casm_app, "LIVE_FRAME_BATCH_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(casm_app, "predict_image", lambda frame, conf=0.25: calls.append(conf) or ([], frame))
+
+    detections, _ = casm_app._predict_live_frame(np.zeros((8, 8, 3), dtype=np.uint8), 0.4)
+
+    _assert(detections == [] and calls == [0.4], f"Timed-out request should infer inline, got {calls}")
+
+
+def test_lone_live_frame_is_not_delayed(monkeypatch):
+    calls = []
+
+    def _fake_predict_image(frame, conf=0.25):
+        calls.append(conf)
+        return _detections_for(frame), frame
+
+    ok, buffer = cv2.imencode(".png", np.zeros((24, 40, 3), dtype=np.uint8))
+    _assert(ok, "Failed to encode fixture image")
+    monkeypatch.setattr(casm_app, "_startup_gate_response", lambda: None)
+    monkeypatch.setattr(casm_app, "is_model_ready", lambda: True)
+    monkeypatch.setattr(casm_app, "predict_image", _fake_predict_image)
+    monkeypatch.setattr(casm_app, "LIVE_FRAME_BATCH_WAIT_SECONDS", 2.0)
+
+    started = time.monotonic()
+    with casm_app.app.test_client() as client:
+        response = client.post(
+            "/api/inference/live-frame",
+            data={"conf": "0.3", "image": (io.BytesIO(buffer.tobytes()), "frame.png")},
+            content_type="multipart/form-data",
+        )
+    elapsed = time.monotonic() - started
+    payload = response.get_json() or {}
+
+    _assert(response.status_code == 200, f"Unexpected status {response.status_code}: {payload}")
+    _assert(payload.get("detections") == [{"class_name": "person", "width": 40}], f"Unexpected payload {payload}")
+    _assert(calls == [0.3], f"Lone frame should use predict_image once, got {calls}")
+    _assert(elapsed < 1.0, f"Lone frame waited for a batch ({elapsed:.2f}s)")
+    _assert(casm_app._live_frame_requests_active == 0, "In-flight counter must be released")
@@ -0,0 +1,70 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core.live_source_adapter import LiveSourceAdapter
+
+
+class _BufferedCapture:
+    """Fake webcam with `backlog` frames already queued in the driver."""
+
+    def __init__(self, backlog):
+        self.backlog = backlog
+        self.sequence = 0
+        self.retrieved = 0
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.backlog > 0:
+            self.backlog -= 1
+        else:
+            time.sleep(0.03)
+        self.sequence += 1
+        return True
+
+    def retrieve(self):
+        self.retrieved += 1
+        return True, np.full((4, 4, 3), self.sequence, dtype=np.uint8)
+
+    def read(self):
+        self.grab()
+        return self.retrieve()
+
+    def release(self):
+        pass
+
+
+def _adapter_with_capture(capture):
+    adapter = LiveSourceAdapter()
+    adapter.active_camera_source = "webcam"
+    adapter.active_camera = capture
+    return adapter
+
+
+def test_webcam_read_skips_backlog_and_decodes_newest_frame_once():
+    capture = _BufferedCapture(backlog=3)
+    adapter = _adapter_with_capture(capture)
+
+    ok, frame, error = adapter.read_frame_locked()
+
+    assert ok and error is None
+    assert int(frame[0, 0, 0]) == 4
+    assert capture.retrieved == 1
+
+
+def test_webcam_read_does_not_drain_when_disabled():
+    capture = _BufferedCapture(backlog=3)
+    adapter = _adapter_with_capture(capture)
+    adapter.webcam_stale_grab_limit = 0
+
+    ok, frame, _ = adapter.read_frame_locked()
+
+    assert ok
+    assert int(frame[0, 0, 0]) == 1
@@ -0,0 +1,184 @@
+"""
+Offline contract tests for the live MJPEG stream hot path.
+
+No camera or YOLO weights are needed: the live source and the inference
+helpers are replaced with fakes so only the frame loop itself is exercised.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TEST_STATE_DIR = os.path.join(tempfile.gettempdir(), "casm_live_stream_contract_state")
+TEST_ULTRALYTICS_DIR = os.path.join(tempfile.gettempdir(), "casm_live_stream_contract_ultralytics")
+os.makedirs(TEST_STATE_DIR, exist_ok=True)
+os.makedirs(TEST_ULTRALYTICS_DIR, exist_ok=True)
+
+os.environ.setdefault("FLASK_DEBUG", "false")
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+os.environ.setdefault("CASM_STATE_DIR", TEST_STATE_DIR)
+os.environ.setdefault("YOLO_CONFIG_DIR", TEST_ULTRALYTICS_DIR)
+
+import casm_app
+
+
+class _FakeLiveSource:
+    def __init__(self, frame_count):
+        self.remaining = frame_count
+        self.stopped = False
+
+    def is_active(self):
+        return self.remaining > 0
+
+    def read(self):
+        self.remaining -= 1
+        return True, np.full((160, 480, 3), self.remaining * 40, dtype=np.uint8), None
+
+    def stop(self):
+        self.stopped = True
+
+
+def _install_fake_live_source(monkeypatch, frame_count):
+    source = _FakeLiveSource(frame_count)
+    monkeypatch.setattr(casm_app, "_is_active_live_source_locked", source.is_active)
+    monkeypatch.setattr(casm_app, "_read_active_frame_locked", source.read)
+    monkeypatch.setattr(casm_app, "_stop_live_source_locked", source.stop)
+    monkeypatch.setattr(casm_app, "FULL_PIPELINE_AVAILABLE", False)
+    monkeypatch.setattr(casm_app, "warmup_model", lambda **kwargs: None)
+    # Fake frames are flat fills, which the static-scene gate would treat as unchanged.
+    monkeypatch.setattr(casm_app, "LIVE_STATIC_SKIP_HAMMING", 0)
+    return source
+
+
+def _fake_predict(frame, conf=0.25, annotated_out=None):
+    if annotated_out is not None:
+        np.copyto(annotated_out, frame)
+        return [], annotated_out
+    return [], frame.copy()
+
+
+def _decode_chunk(chunk):
+    payload = chunk.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n", 1)[0]
+    return cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_live_stream_batches_frames_into_one_forward(monkeypatch):
+    source = _install_fake_live_source(monkeypatch, frame_count=6)
+    batch_sizes = []
+
+    def _fake_predict_images(frames, conf=0.25, annotated_outs=None):
+        batch_sizes.append(len(frames))
+        return [_fake_predict(frame, annotated_out=out) for frame, out in zip(frames, annotated_outs)]
+
+    monkeypatch.setattr(casm_app, "predict_image", _fake_predict)
+    monkeypatch.setattr(casm_app, "predict_images", _fake_predict_images)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH", 3)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH_WINDOW_SECONDS", 10.0)
+
+    chunks = list(casm_app.generate_frames(target_fps=30))
+
+    assert batch_sizes == [3, 3]
+    assert 1 <= len(chunks) <= 6
+    assert all(chunk.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n\xff\xd8") for chunk in chunks)
+    assert source.stopped
+
+
+def test_live_stream_encoder_thread_flushes_last_frame(monkeypatch):
+    _install_fake_live_source(monkeypatch, frame_count=4)
+    monkeypatch.setattr(casm_app, "predict_image", _fake_predict)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH", 1)
+
+    chunks = list(casm_app.generate_frames(target_fps=30))
+
+    assert chunks
+    # The fake source fills its final frame with zeros (below the status HUD).
+    assert int(_decode_chunk(chunks[-1])[100:].max()) <= 4
+
+
+def test_live_stream_single_frame_batch_uses_predict_image(monkeypatch):
+    _install_fake_live_source(monkeypatch, frame_count=2)
+    calls = []
+
+    def _counting_predict(frame, conf=0.25, annotated_out=None):
+        calls.append(frame.shape)
+        return _fake_predict(frame, conf, annotated_out)
+
+    monkeypatch.setattr(casm_app, "predict_image", _counting_predict)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH", 1)
+
+    chunks = list(casm_app.generate_frames(target_fps=30))
+
+    assert len(calls) == 2
+    assert 1 <= len(chunks) <= 2
+
+
+def test_live_stream_warms_model_once_at_frame_shape(monkeypatch):
+    _install_fake_live_source(monkeypatch, frame_count=3)
+    events = []
+
+    def _recording_warmup(**kwargs):
+        events.append(("warmup", kwargs["frame_shape"], kwargs["iterations"]))
+
+    def _recording_predict(frame, conf=0.25, annotated_out=None):
+        events.append(("predict",))
+        return _fake_predict(frame, conf, annotated_out)
+
+    monkeypatch.setattr(casm_app, "warmup_model", _recording_warmup)
+    monkeypatch.setattr(casm_app, "predict_image", _recording_predict)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH", 1)
+    monkeypatch.setattr(casm_app, "LIVE_WARMUP_ITERATIONS", 2)
+
+    list(casm_app.generate_frames(target_fps=30))
+
+    assert events[0] == ("warmup", (160, 480), 2)
+    assert events[1:] == [("predict",)] * 3
+
+
+def test_live_stream_static_frames_reuse_detections(monkeypatch):
+    source = _install_fake_live_source(monkeypatch, frame_count=5)
+    gradient = np.tile(np.linspace(0, 255, 480, dtype=np.uint8)[None, :, None], (160, 1, 3))
+
+    def _read_static_scene():
+        source.remaining -= 1
+        return True, gradient.copy(), None
+
+    monkeypatch.setattr(casm_app, "_read_active_frame_locked", _read_static_scene)
+    calls = []
+
+    def _detecting_predict(frame, conf=0.25, annotated_out=None):
+        calls.append(1)
+        _, annotated = _fake_predict(frame, conf, annotated_out)
+        return [{"bbox": [200, 100, 260, 150], "score": 0.9, "class_name": "Person", "class_id": 5}], annotated
+
+    monkeypatch.setattr(casm_app, "predict_image", _detecting_predict)
+    monkeypatch.setattr(casm_app, "LIVE_INFERENCE_BATCH", 1)
+    monkeypatch.setattr(casm_app, "LIVE_STATIC_SKIP_HAMMING", 4)
+    monkeypatch.setattr(casm_app, "LIVE_STATIC_SKIP_MAX_FRAMES", 2)
+
+    chunks = list(casm_app.generate_frames(target_fps=30))
+
+    # Frames 1-2 reuse frame 0, frame 3 is a forced refresh, frame 4 reuses it.
+    assert len(calls) == 2
+    assert chunks
+    # Reused detections are still drawn: the box outline survives on the streamed frame.
+    assert not np.array_equal(_decode_chunk(chunks[-1])[100:150, 200:260], gradient[100:150, 200:260])
+    assert casm_app._frame_dhash(gradient) == casm_app._frame_dhash(gradient.copy())
+
+
+def test_live_jpeg_encoder_wakes_waiter_once_per_new_frame():
+    encoder = casm_app._LiveJpegEncoder(jpeg_quality=70)
+    try:
+        encoder.submit(np.zeros((32, 32, 3), dtype=np.uint8))
+        assert encoder.wait_new(timeout=5.0) is not None
+        # Already taken: a second wait times out instead of resending the same bytes.
+        assert encoder.wait_new(timeout=0.05) is None
+    finally:
+        encoder.close()
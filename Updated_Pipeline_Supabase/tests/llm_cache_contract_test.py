@@ -0,0 +1,103 @@
+"""
+Offline contract tests for the persistent LLM response cache.
+
+Identical caption/NLP inputs must be served from disk, failures must never be
+cached, and concurrent callers on the same key must reach the provider once.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.integration.caption_generator import CaptionGenerator
+from pipeline.backend.integration.llm_cache import LLMResponseCache, image_digest
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_llm_cache_serves_repeat_and_skips_failures(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm_cache.db", ttl_seconds=3600)
+    calls = []
+
+    def _compute():
+        calls.append(1)
+        return {"summary": "Worker without hardhat"}
+
+    key = cache.make_key("nlp", "gemini", "model-a", "prompt text", "")
+    first = cache.get_or_compute("nlp", key, _compute)
+    second = cache.get_or_compute("nlp", key, _compute)
+
+    _assert(first == second == {"summary": "Worker without hardhat"}, "Expected identical cached payload")
+    _assert(len(calls) == 1, "Expected the provider to be called once for a repeated key")
+    _assert(
+        cache.make_key("nlp", "ollama", "model-a", "prompt text", "") != key,
+        "Provider must be part of the cache key",
+    )
+
+    failures = []
+    failure_key = cache.make_key("nlp", "gemini", "model-a", "other prompt", "")
+    for _ in range(2):
+        cache.get_or_compute("nlp", failure_key, lambda: failures.append(1))
+    _assert(len(failures) == 2, "Failed (None) results must not be cached")
+
+
+def test_llm_cache_expires_entries_after_ttl(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm_cache.db", ttl_seconds=0.05)
+    cache.set("caption", "k", "cached caption")
+    _assert(cache.get("caption", "k") == "cached caption", "Expected fresh entry to be readable")
+    time.sleep(0.1)
+    _assert(cache.get("caption", "k") is None, "Expected entry to expire after its TTL")
+
+
+def test_llm_cache_collapses_concurrent_misses(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm_cache.db", ttl_seconds=3600)
+    calls = []
+    results = []
+
+    def _slow_compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "caption"
+
+    key = cache.make_key("caption", "cloud", "", "digest")
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("caption", key, _slow_compute)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _assert(len(calls) == 1, f"Expected one provider call, got {len(calls)}")
+    _assert(results == ["caption"] * 4, "Every caller should receive the computed caption")
+
+
+def test_caption_generator_reuses_caption_for_identical_frame(tmp_path):
+    subject = CaptionGenerator.__new__(CaptionGenerator)
+    subject.llm_cache = LLMResponseCache(tmp_path / "llm_cache.db", ttl_seconds=3600)
+    calls = []
+
+    def _fake_uncached(image, prompt=None, max_retries=1):
+        calls.append(1)
+        return "A worker stands near scaffolding without a hardhat."
+
+    subject._generate_caption_uncached = _fake_uncached
+    frame = np.full((24, 32, 3), 90, dtype=np.uint8)
+
+    first = subject.generate_caption(frame)
+    second = subject.generate_caption(frame.copy())
+    subject.generate_caption(np.full((24, 32, 3), 91, dtype=np.uint8))
+
+    _assert(first == second, "Identical frames should yield the cached caption")
+    _assert(len(calls) == 2, "Only the distinct frame should trigger another caption call")
+    _assert(image_digest(frame) == image_digest(frame.copy()), "Digest must depend on pixels only")
@@ -0,0 +1,97 @@
+"""
+Offline contract test for orchestrator report workers.
+
+A slow caption/report job must not hold up the next violation: events are
+processed concurrently up to `report_workers` and reconciled on completion.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core.pipeline_orchestrator import PipelineOrchestrator
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_report_jobs_run_concurrently_and_are_reconciled():
+    orchestrator = PipelineOrchestrator({'VIOLATION_RULES': {'report_workers': 2}})
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def _slow_process(event):
+        with lock:
+            running.append(event.report_id)
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(event.report_id)
+
+    orchestrator._process_violation_event = _slow_process
+    orchestrator.start()
+    try:
+        started = time.perf_counter()
+        for report_id in ("r1", "r2"):
+            orchestrator.violation_queue.put_nowait(SimpleNamespace(report_id=report_id))
+        orchestrator.violation_queue.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        orchestrator.stop()
+
+    _assert(max(peak) == 2, f"Expected both report jobs in flight together, peak={max(peak)}")
+    _assert(elapsed < 0.38, f"Report jobs ran serially ({elapsed:.2f}s)")
+    _assert(orchestrator.pending_reports == {}, "Finished jobs must be removed from pending_reports")
+    _assert(orchestrator.get_status()['pending_reports'] == 0, "Status should expose pending report count")
+
+
+def test_detection_resumes_only_after_last_report_job(tmp_path):
+    import numpy as np
+    from datetime import datetime
+    from pipeline.backend.core.pipeline_orchestrator import PipelineState, ViolationEvent
+
+    release_slow = threading.Event()
+    calls = []
+
+    class _Stream:
+        def pause(self):
+            calls.append('pause')
+
+        def resume(self):
+            calls.append('resume')
+
+    class _Captioner:
+        def generate_caption(self, frame):
+            if frame.shape[1] == 8:
+                release_slow.wait(timeout=5)
+            return 'caption'
+
+    orchestrator = PipelineOrchestrator({'VIOLATION_RULES': {'report_workers': 2}, 'VIOLATIONS_DIR': tmp_path})
+    orchestrator.yolo_stream = _Stream()
+    orchestrator.caption_generator = _Captioner()
+
+    def _event(report_id, width):
+        frame = np.zeros((8, width, 3), dtype=np.uint8)
+        return ViolationEvent(datetime.now(), frame, frame, [], 'NO-Hardhat', 1, 1, 'HIGH', report_id)
+
+    slow = threading.Thread(target=orchestrator._process_violation_event, args=(_event('slow', 8),))
+    slow.start()
+    time.sleep(0.05)
+    orchestrator._process_violation_event(_event('fast', 16))
+    calls_after_fast = list(calls)
+    state_after_fast = orchestrator.get_state()
+    release_slow.set()
+    slow.join(timeout=5)
+
+    _assert(calls_after_fast == [], f"Detection must stay put while another job runs, got {calls_after_fast}")
+    _assert(state_after_fast != PipelineState.DETECTING, "State must not report DETECTING with a job in flight")
+    _assert(calls == ['resume'] and orchestrator.get_state() == PipelineState.DETECTING, f"Last job should resume, got {calls}")
+    _assert(orchestrator.stats.total_reports == 2, f"Both jobs must be counted, got {orchestrator.stats.total_reports}")
@@ -8,6 +8,8 @@ caption, so Gemini/Ollama cannot miss PPE classifier evidence.
 import sys
 from pathlib import Path
 
+import numpy as np
+
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
@@ -622,6 +624,630 @@ def test_executive_summary_formats_labeled_what_and_danger_as_bullets():
     _assert("Respirator</span>y" not in summary, "Tooltip injection must not split the word respiratory")
 
 
+def test_ollama_compact_prompt_starts_with_stable_prefix():
+    from pipeline.backend.core.report_generator import OLLAMA_REPORT_PROMPT_PREFIX
+
+    subject = ReportGenerator.__new__(ReportGenerator)
+    first = subject._build_ollama_compact_report_prompt({
+        "caption": "One worker is standing beside an excavator.",
+        "person_count": 1,
+        "severity": "HIGH",
+        "detections": [{"class_name": "NO-Hardhat"}],
+    }, "original long prompt")
+    second = subject._build_ollama_compact_report_prompt({
+        "caption": "Two office staff are seated at desks.",
+        "person_count": 2,
+        "severity": "LOW",
+        "detections": [{"class_name": "NO-Mask"}],
+    }, "original long prompt")
+
+    _assert(first.startswith(OLLAMA_REPORT_PROMPT_PREFIX), "Compact prompt must open with the cached static prefix")
+    _assert(second.startswith(OLLAMA_REPORT_PROMPT_PREFIX), "Prefix must not depend on report evidence")
+    _assert("{" not in OLLAMA_REPORT_PROMPT_PREFIX, "Static prefix must not contain interpolation placeholders")
+
+def test_report_http_calls_share_one_pooled_session():
+    from pipeline.backend.core.report_generator import _get_http_session
+
+    session = _get_http_session()
+    adapter = session.get_adapter("http://localhost:11434/api/generate")
+    _assert(_get_http_session() is session, "Report HTTP calls must reuse one keep-alive session")
+    _assert(adapter is session.get_adapter("https://example.invalid/v1"), "HTTP and HTTPS should share the pooled adapter")
+    _assert(adapter.max_retries.connect == 2, "Connection failures should be retried by the adapter")
+    _assert(adapter.max_retries.read == 0, "Read retries could duplicate a generation and must stay off")
+
+
+def test_rag_query_embeddings_are_cached_per_text():
+    from pipeline.backend.core import report_generator
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.embedding_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator.embeddings_url = 'http://contract-test/api/embeddings'
+    calls = []
+    generator._fetch_embeddings = lambda text: calls.append(text) or [0.1, 0.2]
+    report_generator._EMBEDDING_CACHE.clear()
+
+    first = generator._get_ollama_embeddings("worker without hardhat NO-Hardhat")
+    second = generator._get_ollama_embeddings("  Worker without hardhat  no-hardhat")
+    generator._get_ollama_embeddings("worker without vest NO-Safety Vest")
+
+    _assert(second is first, "Cached embedding must be returned unchanged")
+    _assert(first.dtype == np.float32 and first.tolist() == np.float32([0.1, 0.2]).tolist(), "Vectors are kept as float32")
+    _assert(len(calls) == 2, f"Case/whitespace variants of a query must not re-embed, got {calls}")
+    stats = report_generator.embedding_cache_stats()
+    _assert((stats['hits'], stats['misses'], stats['size']) == (1, 2, 2), f"Unexpected cache stats {stats}")
+    report_generator._EMBEDDING_CACHE.clear()
+
+
+def test_embedding_cache_expires_entries_after_ttl():
+    from pipeline.backend.core import report_generator
+
+    cache = report_generator._EmbeddingCache(max_size=2, ttl_seconds=60)
+    vector = np.float32([1.0, 0.0])
+    clock = [1000.0]
+    original_monotonic = report_generator.time.monotonic
+    report_generator.time.monotonic = lambda: clock[0]
+    try:
+        cache.put(('a',), vector)
+        cache.put(('b',), vector)
+        _assert(cache.get(('a',)) is vector, "Fresh entries should be served")
+        cache.put(('c',), vector)
+        _assert(cache.get(('b',)) is None, "Least recently used entry should be evicted")
+        clock[0] += 61
+        _assert(cache.get(('a',)) is None, "Expired entries must not be served")
+    finally:
+        report_generator.time.monotonic = original_monotonic
+    _assert(cache.stats()['hit_rate'] == round(1 / 3, 4), f"Unexpected stats {cache.stats()}")
+
+
+def test_rag_query_embeddings_persist_through_llm_cache():
+    import tempfile
+
+    from pipeline.backend.core import report_generator
+    from pipeline.backend.integration.llm_cache import LLMResponseCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generator = ReportGenerator.__new__(ReportGenerator)
+        generator.embedding_provider_order = ['ollama']
+        generator.embedding_model = 'nomic-embed-text'
+        generator.embeddings_url = 'http://contract-test/api/embeddings'
+        generator.llm_cache = LLMResponseCache(Path(tmp_dir) / 'llm_cache.db')
+        calls = []
+        generator._fetch_embeddings = lambda text: calls.append(text) or [0.3, 0.4]
+        report_generator._EMBEDDING_CACHE.clear()
+
+        generator._get_ollama_embeddings("worker near edge NO-Hardhat")
+        report_generator._EMBEDDING_CACHE.clear()  # simulate a restart
+        restored = generator._get_ollama_embeddings("worker near edge NO-Hardhat")
+
+        _assert(restored.tolist() == np.float32([0.3, 0.4]).tolist(), "Embedding must be restored from the on-disk cache")
+        _assert(len(calls) == 1, f"Disk-cached query text must not re-embed, got {calls}")
+        report_generator._EMBEDDING_CACHE.clear()
+
+
+def test_ollama_embeddings_are_batched_through_api_embed():
+    from pipeline.backend.core import report_generator
+
+    class _Response:
+        def __init__(self, status_code, payload):
+            self.status_code = status_code
+            self.ok = status_code == 200
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+    class _FakeSession:
+        def __init__(self, legacy_only=False):
+            self.legacy_only = legacy_only
+            self.posts = []
+
+        def post(self, url, json, timeout):
+            self.posts.append((url, json))
+            if url.endswith('/api/embed'):
+                if self.legacy_only:
+                    return _Response(404, {})
+                return _Response(200, {'embeddings': [[float(len(text))] for text in json['input']]})
+            return _Response(200, {'embedding': [float(len(json['prompt']))]})
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.embedding_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator.embeddings_url = 'http://contract-test/api/embeddings'
+    original_session = report_generator._get_http_session
+    original_batch_size = report_generator._OLLAMA_EMBED_BATCH_SIZE
+    texts = ['a', 'bb', 'ccc']
+    try:
+        session = _FakeSession()
+        report_generator._get_http_session = lambda: session
+        report_generator._OLLAMA_EMBED_BATCH_SIZE = 2
+        vectors = generator._fetch_embeddings_batch(texts)
+        _assert(vectors == [[1.0], [2.0], [3.0]], f"Vectors must keep input order, got {vectors}")
+        _assert(
+            [(url, body['input']) for url, body in session.posts]
+            == [('http://contract-test/api/embed', ['a', 'bb']), ('http://contract-test/api/embed', ['ccc'])],
+            f"Texts should go to /api/embed in sub-batches, got {session.posts}",
+        )
+
+        legacy = _FakeSession(legacy_only=True)
+        report_generator._get_http_session = lambda: legacy
+        _assert(generator._fetch_embeddings('dddd') == [4.0], "Old servers should fall back to /api/embeddings")
+        _assert(legacy.posts[-1][0] == 'http://contract-test/api/embeddings', "Fallback must use the legacy endpoint")
+    finally:
+        report_generator._get_http_session = original_session
+        report_generator._OLLAMA_EMBED_BATCH_SIZE = original_batch_size
+
+
+def test_ollama_models_are_preloaded_and_pinned():
+    import os
+
+    from pipeline.backend.core import report_generator
+
+    class _Response:
+        ok = True
+
+        def json(self):
+            return {'embeddings': [[0.1, 0.2]]}
+
+    posts = []
+
+    class _FakeSession:
+        def post(self, url, json, timeout):
+            posts.append((url, json))
+            return _Response()
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.chroma_collection = object()
+    generator.embedding_provider_order = ['ollama']
+    generator.nlp_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator.embeddings_url = 'http://contract-test/api/embeddings'
+    generator.api_url = 'http://contract-test/api/generate'
+    generator.model = 'gemma3:4b'
+    generator.ollama_timeout = (1, 30)
+    original_session = report_generator._get_http_session
+    original_keep_alive = os.environ.pop('OLLAMA_REPORT_KEEP_ALIVE', None)
+    try:
+        report_generator._get_http_session = lambda: _FakeSession()
+        default_loaded = generator.preload_ollama_models()
+        os.environ['OLLAMA_REPORT_KEEP_ALIVE'] = '30m'
+        pinned_loaded = generator.preload_ollama_models()
+    finally:
+        report_generator._get_http_session = original_session
+        os.environ.pop('OLLAMA_REPORT_KEEP_ALIVE', None)
+        if original_keep_alive is not None:
+            os.environ['OLLAMA_REPORT_KEEP_ALIVE'] = original_keep_alive
+
+    _assert(default_loaded == {'nomic-embed-text': True}, f"Unloaded-per-report models must not be preloaded: {default_loaded}")
+    _assert(posts[0][1].get('keep_alive') == report_generator._OLLAMA_EMBED_KEEP_ALIVE, "Embedding model must be pinned")
+    _assert(pinned_loaded == {'nomic-embed-text': True, 'gemma3:4b': True}, f"Resident report model should preload: {pinned_loaded}")
+    _assert(posts[-1] == ('http://contract-test/api/generate', {'model': 'gemma3:4b', 'keep_alive': '30m'}), f"Bad load request {posts[-1]}")
+
+
+def test_embedding_model_check_flags_quantisation_and_dimension():
+    from pipeline.backend.core import report_generator
+
+    class _Response:
+        ok = True
+
+        def json(self):
+            return {'details': {'quantization_level': 'F16'}}
+
+    shows = []
+
+    class _FakeSession:
+        def post(self, url, json, timeout):
+            shows.append((url, json))
+            return _Response()
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.embedding_model = 'nomic-embed-text'
+    generator.embedding_model_dtype = 'q8_0'
+    generator.embeddings_url = 'http://contract-test/api/embeddings'
+    generator.dosh_index = report_generator._InMemoryVectorIndex(np.ones((2, 4), dtype=np.float32), ('a', 'b'), ({}, {}))
+    messages = []
+    original_session = report_generator._get_http_session
+    original_warning, original_error = report_generator.logger.warning, report_generator.logger.error
+    try:
+        report_generator._get_http_session = lambda: _FakeSession()
+        report_generator.logger.warning = lambda message, *args: messages.append(('warning', message))
+        report_generator.logger.error = lambda message, *args: messages.append(('error', message))
+        generator._check_ollama_embedding_model(768)
+    finally:
+        report_generator._get_http_session = original_session
+        report_generator.logger.warning, report_generator.logger.error = original_warning, original_error
+
+    _assert(shows == [('http://contract-test/api/show', {'model': 'nomic-embed-text'})], f"Unexpected model lookup {shows}")
+    _assert([level for level, _ in messages] == ['error', 'warning'], f"Expected dimension and dtype warnings, got {messages}")
+    _assert('re-ingest' in messages[0][1] and 'q8_0' in messages[1][1], f"Messages should say how to fix it: {messages}")
+
+
+def test_local_embedding_provider_encodes_in_one_batch():
+    from pipeline.backend.core import report_generator
+    from pipeline.backend.integration import local_embedder
+
+    class _FakeEmbedder:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts):
+            self.batches.append(list(texts))
+            return np.float32([[len(text), 0.0] for text in texts])
+
+    fake = _FakeEmbedder()
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.embedding_provider_order = ['local']
+    generator.embedding_model = 'nomic-embed-text'
+    generator.embeddings_url = 'http://contract-test/api/embeddings'
+    generator.local_embedding_model = 'sentence-transformers/all-MiniLM-L6-v2'
+    original_available = report_generator.SENTENCE_TRANSFORMERS_AVAILABLE
+    original_factory = local_embedder.get_local_embedder
+    original_session = report_generator._get_http_session
+    try:
+        report_generator.SENTENCE_TRANSFORMERS_AVAILABLE = True
+        local_embedder.get_local_embedder = lambda model_name, **kwargs: fake
+        report_generator._get_http_session = lambda: (_ for _ in ()).throw(AssertionError("Ollama must not be called"))
+        vectors = generator._fetch_embeddings_batch(['a', 'bb', 'ccc'])
+    finally:
+        report_generator.SENTENCE_TRANSFORMERS_AVAILABLE = original_available
+        local_embedder.get_local_embedder = original_factory
+        report_generator._get_http_session = original_session
+
+    _assert(fake.batches == [['a', 'bb', 'ccc']], f"Local provider should encode all texts at once, got {fake.batches}")
+    _assert([float(vector[0]) for vector in vectors] == [1.0, 2.0, 3.0], "Vectors must keep input order")
+
+
+def test_local_embedder_loads_bf16_weights_only_where_supported():
+    from types import SimpleNamespace
+
+    from pipeline.backend.integration.local_embedder import LocalSentenceEmbedder
+
+    def _torch(bf16):
+        return SimpleNamespace(
+            bfloat16='bf16', float16='fp16',
+            cuda=SimpleNamespace(is_bf16_supported=lambda: bf16),
+        )
+
+    def _dtype(device, dtype, bf16=True):
+        embedder = LocalSentenceEmbedder(dtype=dtype)
+        embedder.device = device
+        return embedder._weights_dtype(_torch(bf16))
+
+    _assert(_dtype('cuda', 'auto') == 'bf16', "Ampere+ GPUs should load bf16 weights")
+    _assert(_dtype('cuda', 'auto', bf16=False) is None, "GPUs without bf16 keep fp32 weights")
+    _assert(_dtype('cuda', 'float16') == 'fp16', "fp16 can be requested explicitly")
+    _assert(_dtype('cpu', 'bfloat16') is None, "CPU inference keeps fp32 weights")
+
+
+def test_dosh_collection_is_searched_in_memory_with_chroma_distances():
+    from pipeline.backend.core import report_generator
+
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(40, 8)).astype(np.float32)
+    query = rng.normal(size=8).astype(np.float32)
+
+    class _FakeCollection:
+        name = 'dosh_docs'
+        metadata = {'hnsw:space': 'l2'}
+
+        def get(self, include):
+            return {
+                'embeddings': vectors,
+                'documents': [f'chunk {i}' for i in range(len(vectors))],
+                'metadatas': [{'row': i} for i in range(len(vectors))],
+            }
+
+        def query(self, **kwargs):
+            raise AssertionError("Loaded collections must not be queried through Chroma")
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.chroma_collection = _FakeCollection()
+    generator.embedding_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator._get_ollama_embeddings = lambda text: query
+    generator.dosh_index = generator._build_in_memory_index(generator.chroma_collection, len(vectors))
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+
+    chunks = generator._query_chroma_db('worker without hardhat', n_results=3)
+
+    expected_distances = ((vectors - query) ** 2).sum(axis=1)
+    expected_rows = np.argsort(expected_distances)[:3]
+    _assert(chunks.contents == tuple(f'chunk {i}' for i in expected_rows), f"Unexpected ranking {chunks.contents}")
+    _assert(chunks.metadatas[0] == {'row': int(expected_rows[0])}, "Metadata must follow its document")
+    _assert(
+        np.allclose(chunks.relevance_scores, 1.0 - expected_distances[expected_rows], rtol=1e-4, atol=1e-3),
+        "Relevance must match Chroma's squared-L2 convention",
+    )
+
+    cosine = report_generator._InMemoryVectorIndex(vectors, tuple(range(40)), ({},) * 40, space='cosine')
+    distances, rows = cosine.search(query, 2)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = unit @ (query / np.linalg.norm(query))
+    _assert(rows.tolist() == np.argsort(-similarity)[:2].tolist(), "Cosine space should rank by similarity")
+    _assert(np.allclose(distances, 1.0 - similarity[rows], atol=1e-5), "Cosine distance is 1 - similarity")
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+
+
+def test_dosh_index_vectors_are_memory_mapped_once():
+    import tempfile
+
+    vectors = np.arange(12, dtype=np.float32).reshape(4, 3) + 1.0
+
+    class _FakeCollection:
+        metadata = {'hnsw:space': 'cosine'}
+
+        def __init__(self):
+            self.embedding_reads = 0
+            self.vectors = vectors
+
+        def get(self, include, ids=None):
+            all_ids = [f'id-{i}' for i in range(4)]
+            if ids is not None:
+                return {'ids': ids, 'embeddings': self.vectors[[all_ids.index(i) for i in ids]].tolist()}
+            data = {'ids': all_ids}
+            if 'embeddings' in include:
+                self.embedding_reads += 1
+                data['embeddings'] = self.vectors.tolist()
+            if 'documents' in include:
+                data['documents'] = [f'chunk {i}' for i in range(4)]
+                data['metadatas'] = [{} for _ in range(4)]
+            return data
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generator = ReportGenerator.__new__(ReportGenerator)
+        generator.chroma_path = tmp_dir
+        collection = _FakeCollection()
+        first = generator._build_in_memory_index(collection, 4)
+        second = generator._build_in_memory_index(collection, 4)
+
+        _assert(collection.embedding_reads == 1, f"Vectors should be read from Chroma once, got {collection.embedding_reads}")
+        _assert(len(list(Path(tmp_dir).glob('dosh_index_*.npy'))) == 1, "One vector file per collection expected")
+        _assert(second._faiss_index is None and not second.vectors.flags.writeable, "Cached vectors must be searched in place")
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        _assert(np.allclose(second.vectors, unit) and np.allclose(first.vectors, unit), "Cosine vectors are stored unit length")
+        _assert(second.search(vectors[2], 1)[1].tolist() == [2], "Memory-mapped index must search like the in-RAM one")
+
+        # Re-ingested under the same ids with new embeddings of the same dimension
+        collection.vectors = vectors[::-1].copy()
+        reingested = generator._build_in_memory_index(collection, 4)
+        _assert(collection.embedding_reads == 2, "Re-ingested vectors must be read again, not served from the stale file")
+        _assert(len(list(Path(tmp_dir).glob('dosh_index_*.npy'))) == 2, "Re-ingested collection needs its own file")
+        _assert(np.allclose(reingested.vectors, unit[::-1]), "Fresh vectors must be served after re-ingestion")
+        del first, second, reingested
+
+
+def test_dosh_retrieval_falls_back_to_tfidf_without_query_embedding():
+    from pipeline.backend.core import report_generator
+
+    documents = (
+        'Safety helmets shall be worn on construction sites at all times.',
+        'Full body harness is required when working at height above two metres.',
+        'Hearing protection must be provided near noisy machinery.',
+    )
+
+    class _Collection:
+        name = 'dosh_docs'
+
+        def query(self, **kwargs):
+            raise AssertionError("No embedding means no vector query")
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.chroma_collection = _Collection()
+    generator.dosh_index = report_generator._InMemoryVectorIndex(
+        np.eye(3, dtype=np.float32), documents, ({'page': 1}, {'page': 2}, {'page': 3})
+    )
+    generator._get_ollama_embeddings = lambda text: None
+
+    chunks = generator._query_chroma_db('worker without harness above height', n_results=2)
+
+    _assert(chunks.contents == (documents[1],), f"Only matching chunks should be returned, got {chunks.contents}")
+    _assert(chunks.metadatas == ({'page': 2},), "Metadata must follow its chunk")
+    _assert(0.0 < float(chunks.relevance_scores[0]) <= 1.0, f"Scores are cosine similarities, got {chunks.relevance_scores}")
+    _assert(
+        generator._query_chroma_db('zzz unknown words', n_results=2).contents == (),
+        "Queries without known terms should return no chunks",
+    )
+
+
+def test_mmr_skips_near_duplicate_dosh_chunks():
+    from pipeline.backend.core import report_generator
+
+    vectors = np.array([[1.0, 0.0, 0.0], [0.99, 0.1, 0.0], [0.7, 0.0, 0.7], [0.0, 1.0, 0.0]], dtype=np.float32)
+    query = np.array([1.0, 0.0, 0.2], dtype=np.float32)
+
+    _assert(report_generator._mmr_select(query, vectors, 2, 1.0).tolist() == [0, 1], "lambda 1.0 is plain relevance")
+    _assert(report_generator._mmr_select(query, vectors, 2, 0.5).tolist() == [0, 2], "Duplicates should be skipped")
+    _assert(report_generator._mmr_select(query, vectors, 9, 0.5).tolist()[:2] == [0, 2], "k is capped at the pool size")
+    _assert(report_generator._mmr_select(query, vectors[:0], 2).size == 0, "Empty pools pick nothing")
+
+    class _Collection:
+        name = 'dosh_docs'
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.chroma_collection = _Collection()
+    generator.dosh_index = report_generator._InMemoryVectorIndex(
+        vectors, ('edge', 'edge again', 'anchor', 'vest'), ({},) * 4, space='cosine'
+    )
+    generator.embedding_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator._get_ollama_embeddings = lambda text: query.tolist()
+    original_lambda = report_generator._RAG_MMR_LAMBDA
+    report_generator._RAG_MMR_LAMBDA = 0.5
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+    try:
+        chunks = generator._query_chroma_db('worker at an open edge', n_results=2)
+    finally:
+        report_generator._RAG_MMR_LAMBDA = original_lambda
+
+    _assert(chunks.contents == ('edge', 'anchor'), f"MMR should diversify retrieved chunks, got {chunks.contents}")
+    _assert(chunks.relevance_scores[0] > chunks.relevance_scores[1], "Scores must follow their chunks")
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+
+
+def test_near_identical_rag_queries_reuse_chroma_results():
+    from pipeline.backend.core import report_generator
+
+    class _FakeCollection:
+        name = 'dosh_docs'
+
+        def __init__(self):
+            self.queries = 0
+
+        def query(self, query_embeddings, n_results, include):
+            self.queries += 1
+            return {
+                'documents': [[f'chunk {self.queries}']],
+                'metadatas': [[{'source': 'DOSH'}]],
+                'distances': [[0.2]],
+            }
+
+    embeddings = {
+        'worker without hardhat': [1.0, 0.0, 0.0],
+        'a worker without a hardhat': [0.99, 0.05, 0.0],
+        'worker without vest': [0.0, 1.0, 0.0],
+    }
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.chroma_collection = _FakeCollection()
+    generator.embedding_provider_order = ['ollama']
+    generator.embedding_model = 'nomic-embed-text'
+    generator._get_ollama_embeddings = lambda text: embeddings[text]
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+
+    first = generator._query_chroma_db('worker without hardhat')
+    repeat = generator._query_chroma_db('a worker without a hardhat')
+    other = generator._query_chroma_db('worker without vest')
+
+    _assert(repeat is first, "Near-identical query should reuse the earlier chunks")
+    _assert(other.contents == ('chunk 2',), "A different query must hit the collection")
+    _assert(abs(float(other.relevance_scores[0]) - 0.8) < 1e-6, "Distances should convert to relevance scores")
+    _assert(generator.chroma_collection.queries == 2, f"Expected 2 Chroma queries, got {generator.chroma_collection.queries}")
+    report_generator._RAG_SEMANTIC_CACHE.clear()
+
+
+def test_environment_keywords_use_cached_anchored_patterns():
+    from pipeline.backend.core.report_generator import _environment_keyword_pattern
+
+    generator = ReportGenerator.__new__(ReportGenerator)
+    anchor, pattern = _environment_keyword_pattern('traffic cone')
+    _assert(anchor == 'traffic' and pattern.search('traffic   cone'), "Multi-word keywords must tolerate spacing")
+    _assert(_environment_keyword_pattern('traffic cone')[1] is pattern, "Keyword patterns should be compiled once")
+    _assert(generator._has_positive_environment_keyword('worker by a traffic  cone', 'traffic cone'), "Spaced match")
+    _assert(not generator._has_positive_environment_keyword('no traffic cone nearby', 'traffic cone'), "Negated match")
+    _assert(not generator._has_positive_environment_keyword('an office desk', 'traffic cone'), "Absent keyword")
+
+
+def test_caption_environment_and_people_count_are_memoized():
+    from pipeline.backend.core import report_generator
+
+    report_generator._caption_environment_match.cache_clear()
+    report_generator._infer_people_count.cache_clear()
+    generator = ReportGenerator.__new__(ReportGenerator)
+    caption = 'Two workers beside scaffolding on a construction site'
+
+    first = generator._extract_environment_from_caption(caption)
+    second = generator._extract_environment_from_caption(caption.upper())
+    _assert(first == second, "Case-only differences must resolve to the same environment")
+    env_info = report_generator._caption_environment_match.cache_info()
+    _assert(env_info.misses == 1 and env_info.hits == 1, f"Expected one keyword scan, got {env_info}")
+
+    _assert(report_generator.infer_people_count_from_text(caption) == 2, "Word counts should still be parsed")
+    _assert(report_generator.infer_people_count_from_text(caption) == 2, "Repeat lookups must agree")
+    people_info = report_generator._infer_people_count.cache_info()
+    _assert(people_info.hits == 1, f"Repeat people count should hit the cache, got {people_info}")
+
+
+def test_ollama_json_stream_stops_at_closing_brace():
+    import json as _json
+    from pipeline.backend.core.report_generator import _read_ollama_json_stream
+
+    frames = ['{"summary": "brace } in', ' text", "persons": [{"id": 1}]', '}', '\n', '\n', '\n']
+    consumed = []
+
+    class _FakeStream:
+        closed = False
+
+        def iter_lines(self):
+            for chunk in frames:
+                consumed.append(chunk)
+                yield _json.dumps({'model': 'm', 'response': chunk, 'done': False}).encode('utf-8')
+
+        def close(self):
+            self.closed = True
+
+    stream = _FakeStream()
+    data = _read_ollama_json_stream(stream)
+
+    _assert(_json.loads(data['response'])['persons'] == [{'id': 1}], f"Unexpected streamed JSON {data}")
+    _assert(len(consumed) == 3, f"Padding after the root object must not be read, consumed {len(consumed)} frames")
+    _assert(stream.closed, "The stream must be closed so Ollama stops generating")
+
+    import time as _time
+    import requests as _requests
+
+    frames[:] = ['{"summary": "never', ' ends', ' ...']
+    consumed.clear()
+    runaway = _FakeStream()
+    try:
+        _read_ollama_json_stream(runaway, deadline=_time.monotonic() - 1.0)
+    except _requests.exceptions.Timeout:
+        timed_out = True
+    else:
+        timed_out = False
+    _assert(timed_out and runaway.closed, "A generation past its deadline must time out and close the stream")
+
+
+def test_detector_missing_ppe_keys_resolve_once_per_report():
+    from pipeline.backend.core import report_generator
+
+    report_generator._detector_missing_ppe_keys.cache_clear()
+    generator = ReportGenerator.__new__(ReportGenerator)
+    report_data = {
+        'detections': [{'class_name': 'NO-Safety Vest'}, {'class_name': 'Person'}, {'class_name': 'NO-Hardhat'}],
+        'violation_summary': 'Missing Gloves',
+    }
+
+    first = generator._extract_detector_missing_ppe_keys(report_data)
+    second = generator._extract_detector_missing_ppe_keys(report_data)
+
+    _assert(first == ['hardhat', 'safety_vest', 'gloves'], f"Keys must keep canonical order, got {first}")
+    _assert(second == first and second is not first, "Callers must get equal, independent lists")
+    info = report_generator._detector_missing_ppe_keys.cache_info()
+    _assert(info.misses == 1 and info.hits == 1, f"Repeat lookups should reuse the first scan, got {info}")
+
+
+def test_similar_incidents_rank_by_overlap_with_cached_word_sets():
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.incident_data = [
+        {'Abstract': 'Worker fell from scaffold'},
+        {'Abstract': 'Worker fell from ladder without harness'},
+        {'Abstract': 'Forklift struck pallet'},
+        {'Abstract': 'Employee fell from ladder'},
+    ]
+
+    similar = generator._find_similar_incidents('worker fell from ladder', 3)
+    word_sets = generator._incident_abstract_words()
+
+    _assert([item['Abstract'] for item in similar] == [
+        'Worker fell from ladder without harness',
+        'Worker fell from scaffold',
+        'Employee fell from ladder',
+    ], f"Unexpected ranking {similar}")
+    _assert(generator._incident_abstract_words() is word_sets, "Abstract word sets should be built once")
+    _assert(generator._find_similar_incidents('crane collapse', 2) == [], "Zero-overlap incidents are dropped")
+
+
+def test_person_card_ppe_status_style_lookup():
+    from pipeline.backend.core.report_generator import _ppe_status_style
+
+    _assert(_ppe_status_style("Missing") == ("ppe-status-missing", True), "Missing PPE must be flagged")
+    _assert(_ppe_status_style("No hardhat visible") == ("ppe-status-missing", True), "'No ...' counts as missing")
+    _assert(_ppe_status_style("Wearing") == ("ppe-status-mentioned", False), "Worn PPE is mentioned")
+    _assert(_ppe_status_style("Not specified") == ("ppe-status-not-mentioned", False), "Unknown status stays neutral")
+    hits = _ppe_status_style.cache_info().hits
+    _ppe_status_style("Missing")
+    _assert(_ppe_status_style.cache_info().hits == hits + 1, "Repeated statuses should be cache hits")
+
+
 def main():
     tests = [
         test_nlp_prompt_injects_yolo_payload,
@@ -641,6 +1267,27 @@ def main():
         test_local_activity_augmentation_adds_observed_caption_hint_when_model_omits_it,
         test_environment_detection_does_not_treat_restricted_work_area_as_office,
         test_executive_summary_formats_labeled_what_and_danger_as_bullets,
+        test_ollama_compact_prompt_starts_with_stable_prefix,
+        test_report_http_calls_share_one_pooled_session,
+        test_rag_query_embeddings_are_cached_per_text,
+        test_embedding_cache_expires_entries_after_ttl,
+        test_rag_query_embeddings_persist_through_llm_cache,
+        test_ollama_embeddings_are_batched_through_api_embed,
+        test_ollama_models_are_preloaded_and_pinned,
+        test_embedding_model_check_flags_quantisation_and_dimension,
+        test_local_embedding_provider_encodes_in_one_batch,
+        test_local_embedder_loads_bf16_weights_only_where_supported,
+        test_mmr_skips_near_duplicate_dosh_chunks,
+        test_near_identical_rag_queries_reuse_chroma_results,
+        test_dosh_collection_is_searched_in_memory_with_chroma_distances,
+        test_dosh_index_vectors_are_memory_mapped_once,
+        test_dosh_retrieval_falls_back_to_tfidf_without_query_embedding,
+        test_environment_keywords_use_cached_anchored_patterns,
+        test_caption_environment_and_people_count_are_memoized,
+        test_ollama_json_stream_stops_at_closing_brace,
+        test_detector_missing_ppe_keys_resolve_once_per_report,
+        test_similar_incidents_rank_by_overlap_with_cached_word_sets,
+        test_person_card_ppe_status_style_lookup,
     ]
     failures = []
     for test_fn in tests:
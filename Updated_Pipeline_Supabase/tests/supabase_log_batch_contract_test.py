@@ -0,0 +1,127 @@
+"""
+Offline contract test for batched flood_logs writes.
+
+Events queued with enqueue_log_event() must not block the caller and must
+reach Postgres as one multi-row insert with a single commit per batch.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core import supabase_db
+from pipeline.backend.core.supabase_db import SupabaseDatabaseManager
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(" ".join(str(query).split()))
+
+
+class _FakeConn:
+    closed = False
+
+    def __init__(self):
+        self.statements = []
+        self.batches = []
+        self.commits = 0
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def get_transaction_status(self):
+        return supabase_db.extensions.TRANSACTION_STATUS_IDLE
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def test_enqueued_log_events_are_written_in_one_batch(monkeypatch):
+    conn = _FakeConn()
+    monkeypatch.setattr(
+        supabase_db,
+        "execute_values",
+        lambda cur, query, rows, page_size=100: conn.batches.append(list(rows)),
+    )
+    monkeypatch.setenv("SUPABASE_LOG_FLUSH_MS", "50")
+    monkeypatch.setattr(SupabaseDatabaseManager, "_connect", lambda self: setattr(self, "conn", conn))
+    monkeypatch.setattr(SupabaseDatabaseManager, "_upsert_device_presence", lambda self, device_id, status="active": None)
+
+    manager = SupabaseDatabaseManager("postgresql://contract-test")
+    for index in range(5):
+        _assert(
+            manager.enqueue_log_event("report_generated", f"event {index}", report_id=f"r{index}", device_id="webcam_0"),
+            "Expected the event to be queued",
+        )
+    manager.close()
+
+    _assert(len(conn.batches) == 1, f"Expected one batched insert, got {len(conn.batches)}")
+    _assert([row[1] for row in conn.batches[0]] == [f"r{index}" for index in range(5)], "Rows must keep enqueue order")
+    _assert(conn.batches[0][0][2] == "webcam_0", "Device id should be normalised into its column")
+    _assert(any("synchronous_commit" in statement for statement in conn.statements), "Batch should relax commit sync")
+    _assert(conn.commits >= 1, "Batch must be committed")
+    _assert(not manager._log_writer_thread.is_alive(), "close() should stop the writer after draining")
+
+
+def test_enqueue_log_event_falls_back_to_sync_without_writer():
+    subject = SupabaseDatabaseManager.__new__(SupabaseDatabaseManager)
+    calls = []
+    subject.log_event = lambda **kwargs: calls.append(kwargs) or True
+
+    started = time.perf_counter()
+    _assert(subject.enqueue_log_event("violation_processed", "done", report_id="r1") is True, "Fallback should log")
+    _assert(time.perf_counter() - started < 1.0, "Fallback must not wait on a writer")
+    _assert(calls and calls[0]["report_id"] == "r1", "Expected a synchronous log_event call")
+
+
+def test_failed_log_batch_is_retried_then_dropped(monkeypatch):
+    monkeypatch.setenv("SUPABASE_LOG_FLUSH_MS", "20")
+    monkeypatch.setenv("SUPABASE_LOG_WRITE_ATTEMPTS", "2")
+    monkeypatch.setattr(SupabaseDatabaseManager, "_connect", lambda self: setattr(self, "conn", _FakeConn()))
+    attempts = []
+    written = []
+
+    def _flaky_write(self, batch):
+        attempts.append([event["report_id"] for event in batch])
+        if len(attempts) == 1 or batch[0]["report_id"] == "lost":
+            raise ConnectionError("server closed the connection unexpectedly")
+        written.extend(event["report_id"] for event in batch)
+
+    monkeypatch.setattr(SupabaseDatabaseManager, "_write_log_event_batch", _flaky_write)
+
+    manager = SupabaseDatabaseManager("postgresql://contract-test")
+    for report_id in ("r0", "r1"):
+        manager.enqueue_log_event("report_generated", "event", report_id=report_id)
+    deadline = time.monotonic() + 2.0
+    while written != ["r0", "r1"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.enqueue_log_event("report_generated", "event", report_id="lost")
+    manager.close()
+
+    _assert(written == ["r0", "r1"], f"A batch that fails once must be written on retry, got {written}")
+    _assert(attempts[:2] == [["r0", "r1"], ["r0", "r1"]], f"Retry must resend the same events, got {attempts}")
+    _assert(attempts[2:] == [["lost"], ["lost"]], f"A persistently failing batch stops after the attempt limit, got {attempts}")
+    _assert(not manager._log_writer_thread.is_alive(), "Writer must still stop after dropping a batch")
@@ -0,0 +1,66 @@
+"""
+Offline contract test for batched upload inference.
+
+Several uploaded images must go through one predict_images() call and come
+back as per-image results in upload order, with undecodable files reported
+individually instead of failing the batch.
+"""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SERVE_FRONTEND", "false")
+os.environ.setdefault("STARTUP_MODEL_WARMUP_ENABLED", "false")
+
+import casm_app
+
+
+def _assert(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def _png_bytes(width):
+    ok, buffer = cv2.imencode(".png", np.zeros((24, width, 3), dtype=np.uint8))
+    _assert(ok, "Failed to encode fixture image")
+    return buffer.tobytes()
+
+
+def test_upload_batch_runs_one_forward_and_keeps_order(monkeypatch):
+    batches = []
+
+    def _fake_predict_images(frames, conf=0.25):
+        batches.append([frame.shape[1] for frame in frames])
+        return [([{"class_name": "person", "width": frame.shape[1]}], frame) for frame in frames]
+
+    monkeypatch.setattr(casm_app, "_startup_gate_response", lambda: None)
+    monkeypatch.setattr(casm_app, "is_model_ready", lambda: True)
+    monkeypatch.setattr(casm_app, "predict_images", _fake_predict_images)
+
+    data = {
+        "conf": "0.2",
+        "images": [
+            (io.BytesIO(_png_bytes(32)), "a.png"),
+            (io.BytesIO(b"not an image"), "broken.png"),
+            (io.BytesIO(_png_bytes(48)), "b.png"),
+        ],
+    }
+    with casm_app.app.test_client() as client:
+        response = client.post("/api/inference/upload-batch", data=data, content_type="multipart/form-data")
+    payload = response.get_json() or {}
+
+    _assert(response.status_code == 200, f"Unexpected status {response.status_code}: {payload}")
+    _assert(batches == [[32, 48]], f"Expected one batched forward over decodable images, got {batches}")
+    results = payload.get("results") or []
+    _assert([item["filename"] for item in results] == ["a.png", "broken.png", "b.png"], "Results must keep upload order")
+    _assert(results[1].get("error") == "Invalid image format", f"Bad image should fail alone: {results[1]}")
+    _assert(results[2]["detections"][0]["width"] == 48, "Detections must be matched to their own image")
+    _assert(results[0]["annotated_image"].startswith("data:image/jpeg;base64,"), "Annotated image should be encoded")
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pipeline.backend.core.violation_detector import (
+    ViolationDetector,
+    is_within_or_near,
+    pairwise_ppe_association,
+)
+
+
+RULES = {
+    "required_ppe": {
+        "Hardhat": {"negative_classes": ["NO-Hardhat"]},
+        "Safety Vest": {"negative_classes": ["NO-Safety Vest"]},
+    },
+    "person_ppe_iou_threshold": 0.4,
+    "person_confidence_threshold": 0.25,
+    "head_region_strict": True,
+}
+
+
+def _detection(bbox, class_name, class_id, confidence=0.9):
+    return {"bbox": bbox, "confidence": confidence, "class_name": class_name, "class_id": class_id}
+
+
+def test_fused_pass_matches_separate_association_and_rule_check():
+    detector = ViolationDetector(RULES)
+    detections = [
+        _detection([100, 100, 200, 400], "Person", 0),
+        _detection([130, 100, 170, 140], "Hardhat", 1),
+        _detection([110, 180, 190, 280], "NO-Safety Vest", 2),
+        _detection([400, 100, 500, 400], "Person", 0),
+    ]
+    persons, ppe = detector.parse_detections(detections)
+
+    fused = detector._associate_and_check(persons, ppe)
+    separate = detector.check_ppe_violations(detector.associate_ppe_with_persons(persons, ppe))
+
+    assert [p.violations for p in fused] == [p.violations for p in separate]
+    assert [sorted(p.ppe_items) for p in fused] == [sorted(p.ppe_items) for p in separate]
+    assert "Missing Hardhat" not in fused[0].violations
+    assert "Missing Safety Vest" in fused[0].violations
+    assert "Missing Hardhat" in fused[1].violations
+
+
+def test_detect_violations_uses_fused_pass():
+    detector = ViolationDetector(RULES)
+    detections = [
+        _detection([100, 100, 200, 400], "Person", 0),
+        _detection([130, 100, 170, 140], "NO-Hardhat", 1),
+    ]
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    event = detector.detect_violations(detections, frame, "2026-01-01 10:00:00")
+
+    assert event is not None
+    assert event.persons[0].ppe_items["NO-Hardhat"]
+    assert event.violation_summary[0].startswith("Person 1: Missing Hardhat")
+
+
+def test_broadcast_association_matches_pairwise_loop():
+    rng = np.random.default_rng(3)
+    corners = rng.integers(0, 600, size=(40, 2, 2))
+    boxes = np.concatenate([corners.min(axis=1), corners.max(axis=1) + 1], axis=1).tolist()
+    person_boxes, ppe_boxes = boxes[:10], boxes[10:]
+    ppe_classes = ["Hardhat" if i % 3 == 0 else "Safety Vest" for i in range(len(ppe_boxes))]
+
+    mask = pairwise_ppe_association(
+        person_boxes, ppe_boxes, 0.4, np.array(["hardhat" in c.lower() for c in ppe_classes])
+    )
+    expected = [
+        [is_within_or_near(g, p, 0.4, ppe_class=c, strict_head_region=True) for g, c in zip(ppe_boxes, ppe_classes)]
+        for p in person_boxes
+    ]
+
+    assert mask.shape == (10, 30)
+    assert mask.tolist() == expected
+    assert pairwise_ppe_association([], ppe_boxes).shape == (0, 30)